@@ -0,0 +1,341 @@
+"""
+Banco de pruebas de rendimiento de src.practica1..practica7.
+
+Ejecuta cada función pública de los módulos de prácticas sobre imágenes
+sintéticas (grises y RGB) de varios tamaños, con calentamiento y varias
+repeticiones, y guarda tiempo, rendimiento (MP/s) y pico de memoria en JSON.
+Con --base compara contra una ejecución anterior y termina con código 1 si
+algún caso empeora más que el umbral.
+
+Ejemplos:
+    python benchmark.py -o base.json
+    python benchmark.py --base base.json -o actual.json --umbral 0.15
+    python benchmark.py --mp 0.3,2,12,50 --solo "practica4.*" --tipos rgb
+    python benchmark.py --base base.json --umbral-op "practica4.filtro_moda=0.4"
+
+Cada repetición recibe una copia nueva de la imagen: así las cachés por
+versión de imagen (espectros, histogramas) no falsean el tiempo. Las cachés
+por tamaño (máscaras de frecuencia, tablas) quedan calientes, como en la
+interfaz al repetir una operación.
+"""
+import argparse
+import fnmatch
+import gc
+import importlib
+import inspect
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from src import practica2
+
+VERSION_FORMATO = 1
+MODULOS = [f"practica{n}" for n in range(1, 8)]
+TIPOS = ("gris", "rgb")
+
+# Marcador de argumento: la segunda imagen (operaciones entre Img A e Img B)
+SECUNDARIA = object()
+
+# --- CASOS ---
+# Argumentos extra de cada operación: lista de (etiqueta, args). Una función
+# pública sin entrada se llama solo con la imagen; si falla, queda como error.
+CASOS = {
+    "practica1.binarizar_manual": [("", (127,))],
+    "practica2.aplicar_tabla": [("", (practica2.tabla_paleta("Arcoiris"),))],
+    "practica2.aplicar_colormap_matplotlib": [("", ("Arcoiris",))],
+    "practica2.aplicar_colormap_opencv": [("", ("JET",))],
+    "practica2.crear_mapa_usuario": [("", ((255, 0, 0), (255, 255, 255), (0, 0, 255)))],
+    "practica3.sumar_escalar": [("", (50,))],
+    "practica3.restar_escalar": [("", (50,))],
+    "practica3.multiplicar_escalar": [("", (1.5,))],
+    "practica3.preparar_img_secundaria": [("", (SECUNDARIA,))],
+    "practica3.suma_imagenes": [("", (SECUNDARIA,))],
+    "practica3.resta_imagenes": [("", (SECUNDARIA,))],
+    "practica3.multiplicacion_imagenes": [("", (SECUNDARIA,))],
+    "practica3.logica_and": [("", (SECUNDARIA,))],
+    "practica3.logica_or": [("", (SECUNDARIA,))],
+    "practica3.logica_xor": [("", (SECUNDARIA,))],
+    "practica3.componentes_conexas": [("", (8,))],
+    "practica4.ruido_sal_pimienta": [("", (0.05,))],
+    "practica4.filtro_promedio": [("k=5", (5,)), ("k=51", (51,))],
+    "practica4.filtro_promedio_pesado": [("k=5", (5,)), ("binomial k=7", (7, True))],
+    "practica4.filtro_gaussiano": [("k=5", (5,)), ("k=51", (51,))],
+    "practica4.filtro_kernel": [("realce", ([[0, -1, 0], [-1, 5, -1], [0, -1, 0]],))],
+    "practica4.filtro_bilateral": [("", (9,))],
+    "practica4.filtro_mediana": [("k=5", (5,))],
+    "practica4.filtro_maximo": [("k=5", (5,))],
+    "practica4.filtro_minimo": [("k=5", (5,))],
+    "practica4.filtro_percentil": [("k=5,p=25", (5, 25))],
+    "practica4.filtro_moda": [("k=5", (5,))],
+    "practica4.direccion_bordes": [("kirsch", ("kirsch",))],
+    "practica5.apply_lut": [("", (np.arange(255, -1, -1, dtype=np.uint8),))],
+    "practica5.seg_metodo": [("kittler", ("kittler",)), ("triangulo", ("triangulo",))],
+    "practica5.otsu_multinivel": [("k=2", (2,)), ("k=8", (8,))],
+    "practica5.seg_multiumbral": [("k=2", (2,)), ("k=8", (8,))],
+    "practica5.seg_umbral_banda": [("", (100, 200))],
+    "practica5.correccion_gamma": [("", (0.5,))],
+    "practica5.func_potencia": [("", (2.0,))],
+    "practica5.desplazar_histograma": [("", (30,))],
+    "practica5.contraccion_histograma": [("", (50, 200))],
+    "practica6.erosion": [("k=5", (5,))],
+    "practica6.dilatacion": [("k=5", (5,))],
+    "practica6.apertura": [("k=5", (5,))],
+    "practica6.cierre": [("k=5", (5,))],
+    "practica6.gradiente_morfologico": [("k=5", (5,))],
+    "practica7.aplicar_filtro_frecuencia": [("gauss-bajas", ("Gaussiano", "Bajas", 15, 2)),
+                                            ("butter-altas-color", ("Butterworth", "Altas", 15, 2, True))],
+}
+
+# Funciones públicas que no reciben una imagen uint8 (auxiliares)
+EXCLUIDAS = {
+    "practica2.construir_tabla", "practica2.tabla_paleta", "practica2.tabla_usuario",
+    "practica5.crear_lut_distribucion", "practica5.umbrales_otsu", "practica6.obtener_kernel",
+    "practica7.postprocesar_imagen", "practica7.tamano_rapido", "practica7.crear_mascara",
+}
+
+# Operaciones que separan canales de color: solo se miden con entrada RGB
+SOLO_RGB = {
+    "practica1.obtener_canales_rgb_visual", "practica1.obtener_canales_hsv_visual",
+    "practica1.obtener_canales_cmy_visual",
+}
+
+def operaciones(patrones=None):
+    """(nombre, función) de cada función pública de src.practicaN, en orden de definición"""
+    for modulo in MODULOS:
+        mod = importlib.import_module(f"src.{modulo}")
+        funciones = [f for n, f in inspect.getmembers(mod, inspect.isfunction)
+                    if not n.startswith("_") and f.__module__ == mod.__name__]
+        for func in sorted(funciones, key=lambda f: f.__code__.co_firstlineno):
+            nombre = f"{modulo}.{func.__name__}"
+            if nombre in EXCLUIDAS: continue
+            if patrones and not any(fnmatch.fnmatch(nombre, p) for p in patrones): continue
+            yield nombre, func
+
+# --- IMÁGENES SINTÉTICAS ---
+
+def forma_para(mp, tipo):
+    """Forma 4:3 con ~mp megapíxeles"""
+    alto = max(int(round((mp * 1e6 * 3 / 4) ** 0.5)), 8)
+    ancho = max(int(round(alto * 4 / 3)), 8)
+    return (alto, ancho, 3) if tipo == "rgb" else (alto, ancho)
+
+def imagen_sintetica(forma, semilla=0):
+    """Degradados, figuras y ruido: histograma poblado, bordes y regiones como una foto"""
+    alto, ancho = forma[:2]
+    yy = np.linspace(0, 160, alto, dtype=np.float32)[:, None]
+    xx = np.linspace(0, 80, ancho, dtype=np.float32)[None, :]
+    base = (yy + xx).astype(np.uint8)
+    canales = [base, cv2.flip(base, 1), cv2.flip(base, 0)][:forma[2] if len(forma) == 3 else 1]
+    img = cv2.merge(canales) if len(canales) > 1 else base.copy()
+    rng = np.random.default_rng(semilla)
+    lado = min(alto, ancho)
+    for _ in range(12):
+        centro = (int(rng.integers(ancho)), int(rng.integers(alto)))
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        if rng.random() < 0.5:
+            cv2.circle(img, centro, int(rng.integers(lado // 20 + 1, lado // 5 + 2)), color, -1)
+        else:
+            esquina = (centro[0] + int(rng.integers(lado // 4 + 1)), centro[1] + int(rng.integers(lado // 4 + 1)))
+            cv2.rectangle(img, centro, esquina, color, -1)
+    cv2.setRNGSeed(semilla)
+    ruido = np.empty_like(img)
+    cv2.randu(ruido, 0, 24)
+    return cv2.add(img, ruido)
+
+# --- MEDICIÓN ---
+
+def _resolver(args, secundaria):
+    return tuple(secundaria if a is SECUNDARIA else a for a in args)
+
+def medir(func, img, args, calentamiento=1, repeticiones=5, tiempo_max=10.0):
+    """Tiempos de `repeticiones` llamadas (menos si se agota tiempo_max) y pico de memoria en MB"""
+    for _ in range(calentamiento):
+        t0 = time.perf_counter()
+        func(img.copy(), *args)
+        if time.perf_counter() - t0 > tiempo_max: break
+
+    tiempos = []
+    gc.collect()
+    while len(tiempos) < repeticiones and sum(tiempos) < tiempo_max:
+        entrada = img.copy()  # Nueva versión: las cachés por imagen no cuentan
+        t0 = time.perf_counter()
+        func(entrada, *args)
+        tiempos.append(time.perf_counter() - t0)
+        del entrada
+
+    # Una llamada aparte para la memoria (tracemalloc ralentiza las asignaciones).
+    # tracemalloc ve los arreglos de NumPy, también los que devuelve OpenCV, pero
+    # no los búferes internos de OpenCV: es una cota inferior del pico real.
+    entrada = img.copy()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func(entrada, *args)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return tiempos, pico / 2**20
+
+def ejecutar(patrones=None, mps=(0.3, 2, 12), tipos=TIPOS, calentamiento=1, repeticiones=5,
+            tiempo_max=10.0, progreso=None):
+    """Lista de resultados (un dict por operación, caso, tipo y tamaño)"""
+    casos = [(nombre, func, etiqueta, args) for nombre, func in operaciones(patrones)
+            for etiqueta, args in CASOS.get(nombre, [("", ())])]
+    resultados = []
+    for mp in mps:
+        for tipo in tipos:
+            forma = forma_para(mp, tipo)
+            img = imagen_sintetica(forma, 0)
+            secundaria = imagen_sintetica(forma, 1)
+            for nombre, func, etiqueta, args in casos:
+                if tipo != "rgb" and nombre in SOLO_RGB: continue
+                res = {"id": id_caso(nombre, etiqueta, tipo, mp), "op": nombre, "caso": etiqueta,
+                    "tipo": tipo, "mp": mp, "forma": list(forma)}
+                try:
+                    tiempos, pico = medir(func, img, _resolver(args, secundaria),
+                                            calentamiento, repeticiones, tiempo_max)
+                except Exception as e:
+                    res.update(estado="error", error=f"{type(e).__name__}: {e}")
+                else:
+                    mediana = statistics.median(tiempos)
+                    pixeles = forma[0] * forma[1] / 1e6
+                    res.update(estado="ok", tiempos_s=tiempos, mediana_s=mediana, min_s=min(tiempos),
+                            desviacion_s=statistics.stdev(tiempos) if len(tiempos) > 1 else 0.0,
+                            mp_s=pixeles / mediana if mediana > 0 else None,
+                            pico_numpy_mb=pico)
+                resultados.append(res)
+                if progreso: progreso(res)
+    return resultados
+
+def id_caso(op, caso, tipo, mp):
+    return f"{op}[{caso}]|{tipo}|{mp:g}MP" if caso else f"{op}|{tipo}|{mp:g}MP"
+
+def entorno():
+    return {"python": platform.python_version(), "numpy": np.__version__, "opencv": cv2.__version__,
+            "plataforma": platform.platform(), "procesador": platform.processor() or platform.machine(),
+            "nucleos": os.cpu_count(), "hilos_cv": cv2.getNumThreads()}
+
+# --- COMPARACIÓN CON LA BASE ---
+
+def umbral_para(op, umbral, por_op):
+    """Umbral relativo de la operación: el último patrón de --umbral-op que coincida"""
+    for patron, valor in reversed(por_op):
+        if fnmatch.fnmatch(op, patron): return valor
+    return umbral
+
+def comparar(base, actuales, umbral=0.15, minimo_s=0.005, umbral_memoria=0.25, minimo_mb=4.0, por_op=()):
+    """
+    Devuelve (regresiones, mejoras) como listas de (id, métrica, antes, después).
+    Un caso empeora si su mediana crece más que el umbral relativo y más que
+    minimo_s (ruido en operaciones de pocos ms), si su pico de NumPy crece más
+    que umbral_memoria y minimo_mb, o si antes funcionaba y ahora falla.
+    """
+    previos = {r["id"]: r for r in base}
+    regresiones, mejoras = [], []
+    for r in actuales:
+        b = previos.get(r["id"])
+        if b is None or b["estado"] != "ok": continue
+        if r["estado"] != "ok":
+            regresiones.append((r["id"], "estado", "ok", r.get("error", r["estado"])))
+            continue
+        u = umbral_para(r["op"], umbral, por_op)
+        antes, despues = b["mediana_s"], r["mediana_s"]
+        if despues > antes * (1 + u) and despues - antes > minimo_s:
+            regresiones.append((r["id"], "mediana_s", antes, despues))
+        elif despues < antes / (1 + u) and antes - despues > minimo_s:
+            mejoras.append((r["id"], "mediana_s", antes, despues))
+        antes, despues = b.get("pico_numpy_mb", 0), r["pico_numpy_mb"]
+        if despues > antes * (1 + umbral_memoria) and despues - antes > minimo_mb:
+            regresiones.append((r["id"], "pico_numpy_mb", antes, despues))
+    return regresiones, mejoras
+
+# --- LÍNEA DE COMANDOS ---
+
+def _lista_floats(texto):
+    return tuple(float(v) for v in texto.split(",") if v.strip())
+
+def _umbral_op(texto):
+    patron, _, valor = texto.partition("=")
+    if not valor:
+        raise argparse.ArgumentTypeError("usa patron=umbral, p. ej. 'practica4.filtro_moda=0.4'")
+    return patron, float(valor)
+
+def _formato_linea(r):
+    if r["estado"] != "ok":
+        return f"{r['id']:<68} ERROR {r['error']}"
+    return f"{r['id']:<68} {r['mediana_s'] * 1000:10.2f} ms {r['mp_s'] or 0:9.1f} MP/s {r['pico_numpy_mb']:8.1f} MB"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banco de rendimiento de las operaciones del Sistema PDI")
+    parser.add_argument("--mp", type=_lista_floats, default=(0.3, 2, 12),
+                        help="Tamaños en megapíxeles separados por comas (defecto: 0.3,2,12; añade 50 para la serie completa)")
+    parser.add_argument("--tipos", default="gris,rgb", help="gris, rgb o ambos separados por comas")
+    parser.add_argument("--solo", action="append", default=[], help="Patrón de operaciones a medir (p. ej. 'practica4.*')")
+    parser.add_argument("--calentamiento", type=int, default=1, help="Llamadas de calentamiento por caso")
+    parser.add_argument("-r", "--repeticiones", type=int, default=5, help="Repeticiones medidas por caso")
+    parser.add_argument("--tiempo-max", type=float, default=10.0, help="Segundos máximos medidos por caso")
+    parser.add_argument("--hilos-cv", type=int, default=None, help="Fijar los hilos de OpenCV")
+    parser.add_argument("-o", "--salida", help="Guardar los resultados en este JSON")
+    parser.add_argument("--base", help="JSON de una ejecución anterior con la que comparar")
+    parser.add_argument("--umbral", type=float, default=0.15, help="Empeoramiento relativo tolerado en la mediana")
+    parser.add_argument("--minimo-ms", type=float, default=5.0, help="Diferencias de tiempo menores se ignoran")
+    parser.add_argument("--umbral-memoria", type=float, default=0.25, help="Aumento relativo tolerado del pico de memoria")
+    parser.add_argument("--umbral-op", type=_umbral_op, action="append", default=[],
+                        help="Umbral propio para las operaciones que coincidan: 'patron=valor'")
+    parser.add_argument("--listar", action="store_true", help="Solo listar las operaciones y casos")
+    a = parser.parse_args(argv)
+
+    tipos = tuple(t.strip() for t in a.tipos.split(",") if t.strip())
+    if not set(tipos) <= set(TIPOS):
+        parser.error(f"Tipos válidos: {', '.join(TIPOS)}")
+    if a.listar:
+        for nombre, _ in operaciones(a.solo):
+            print(nombre, *[e for e, _ in CASOS.get(nombre, [])])
+        return 0
+    if a.hilos_cv is not None:
+        cv2.setNumThreads(a.hilos_cv)
+    base = None
+    if a.base:
+        with open(a.base, encoding="utf-8") as f:
+            base = json.load(f)
+
+    resultados = ejecutar(a.solo, a.mp, tipos, a.calentamiento, a.repeticiones, a.tiempo_max,
+                        progreso=lambda r: print(_formato_linea(r), flush=True))
+    datos = {"version": VERSION_FORMATO, "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"), "entorno": entorno(),
+            "config": {"mp": list(a.mp), "tipos": list(tipos), "calentamiento": a.calentamiento,
+                        "repeticiones": a.repeticiones, "tiempo_max": a.tiempo_max},
+            "resultados": resultados}
+    if a.salida:
+        with open(a.salida, "w", encoding="utf-8") as f:
+            json.dump(datos, f, indent=2, ensure_ascii=False)
+
+    errores = sum(r["estado"] != "ok" for r in resultados)
+    print(f"\n{len(resultados)} casos, {errores} con error")
+    if base is None:
+        return 0
+
+    regresiones, mejoras = comparar(base["resultados"], resultados, a.umbral, a.minimo_ms / 1000,
+                                    a.umbral_memoria, por_op=a.umbral_op)
+    for ident, metrica, antes, despues in mejoras:
+        print(f"mejora    {ident}: {metrica} {antes:.4g} -> {despues:.4g}")
+    if regresiones:
+        print("\n" + "=" * 70, file=sys.stderr)
+        print(f"REGRESIÓN: {len(regresiones)} casos empeoran respecto a {a.base}", file=sys.stderr)
+        for ident, metrica, antes, despues in regresiones:
+            detalle = f"{antes:.4g} -> {despues:.4g}" if metrica != "estado" else f"ahora falla: {despues}"
+            print(f"  {ident}: {metrica} {detalle}", file=sys.stderr)
+        print("=" * 70, file=sys.stderr)
+        return 1
+    print(f"Sin regresiones respecto a {a.base}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,18 +2,31 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from tkinter import colorchooser 
 from tkinter import simpledialog 
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
 import cv2
-import numpy as np
 from PIL import Image, ImageTk
-from src import practica1
-from src import practica2    
-from src import practica3    
-from src import practica4
-from src import practica5
-from src import practica6
-from src import practica7
+from src import perezoso
+from src import carga
+from src import convolucion
+from src import histograma
+from src import lienzo_histograma
+from src import puntual
+from src import vista_previa
+from src import tareas
+from src import teselas
+from src import trazas
+from src import umbrales
+from src.historial import Historial
+from src.receta import Receta
+
+# Cada práctica se importa con su primera operación: la ventana aparece sin
+# esperar a SciPy.
+practica1 = perezoso.modulo("src.practica1")
+practica2 = perezoso.modulo("src.practica2")
+practica3 = perezoso.modulo("src.practica3")
+practica4 = perezoso.modulo("src.practica4")
+practica5 = perezoso.modulo("src.practica5")
+practica6 = perezoso.modulo("src.practica6")
+practica7 = perezoso.modulo("src.practica7")
 
 # --- CONFIGURACIÓN DE COLORES ---
 COLOR_BG = "#2E2E2E"        # Fondo General
@@ -23,6 +36,14 @@ COLOR_ACCENT = "#D4AF37"    # Dorado
 COLOR_BTN_BG = "#1C1C1C"    # Botones
 COLOR_BTN_FG = "#D4AF37"    # Texto Botones
 
+# Colores de los histogramas (lienzo de Tk)
+COLORES_RGB_HISTO = ("#ff0000", "#008000", "#0000ff")
+COLOR_RELLENO_GRIS = "#474747"   # gris al 30 % sobre COLOR_BG
+COLORES_MATIZ_TK = [lienzo_histograma.color_tk(c) for c in histograma.COLORES_MATIZ]
+
+# Pausa tras la última operación puntual antes de calcular sus píxeles en segundo plano
+ESPERA_MATERIALIZAR_MS = 1000
+
 class PDIApp:
     
     def __init__(self, root):
@@ -33,8 +54,8 @@ class PDIApp:
 
         # --- ESTRUCTURA DE DATOS CENTRALIZADA ---
         self.data = {
-            1: {"orig": None, "proc": None, "hist": []},
-            2: {"orig": None, "proc": None, "hist": []}
+            1: self.slot_vacio(),
+            2: self.slot_vacio()
         }
         
         self.active_slot = tk.IntVar(value=1)
@@ -92,6 +113,21 @@ class PDIApp:
         self.view_controls = tk.Frame(self.panel_right, bg=COLOR_BG, height=40)
         self.view_controls.pack(side="bottom", fill="x", pady=5)
 
+        # Barra de la tarea en segundo plano (progreso + cancelar)
+        self.frame_tarea = tk.Frame(self.panel_right, bg=COLOR_BG)
+        self.frame_tarea.pack(side="bottom", fill="x", padx=5)
+        self.lbl_tarea = tk.Label(self.frame_tarea, text="", bg=COLOR_BG, fg="gray")
+        self.lbl_tarea.pack(side="left")
+        self.barra_progreso = ttk.Progressbar(self.frame_tarea, mode="determinate", maximum=1.0, length=200)
+        self.barra_progreso.pack(side="left", padx=5)
+        self.btn_cancelar = ttk.Button(self.frame_tarea, text="✖ Cancelar", style="Red.TButton",
+                                    command=self.cancelar_tarea, state="disabled")
+        self.btn_cancelar.pack(side="left")
+        self.modo_barra = "determinate"
+        self.trabajador = tareas.Trabajador(self.root.after, self.actualizar_estado_tarea)
+        self.id_vista_previa = None  # after() pendiente de la vista previa en vivo
+        self.id_materializar = {1: None, 2: None}  # after() pendiente de la LUT diferida
+
         # --- AÑADIR PANELES AL PANEDWINDOW ---
         # 'minsize' evita que el usuario oculte completamente el panel por error
         self.paned_window.add(self.panel_left, minsize=200, width=360) 
@@ -104,6 +140,13 @@ class PDIApp:
         self.inicializar_grilla()
         self.actualizar_controles_vista()
 
+    def slot_vacio(self):
+        # "receta" graba la cadena (función, args) aplicada a "proc";
+        # "receta_hist" guarda los pasos previos a cada acción para poder deshacer;
+        # "hist" limita su memoria (comprime y vuelca a disco los estados viejos);
+        # "cadena": operaciones puntuales sobre "proc" aún sin aplicar (src.puntual)
+        return {"orig": None, "proc": None, "cadena": None, "hist": Historial(), "receta": Receta(), "receta_hist": []}
+
     def bind_mousewheel(self, widget, inner_frame):
         # Función interna para manejar el evento
         def _on_mousewheel(event):
@@ -165,6 +208,18 @@ class PDIApp:
         self.btn_undo = ttk.Button(frame_top, text="↩ Deshacer (Undo)", style="Gold.TButton", command=self.deshacer)
         self.btn_undo.pack(fill="x", padx=5, pady=2)
 
+        ttk.Separator(frame_top, orient='horizontal').pack(fill='x', pady=5)
+
+        # Recetas: grabar la cadena aplicada y reproducirla sobre otras imágenes
+        ttk.Button(frame_top, text="📜 Guardar Receta", style="Gold.TButton",
+                command=self.guardar_receta).pack(fill="x", padx=5, pady=2)
+        ttk.Button(frame_top, text="▶ Aplicar Receta", style="Gold.TButton",
+                command=self.aplicar_receta).pack(fill="x", padx=5, pady=2)
+
+        ttk.Separator(frame_top, orient='horizontal').pack(fill='x', pady=5)
+        ttk.Button(frame_top, text="⏱ Latencias", style="Gold.TButton",
+                command=self.abrir_panel_latencias).pack(fill="x", padx=5, pady=2)
+
     def crear_switch_operacion(self):
         # Este frame contiene el switch para decidir qué imagen se edita
         self.frame_switch = tk.LabelFrame(self.scroll_content, text="Selector de Operación", 
@@ -393,7 +448,7 @@ class PDIApp:
         )
         
         if confirm:
-            img_secundaria = self.data[slot_secundario]["proc"]
+            img_secundaria = self.imagen_proc(slot_secundario)
             self.aplicar_filtro(funcion_logica, img_secundaria)
 
     def construir_tab_4(self, parent):
@@ -404,8 +459,13 @@ class PDIApp:
         tk.Label(f_config, text="Tamaño de Kernel (K):", bg=COLOR_BG, fg="white").pack(side="left")
         
         # Selector de valores impares (3, 5, 7, 9...)
-        self.spin_kernel = tk.Spinbox(f_config, values=(3, 5, 7, 9, 11), width=5)
+        # Los lineales eligen solos entre espacial, separable o DFT, así que los
+        # kernels grandes también son prácticos
+        self.spin_kernel = tk.Spinbox(f_config, values=(3, 5, 7, 9, 11, 15, 21, 31, 51, 75, 101, 151, 201), width=5)
         self.spin_kernel.pack(side="left", padx=5)
+        self.ultimo_kernel = "0 -1 0; -1 5 -1; 0 -1 0"
+        ttk.Button(f_config, text="Kernel Propio...", style="Gold.TButton",
+                command=self.solicitar_kernel).pack(side="left", padx=10)
         
         # --- GENERACIÓN DE RUIDO ---
         lf_ruido = tk.LabelFrame(parent, text="Generación de Ruido", bg=COLOR_BG, fg=COLOR_ACCENT)
@@ -429,6 +489,8 @@ class PDIApp:
                 command=lambda: self.aplicar_filtro(practica4.filtro_promedio, get_k())).pack(side="left", padx=2)
         ttk.Button(lf_low, text="Prom. Pesado", **btn_s,
                 command=lambda: self.aplicar_filtro(practica4.filtro_promedio_pesado, get_k())).pack(side="left", padx=2)
+        ttk.Button(lf_low, text="Binomial", **btn_s,
+                command=lambda: self.aplicar_filtro(practica4.filtro_promedio_pesado, get_k(), True)).pack(side="left", padx=2)
         ttk.Button(lf_low, text="Gaussiano", **btn_s,
                 command=lambda: self.aplicar_filtro(practica4.filtro_gaussiano, get_k())).pack(side="left", padx=2)
         ttk.Button(lf_low, text="Bilateral", **btn_s,
@@ -440,7 +502,7 @@ class PDIApp:
         
         ttk.Button(lf_nolin, text="Mediana", **btn_s,
                 command=lambda: self.aplicar_filtro(practica4.filtro_mediana, get_k())).pack(side="left", padx=2)
-        ttk.Button(lf_nolin, text="Moda (Lento)", **btn_s,
+        ttk.Button(lf_nolin, text="Moda", **btn_s,
                 command=lambda: self.aplicar_filtro(practica4.filtro_moda, get_k())).pack(side="left", padx=2)
         ttk.Button(lf_nolin, text="Máximo", **btn_s,
                 command=lambda: self.aplicar_filtro(practica4.filtro_maximo, get_k())).pack(side="left", padx=2)
@@ -469,6 +531,29 @@ class PDIApp:
         ttk.Button(f_grid_h, text="Kirsch (Brújula)", **btn_s,
                 command=lambda: self.aplicar_filtro(practica4.filtro_kirsch)).grid(row=1, column=2, padx=2, pady=2)
 
+        ttk.Button(f_grid_h, text="Robinson", **btn_s,
+                command=lambda: self.aplicar_filtro(practica4.filtro_robinson)).grid(row=2, column=0, padx=2, pady=2)
+        ttk.Button(f_grid_h, text="Dirección Kirsch", **btn_s,
+                command=lambda: self.aplicar_filtro(practica4.direccion_bordes, "kirsch")).grid(row=2, column=1, padx=2, pady=2)
+        ttk.Button(f_grid_h, text="Dirección Robinson", **btn_s,
+                command=lambda: self.aplicar_filtro(practica4.direccion_bordes, "robinson")).grid(row=2, column=2, padx=2, pady=2)
+
+    # --- HELPERS PARA P4 ---
+
+    def solicitar_kernel(self):
+        texto = simpledialog.askstring("Kernel Propio",
+                                    "Filas separadas por ';' y divisor opcional tras '/'\n"
+                                    "(Ej. 0 -1 0; -1 5 -1; 0 -1 0   o   1 2 1; 2 4 2; 1 2 1 / 16):",
+                                    initialvalue=self.ultimo_kernel)
+        if not texto: return
+        try:
+            filas, divisor = convolucion.leer_kernel(texto)
+        except ValueError as e:
+            messagebox.showerror("Kernel Propio", str(e))
+            return
+        self.ultimo_kernel = texto
+        self.aplicar_filtro(practica4.filtro_kernel, filas, divisor)
+
     def construir_tab_5(self, parent):
         # --- SEGMENTACIÓN ---
         lf_seg = tk.LabelFrame(parent, text="Técnicas de Segmentación", bg=COLOR_BG, fg=COLOR_ACCENT)
@@ -490,9 +575,11 @@ class PDIApp:
         ttk.Button(f_g1, text="Media", **btn_s, 
                 command=lambda: self.aplicar_filtro(practica5.seg_media)).grid(row=1, column=0, padx=2, pady=2)
         ttk.Button(f_g1, text="Multiumbral", **btn_s, 
-                command=lambda: self.aplicar_filtro(practica5.seg_multiumbral)).grid(row=1, column=1, padx=2, pady=2)
+                command=self.pedir_multiumbral).grid(row=1, column=1, padx=2, pady=2)
         ttk.Button(f_g1, text="Umbral Banda", **btn_s, 
                 command=self.pedir_banda_y_aplicar).grid(row=1, column=2, padx=2, pady=2)
+        ttk.Button(f_g1, text="Comparar Umbrales", **btn_s, 
+                command=self.comparar_umbrales).grid(row=2, column=0, padx=2, pady=2)
 
         # --- AJUSTE DE BRILLO Y CONTRASTE ---
         lf_eq = tk.LabelFrame(parent, text="Ajuste de Brillo y Contraste", bg=COLOR_BG, fg=COLOR_ACCENT)
@@ -536,13 +623,48 @@ class PDIApp:
         if max_v is None: return
         self.aplicar_filtro(practica5.seg_umbral_banda, min_v, max_v)
 
+    def comparar_umbrales(self):
+        # Todos los métodos de src.umbrales sobre un solo histograma (en caché)
+        slot = self.active_slot.get()
+        img = self.imagen_proc(slot)
+        if img is None:
+            messagebox.showwarning("Error", f"No hay imagen cargada en el Slot {slot}")
+            return
+        resultados = umbrales.comparar(img)
+
+        vent = tk.Toplevel(self.root)
+        vent.title(f"Comparar Umbrales - Imagen {slot}")
+        vent.configure(bg=COLOR_BG)
+        tabla = ttk.Treeview(vent, columns=("umbral", "arriba"), show="tree headings", height=len(resultados))
+        tabla.heading("#0", text="Método")
+        tabla.heading("umbral", text="Umbral")
+        tabla.heading("arriba", text="% > umbral")
+        for col in ("umbral", "arriba"): tabla.column(col, width=90, anchor="e")
+        for metodo, (t, arriba) in resultados.items():
+            valores = ("-", "-") if t is None else (f"{t:.1f}" if isinstance(t, float) else t, f"{arriba * 100:.1f}")
+            tabla.insert("", "end", iid=metodo, text=metodo, values=valores)
+        tabla.pack(fill="both", expand=True, padx=5, pady=5)
+
+        def aplicar(_=None):
+            metodo = tabla.focus()
+            if not metodo or resultados[metodo][0] is None: return
+            self.aplicar_filtro(practica5.seg_metodo, metodo)
+        tabla.bind("<Double-1>", aplicar)
+        ttk.Button(vent, text="Aplicar seleccionado", style="Gold.TButton", command=aplicar).pack(pady=(0, 5))
+
+    def pedir_multiumbral(self):
+        # k umbrales de Otsu -> k + 1 regiones
+        k = simpledialog.askinteger("Multiumbral", "Número de umbrales (1-32):", initialvalue=2, minvalue=1, maxvalue=32)
+        if k is None: return
+        self.aplicar_filtro(practica5.seg_multiumbral, k)
+
     def pedir_gamma_y_aplicar(self):
-        g = simpledialog.askfloat("Gamma", "Valor Gamma (Ej. 0.5 o 2.2):", initialvalue=1.0)
-        if g is not None: self.aplicar_filtro(practica5.correccion_gamma, g)
+        self.dialogo_deslizador("Gamma", "Valor Gamma (Ej. 0.5 o 2.2):", 0.1, 5.0, 1.0, 0.05,
+                                practica5.correccion_gamma, float)
 
     def pedir_desplazamiento(self):
-        val = simpledialog.askinteger("Desplazar", "Valor a sumar/restar (-255 a 255):", initialvalue=50)
-        if val is not None: self.aplicar_filtro(practica5.desplazar_histograma, val)
+        self.dialogo_deslizador("Desplazar", "Valor a sumar/restar (-255 a 255):", -255, 255, 50, 1,
+                                practica5.desplazar_histograma, int)
 
     def pedir_contraccion(self):
         min_c = simpledialog.askinteger("Contracción", "Nuevo Mínimo (Ej. 50):", initialvalue=50)
@@ -619,15 +741,33 @@ class PDIApp:
         
         # Slider Cutoff (Frecuencia de corte)
         tk.Label(f_params, text="Frecuencia de Corte (Radio %):", bg=COLOR_BG, fg="white").pack(anchor="w")
-        self.slider_cutoff = tk.Scale(f_params, from_=1, to=100, orient="horizontal", bg=COLOR_BG, fg="white", highlightthickness=0)
+        self.slider_cutoff = tk.Scale(f_params, from_=1, to=100, orient="horizontal", bg=COLOR_BG, fg="white", highlightthickness=0,
+                                    command=lambda _: self.al_mover_frecuencia())
         self.slider_cutoff.set(15) # Valor por defecto 15%
         self.slider_cutoff.pack(fill="x", pady=2)
 
         # Slider Orden (Butterworth)
         tk.Label(f_params, text="Orden (Solo Butterworth):", bg=COLOR_BG, fg="white").pack(anchor="w")
-        self.slider_orden = tk.Scale(f_params, from_=1, to=10, orient="horizontal", bg=COLOR_BG, fg="white", highlightthickness=0)
+        self.slider_orden = tk.Scale(f_params, from_=1, to=10, orient="horizontal", bg=COLOR_BG, fg="white", highlightthickness=0,
+                                    command=lambda _: self.al_mover_frecuencia())
         self.slider_orden.set(2)
         self.slider_orden.pack(fill="x", pady=2)
+
+        # Color: filtra R, G y B con la misma máscara en vez de pasar a grises
+        self.var_color_fft = tk.BooleanVar(value=False)
+        tk.Checkbutton(f_params, text="Color (por canal)", variable=self.var_color_fft, command=self.al_mover_frecuencia,
+                    bg=COLOR_BG, fg="white", selectcolor=COLOR_BG, activebackground=COLOR_BG).pack(anchor="w")
+
+        # Vista previa en vivo: los deslizadores recalculan sobre un proxy reducido
+        # y la imagen completa solo se procesa al pulsar "Aplicar"
+        self.var_vivo = tk.BooleanVar(value=False)
+        self.filtro_vivo = ('Gaussiano', 'Bajas')
+        f_vivo = tk.Frame(f_params, bg=COLOR_BG)
+        f_vivo.pack(fill="x", pady=2)
+        tk.Checkbutton(f_vivo, text="Vista previa en vivo", variable=self.var_vivo, command=self.alternar_vivo_frecuencia,
+                    bg=COLOR_BG, fg="white", selectcolor=COLOR_BG, activebackground=COLOR_BG).pack(side="left")
+        ttk.Button(f_vivo, text="✔ Aplicar", width=10, style="Gold.TButton",
+                command=self.confirmar_vivo_frecuencia).pack(side="right", padx=2)
         
         # Botones de Filtros
         # PASA BAJAS
@@ -635,15 +775,12 @@ class PDIApp:
         f_low.pack(fill="x", pady=5)
         tk.Label(f_low, text="Pasa Bajas (Suavizar):", bg=COLOR_BG, fg=COLOR_ACCENT).pack(anchor="w")
         
-        # Función auxiliar para obtener params
-        def get_params(): return (self.slider_cutoff.get(), self.slider_orden.get())
-        
         ttk.Button(f_low, text="Ideal", width=10, style="Gold.TButton",
-                   command=lambda: self.aplicar_filtro(practica7.aplicar_filtro_frecuencia, 'Ideal', 'Bajas', *get_params())).pack(side="left", padx=2)
+                   command=lambda: self.filtro_frecuencia('Ideal', 'Bajas')).pack(side="left", padx=2)
         ttk.Button(f_low, text="Gaussiano", width=10, style="Gold.TButton",
-                   command=lambda: self.aplicar_filtro(practica7.aplicar_filtro_frecuencia, 'Gaussiano', 'Bajas', *get_params())).pack(side="left", padx=2)
+                   command=lambda: self.filtro_frecuencia('Gaussiano', 'Bajas')).pack(side="left", padx=2)
         ttk.Button(f_low, text="Butterworth", width=10, style="Gold.TButton",
-                   command=lambda: self.aplicar_filtro(practica7.aplicar_filtro_frecuencia, 'Butterworth', 'Bajas', *get_params())).pack(side="left", padx=2)
+                   command=lambda: self.filtro_frecuencia('Butterworth', 'Bajas')).pack(side="left", padx=2)
 
         # PASA ALTAS
         f_high = tk.Frame(lf_filter, bg=COLOR_BG)
@@ -651,11 +788,108 @@ class PDIApp:
         tk.Label(f_high, text="Pasa Altas (Bordes):", bg=COLOR_BG, fg=COLOR_ACCENT).pack(anchor="w")
         
         ttk.Button(f_high, text="Ideal", width=10, style="Gold.TButton",
-                   command=lambda: self.aplicar_filtro(practica7.aplicar_filtro_frecuencia, 'Ideal', 'Altas', *get_params())).pack(side="left", padx=2)
+                   command=lambda: self.filtro_frecuencia('Ideal', 'Altas')).pack(side="left", padx=2)
         ttk.Button(f_high, text="Gaussiano", width=10, style="Gold.TButton",
-                   command=lambda: self.aplicar_filtro(practica7.aplicar_filtro_frecuencia, 'Gaussiano', 'Altas', *get_params())).pack(side="left", padx=2)
+                   command=lambda: self.filtro_frecuencia('Gaussiano', 'Altas')).pack(side="left", padx=2)
         ttk.Button(f_high, text="Butterworth", width=10, style="Gold.TButton",
-                   command=lambda: self.aplicar_filtro(practica7.aplicar_filtro_frecuencia, 'Butterworth', 'Altas', *get_params())).pack(side="left", padx=2)
+                   command=lambda: self.filtro_frecuencia('Butterworth', 'Altas')).pack(side="left", padx=2)
+
+    # --- HELPERS PARA P7 ---
+
+    def params_frecuencia(self):
+        return (self.slider_cutoff.get(), self.slider_orden.get(), bool(self.var_color_fft.get()))
+
+    def filtro_frecuencia(self, tipo, modo):
+        if self.var_vivo.get():
+            # En vivo el botón solo elige el filtro; se aplica con "✔ Aplicar"
+            self.filtro_vivo = (tipo, modo)
+            self.mostrar_vista_previa(practica7.aplicar_filtro_frecuencia, tipo, modo, *self.params_frecuencia())
+        else:
+            self.aplicar_filtro(practica7.aplicar_filtro_frecuencia, tipo, modo, *self.params_frecuencia())
+
+    def al_mover_frecuencia(self):
+        if not self.var_vivo.get(): return
+        self.programar_vista_previa(
+            lambda: (practica7.aplicar_filtro_frecuencia, self.filtro_vivo + self.params_frecuencia()))
+
+    def alternar_vivo_frecuencia(self):
+        if self.var_vivo.get():
+            self.mostrar_vista_previa(practica7.aplicar_filtro_frecuencia, *self.filtro_vivo, *self.params_frecuencia())
+        else:
+            self.cancelar_vista_previa()
+
+    def confirmar_vivo_frecuencia(self):
+        self.cancelar_vista_previa()
+        self.aplicar_filtro(practica7.aplicar_filtro_frecuencia, *self.filtro_vivo, *self.params_frecuencia())
+
+    # --- VISTA PREVIA EN VIVO (DESLIZADORES) ---
+
+    def programar_vista_previa(self, obtener, espera_ms=60):
+        """Antirrebote: recalcula cuando el deslizador lleva espera_ms sin moverse"""
+        if self.id_vista_previa is not None:
+            self.root.after_cancel(self.id_vista_previa)
+
+        def disparar():
+            self.id_vista_previa = None
+            func, args = obtener()
+            self.mostrar_vista_previa(func, *args)
+
+        self.id_vista_previa = self.root.after(espera_ms, disparar)
+
+    def mostrar_vista_previa(self, func, *args):
+        """Aplica func al proxy reducido de la imagen activa y lo muestra en su panel MODIFICADA (sin grabar nada)"""
+        slot = self.active_slot.get()
+        img = self.estado_proc(slot)
+        if img is None or self.layout_actual not in (slot, 3): return
+        try:
+            res = func(self.reducir(img, vista_previa.reducida, vista_previa.LADO_PROXY), *args)
+        except Exception:
+            return # Valor intermedio no válido para la operación: se ignora
+        # Los paneles quedan mostrando el proxy; el siguiente renderizar_grilla los restaura
+        self.actualizar_panel(self.paneles[(slot, "img", "proc")], "img", res)
+        self.actualizar_panel(self.paneles[(slot, "histo", "proc")], "histo", res)
+
+    def cancelar_vista_previa(self):
+        if self.id_vista_previa is not None:
+            self.root.after_cancel(self.id_vista_previa)
+            self.id_vista_previa = None
+        self.renderizar_grilla()
+
+    def dialogo_deslizador(self, titulo, etiqueta, desde, hasta, inicial, resolucion, func, tipo):
+        """Pide un parámetro con un deslizador en vivo; la imagen completa solo se procesa al Aplicar"""
+        slot = self.active_slot.get()
+        if self.data[slot]["orig"] is None:
+            messagebox.showwarning("Error", f"No hay imagen cargada en el Slot {slot}")
+            return
+
+        vent = tk.Toplevel(self.root)
+        vent.title(titulo)
+        vent.configure(bg=COLOR_BG)
+        vent.transient(self.root)
+        tk.Label(vent, text=etiqueta, bg=COLOR_BG, fg="white").pack(anchor="w", padx=10, pady=(10, 0))
+        
+        escala = tk.Scale(vent, from_=desde, to=hasta, resolution=resolucion, orient="horizontal", length=300,
+                        bg=COLOR_BG, fg="white", highlightthickness=0)
+        escala.set(inicial)
+        escala.config(command=lambda _: self.programar_vista_previa(lambda: (func, (tipo(escala.get()),))))
+        escala.pack(fill="x", padx=10, pady=5)
+
+        def aplicar():
+            valor = tipo(escala.get())
+            vent.destroy()
+            self.cancelar_vista_previa()
+            self.aplicar_filtro(func, valor)
+
+        def cancelar():
+            vent.destroy()
+            self.cancelar_vista_previa()
+
+        f_btn = tk.Frame(vent, bg=COLOR_BG)
+        f_btn.pack(fill="x", padx=10, pady=10)
+        ttk.Button(f_btn, text="✔ Aplicar", style="Gold.TButton", command=aplicar).pack(side="left", padx=2)
+        ttk.Button(f_btn, text="Cancelar", style="Red.TButton", command=cancelar).pack(side="right", padx=2)
+        vent.protocol("WM_DELETE_WINDOW", cancelar)
+        self.mostrar_vista_previa(func, tipo(inicial))
 
     # --- FUNCIONES AUXILIARES PARA PESTAÑA 2 ---------------------------------------------------------------------------
     
@@ -714,15 +948,24 @@ class PDIApp:
     # --- LÓGICA DE GESTIÓN DE DATOS ---
 
     def cargar_imagen(self, slot):
-        path = filedialog.askopenfilename(filetypes=[("Imagenes", "*.jpg *.png *.bmp *.tif")])
+        path = filedialog.askopenfilename(filetypes=[("Imagenes", "*.jpg *.png *.bmp *.tif *.tiff *.npy")])
         if not path: return
-        img = cv2.imread(path)
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        try:
+            # .npy y TIFF sin compresión quedan mapeados en memoria (lectura perezosa)
+            img = carga.abrir_imagen(path)
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
         
-        # Guardar en estructura de datos
+        # Guardar en estructura de datos. La imagen es de solo lectura y las
+        # operaciones nunca modifican su entrada: original y procesada
+        # comparten el mismo arreglo hasta el primer filtro (copia en escritura).
         self.data[slot]["orig"] = img
-        self.data[slot]["proc"] = img.copy()
-        self.data[slot]["hist"] = [] # Reset historial
+        self.data[slot]["proc"] = img
+        self.data[slot]["cadena"] = None
+        self.data[slot]["hist"] = Historial() # Reset historial
+        self.data[slot]["receta"] = Receta()
+        self.data[slot]["receta_hist"] = []
         
         # Lógica de Cambio de Vista Automático
         has_1 = self.data[1]["orig"] is not None
@@ -743,7 +986,7 @@ class PDIApp:
         if self.data[slot]["orig"] is None: return
         
         # Limpiar datos
-        self.data[slot] = {"orig": None, "proc": None, "hist": []}
+        self.data[slot] = self.slot_vacio()
         
         # Ajustar vista si borramos la activa
         other = 1 if slot == 2 else 2
@@ -764,26 +1007,155 @@ class PDIApp:
             messagebox.showwarning("Error", f"No hay imagen cargada en el Slot {slot}")
             return
         
-        # Guardar en historial antes de modificar
-        img_actual = self.data[slot]["proc"]
-        self.data[slot]["hist"].append(img_actual.copy())
-        
-        # Procesar (SIEMPRE sobre la original del slot, o sobre la actual si quisieras encadenar efectos.
-        # Por simplicidad y robustez, aplicamos sobre la ORIGINAL del slot como base para filtros absolutos
-        # PERO para deshacer funcione bien con flujo continuo, aplicamos sobre la ACTUAL si es acumulativo?
-        # En tu prompt pides volver a la previa. Asumiremos flujo acumulativo para que "Deshacer" tenga sentido.
-        
-        # MODIFICACIÓN: Aplicamos sobre la procesada actual para permitir encadenamiento, 
-        # o sobre la original si la función lo requiere.
-        # Para filtros como grises/binarizar, normalmente se parte de la original para no degradar.
-        # Usaremos la imagen procesada actual como input:
-        try:
-            res = func_logica(self.data[slot]["proc"], *args)
-            self.data[slot]["proc"] = res
+        # Flujo acumulativo: la operación se aplica sobre la imagen procesada
+        # actual para que "Deshacer" tenga sentido. Corre en segundo plano; la
+        # entrada se toma cuando le toca, así varios clics seguidos se encadenan.
+        estado = {}
+        clic = trazas.ahora()
+        nombre = trazas.nombre_funcion(func_logica)
+
+        def preparar():
+            estado["entrada"] = self.data[slot]["proc"]
+            if estado["entrada"] is None: return None
+            cadena = estado["cadena"] = self.data[slot]["cadena"]
+            pendiente = cadena or puntual.CadenaPuntual(estado["entrada"])
+            if pendiente.puede_fusionar(nombre):
+                # Operación puntual: solo se compone su LUT con la pendiente; los
+                # píxeles se calculan una vez, cuando algo los necesita
+                def trabajo():
+                    with trazas.tramo("operacion", op=nombre, diferida=True):
+                        return pendiente.extendida(nombre, func_logica, args)
+                return trabajo
+            # Las imágenes grandes se procesan por teselas (cancelable, con progreso)
+            def trabajo():
+                with trazas.tramo("operacion", op=nombre):
+                    return teselas.ejecutar(pendiente.calcular(), func_logica, *args)
+            return trabajo
+
+        def al_terminar(res):
+            # Si mientras tanto se deshizo, reseteó o cambió la imagen, el resultado ya no aplica
+            if not self.estado_sin_cambios(slot, estado): return
+            # Guardar en historial (sin copiar: las operaciones devuelven siempre un arreglo nuevo)
+            with trazas.tramo("historial"):
+                self.guardar_estado(slot)
+            self.fijar_estado(slot, res)
+            self.grabar_paso(slot, func_logica, args)
             self.renderizar_grilla() # Actualizar visualización
-        except Exception as e:
-            messagebox.showerror("Error PDI", str(e))
-            if self.data[slot]["hist"]: self.data[slot]["hist"].pop() # Revertir historial si falló
+            # Del clic al redibujo: cola + operación + historial + render
+            trazas.asincrono(f"clic {nombre}", clic)
+
+        self.trabajador.enviar((slot, func_logica, args), preparar, al_terminar,
+                            lambda e: messagebox.showerror("Error PDI", str(e)))
+
+    # --- OPERACIONES PUNTUALES DIFERIDAS ---
+    # Gamma, potencia, escalares... se componen en una LUT pendiente (CadenaPuntual)
+    # en lugar de recorrer la imagen en cada clic. Los paneles la muestran sobre
+    # la imagen reducida; los píxeles completos se calculan en una sola pasada
+    # cuando llega una operación no puntual, cuando se guardan o se usan fuera
+    # del slot, o tras ESPERA_MATERIALIZAR_MS sin más operaciones.
+
+    def estado_proc(self, slot):
+        """La imagen procesada tal como se muestra: la cadena pendiente o el arreglo"""
+        cadena = self.data[slot]["cadena"]
+        return self.data[slot]["proc"] if cadena is None else cadena
+
+    def imagen_proc(self, slot):
+        """Píxeles de la imagen procesada (aplica la LUT pendiente, una sola vez por cadena)"""
+        cadena = self.data[slot]["cadena"]
+        return self.data[slot]["proc"] if cadena is None else cadena.calcular()
+
+    def estado_sin_cambios(self, slot, estado):
+        return self.data[slot]["proc"] is estado["entrada"] and self.data[slot]["cadena"] is estado["cadena"]
+
+    def guardar_estado(self, slot):
+        # Con una cadena pendiente el historial guarda solo su LUT (ver src.historial)
+        self.data[slot]["hist"].append(self.estado_proc(slot))
+
+    def fijar_estado(self, slot, res):
+        """res: arreglo, o CadenaPuntual sobre su base (resultado diferido o estado deshecho)"""
+        if isinstance(res, puntual.CadenaPuntual):
+            self.data[slot]["proc"] = res.base
+            self.data[slot]["cadena"] = res if res.pendiente() else None
+            if res.pendiente(): self.programar_materializacion(slot)
+        else:
+            self.data[slot]["proc"] = res
+            self.data[slot]["cadena"] = None
+
+    def programar_materializacion(self, slot):
+        if self.id_materializar[slot] is not None:
+            self.root.after_cancel(self.id_materializar[slot])
+        self.id_materializar[slot] = self.root.after(ESPERA_MATERIALIZAR_MS, lambda: self.materializar(slot))
+
+    def materializar(self, slot):
+        """Calcula en segundo plano los píxeles de la cadena pendiente (mismo estado: el historial no cambia)"""
+        self.id_materializar[slot] = None
+        estado = {}
+
+        def preparar():
+            estado["entrada"] = self.data[slot]["proc"]
+            estado["cadena"] = self.data[slot]["cadena"]
+            if estado["cadena"] is None: return None
+            def trabajo():
+                with trazas.tramo("operacion", op="lut diferida"):
+                    return estado["cadena"].calcular()
+            return trabajo
+
+        def al_terminar(res):
+            if not self.estado_sin_cambios(slot, estado): return
+            self.fijar_estado(slot, res)
+            self.renderizar_grilla() # Histogramas exactos en lugar de los del proxy
+
+        self.trabajador.enviar((slot, "materializar"), preparar, al_terminar,
+                            lambda e: messagebox.showerror("Error PDI", str(e)))
+
+    def reducir(self, img, reducir, lado):
+        """reducir(img, lado) de un arreglo, o de la base de una cadena pendiente aplicándole su LUT"""
+        if isinstance(img, puntual.CadenaPuntual):
+            return img.aplicar_a(reducir(img.base, lado))
+        return reducir(img, lado)
+
+    def histogramas(self, img):
+        """Histograma por canal (uno en grises); de una cadena pendiente, sin calcular sus píxeles"""
+        if not isinstance(img, puntual.CadenaPuntual):
+            return [histograma.histograma(img, i) for i in range(1 if len(img.shape) == 2 else 3)]
+        base = img.base
+        if len(base.shape) == 2 or img.dominio == "RGB":
+            # La LUT reparte cada nivel de la base en otro: exacto sin recorrer la imagen
+            return [puntual.histograma_lut(h, img.lut) for h in self.histogramas(base)]
+        # Dominio V a color: R, G y B no dependen solo de su propio nivel; se
+        # estima con el proxy hasta que se materialice
+        proxy = self.reducir(img, vista_previa.reducida, vista_previa.LADO_PROXY)
+        escala = base.shape[0] * base.shape[1] / (proxy.shape[0] * proxy.shape[1])
+        return [histograma.histograma(proxy, i) * escala for i in range(3)]
+
+    def cancelar_tarea(self):
+        self.trabajador.cancelar()
+
+    def actualizar_estado_tarea(self, ocupado, progreso, en_cola):
+        if not ocupado:
+            self.barra_progreso.stop()
+            self.barra_progreso.config(mode="determinate", value=0)
+            self.modo_barra = "determinate"
+            self.lbl_tarea.config(text="")
+            self.btn_cancelar.config(state="disabled")
+            return
+        
+        self.lbl_tarea.config(text="Procesando..." + (f" (+{en_cola} en cola)" if en_cola else ""))
+        self.btn_cancelar.config(state="normal")
+        # Sin progreso informado: barra indeterminada (solo indica que está ocupado)
+        modo = "indeterminate" if progreso is None else "determinate"
+        if modo != self.modo_barra:
+            self.barra_progreso.stop()
+            self.barra_progreso.config(mode=modo)
+            if modo == "indeterminate": self.barra_progreso.start(15)
+            self.modo_barra = modo
+        if progreso is not None:
+            self.barra_progreso.config(value=progreso)
+
+    def grabar_paso(self, slot, func_logica, args):
+        receta = self.data[slot]["receta"]
+        self.data[slot]["receta_hist"].append(list(receta.pasos))
+        receta.registrar(func_logica, args)
 
     def deshacer(self):
         slot = self.active_slot.get()
@@ -792,22 +1164,25 @@ class PDIApp:
             messagebox.showinfo("Info", f"No hay acciones para deshacer en Imagen {slot}")
             return
         
-        # Recuperar penúltimo estado
-        prev = historia.pop()
-        self.data[slot]["proc"] = prev
+        # Recuperar penúltimo estado (quizá una cadena pendiente sobre su base)
+        self.fijar_estado(slot, historia.pop())
+        if self.data[slot]["receta_hist"]:
+            self.data[slot]["receta"].pasos = self.data[slot]["receta_hist"].pop()
         self.renderizar_grilla()
 
     def reset_imagen(self):
         slot = self.active_slot.get()
         if self.data[slot]["orig"] is None: return
         
-        self.data[slot]["hist"].append(self.data[slot]["proc"].copy())
-        self.data[slot]["proc"] = self.data[slot]["orig"].copy()
+        self.guardar_estado(slot)
+        self.fijar_estado(slot, self.data[slot]["orig"])
+        self.data[slot]["receta_hist"].append(self.data[slot]["receta"].pasos)
+        self.data[slot]["receta"].pasos = []
         self.renderizar_grilla()
 
     def guardar_imagen(self):
         slot = self.active_slot.get()
-        img = self.data[slot]["proc"]
+        img = self.imagen_proc(slot)
         if img is None: return
         
         path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[("PNG", "*.png"), ("JPG", "*.jpg")])
@@ -815,6 +1190,115 @@ class PDIApp:
             if len(img.shape) == 3: img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
             cv2.imwrite(path, img)
 
+    # --- RECETAS ---
+
+    def guardar_receta(self):
+        slot = self.active_slot.get()
+        receta = self.data[slot]["receta"]
+        if not receta.pasos:
+            messagebox.showinfo("Info", f"No hay operaciones grabadas en Imagen {slot}")
+            return
+
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Receta JSON", "*.json")])
+        if path:
+            receta.guardar(path)
+
+    def aplicar_receta(self):
+        slot = self.active_slot.get()
+        if self.data[slot]["orig"] is None:
+            messagebox.showwarning("Error", f"No hay imagen cargada en el Slot {slot}")
+            return
+
+        path = filedialog.askopenfilename(filetypes=[("Receta JSON", "*.json")])
+        if not path: return
+        try:
+            receta = Receta.cargar(path)
+        except Exception as e:
+            messagebox.showerror("Error Receta", str(e))
+            return
+
+        otro = 2 if slot == 1 else 1
+        estado = {}
+        clic = trazas.ahora()
+
+        def preparar():
+            # Se reproduce toda la cadena en segundo plano y se redibuja UNA sola vez al final
+            estado["entrada"] = self.data[slot]["proc"]
+            if estado["entrada"] is None: return None
+            cadena = estado["cadena"] = self.data[slot]["cadena"]
+            secundaria = self.imagen_proc(otro)
+            def trabajo():
+                with trazas.tramo("operacion", op="receta", pasos=len(receta)):
+                    entrada = estado["entrada"] if cadena is None else cadena.calcular()
+                    return receta.aplicar(entrada, secundaria)
+            return trabajo
+
+        def al_terminar(res):
+            if not self.estado_sin_cambios(slot, estado): return
+            # Toda la receta cuenta como una sola acción para Deshacer
+            self.guardar_estado(slot)
+            self.data[slot]["receta_hist"].append(list(self.data[slot]["receta"].pasos))
+            self.data[slot]["receta"].extender(receta)
+            self.fijar_estado(slot, res)
+            self.renderizar_grilla()
+            trazas.asincrono("clic receta", clic)
+
+        self.trabajador.enviar((slot, "receta", path), preparar, al_terminar,
+                            lambda e: messagebox.showerror("Error Receta", str(e)))
+
+    # --- LATENCIAS (TRAZAS) ---
+
+    def abrir_panel_latencias(self):
+        if getattr(self, "vent_latencias", None) is not None and self.vent_latencias.winfo_exists():
+            self.vent_latencias.lift()
+            return
+
+        vent = self.vent_latencias = tk.Toplevel(self.root)
+        vent.title("Latencias por tramo")
+        vent.geometry("640x420")
+        vent.configure(bg=COLOR_BG)
+
+        barra = tk.Frame(vent, bg=COLOR_BG)
+        barra.pack(side="top", fill="x", padx=5, pady=5)
+        var_activo = tk.BooleanVar(value=trazas.activo())
+        var_memoria = tk.BooleanVar(value=False)
+
+        def cambiar():
+            if var_activo.get(): trazas.activar(memoria=var_memoria.get())
+            else: trazas.desactivar()
+
+        ttk.Checkbutton(barra, text="Registrar", variable=var_activo, command=cambiar).pack(side="left", padx=5)
+        ttk.Checkbutton(barra, text="Memoria (más lento)", variable=var_memoria, command=cambiar).pack(side="left", padx=5)
+        ttk.Button(barra, text="Limpiar", command=trazas.limpiar).pack(side="right", padx=2)
+        ttk.Button(barra, text="💾 Exportar traza", style="Gold.TButton",
+                command=self.exportar_trazas).pack(side="right", padx=2)
+
+        columnas = ("n", "ultimo", "mediana", "p95", "cpu", "mb")
+        tabla = ttk.Treeview(vent, columns=columnas, show="tree headings")
+        tabla.heading("#0", text="Tramo")
+        tabla.column("#0", width=220)
+        for col, titulo in zip(columnas, ("N", "Último ms", "Mediana ms", "p95 ms", "CPU ms", "MB netos")):
+            tabla.heading(col, text=titulo)
+            tabla.column(col, width=65, anchor="e")
+        tabla.pack(fill="both", expand=True, padx=5, pady=(0, 5))
+
+        def refrescar():
+            if not vent.winfo_exists(): return
+            tabla.delete(*tabla.get_children())
+            # Los más lentos arriba: ahí se va el tiempo del clic
+            for nombre, n, ultimo, mediana, p95, cpu, mb in sorted(trazas.resumen(), key=lambda f: -f[3]):
+                valores = (n, f"{ultimo:.1f}", f"{mediana:.1f}", f"{p95:.1f}",
+                        "-" if cpu is None else f"{cpu:.1f}", "-" if mb is None else f"{mb:.1f}")
+                tabla.insert("", "end", text=nombre, values=valores)
+            vent.after(500, refrescar)
+        refrescar()
+
+    def exportar_trazas(self):
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Traza Chrome", "*.json")])
+        if not path: return
+        n = trazas.exportar(path)
+        messagebox.showinfo("Trazas", f"{n} eventos guardados.\nÁbrelos en chrome://tracing o ui.perfetto.dev")
+
     # --- VISUALIZACIÓN Y GRILLA (NUEVA LÓGICA) ---
 
     def actualizar_controles_vista(self):
@@ -840,146 +1324,122 @@ class PDIApp:
         self.renderizar_grilla()
 
     def inicializar_grilla(self):
-        # Crea placeholders vacíos
+        # Paneles persistentes: (slot, "img"|"histo", "orig"|"proc") -> widgets.
+        # Se crean una vez y solo se redibujan cuando cambia SU imagen.
+        self.paneles = {}
+        self.layout_actual = None
         self.renderizar_grilla()
 
+    def layout_vista(self, mode):
+        """[(clave_panel, titulo, fila, columna)] de cada panel visible en el modo"""
+        if mode in (1, 2):
+            base = f"IMAGEN {mode}"
+            return [((mode, "img", "orig"), f"{base} - ORIGINAL", 0, 0),
+                    ((mode, "img", "proc"), f"{base} - MODIFICADA", 0, 1),
+                    ((mode, "histo", "orig"), None, 1, 0),
+                    ((mode, "histo", "proc"), None, 1, 1)]
+        layout = []
+        for slot in (1, 2):
+            c = 2 * (slot - 1)
+            layout += [((slot, "img", "orig"), f"IMG {slot} - ORIG", 0, c),
+                       ((slot, "img", "proc"), f"IMG {slot} - MOD", 0, c + 1),
+                       ((slot, "histo", "orig"), None, 1, c),
+                       ((slot, "histo", "proc"), None, 1, c + 1)]
+        return layout
+
     def renderizar_grilla(self):
-        # Limpiar todo el área de grilla
-        for widget in self.grid_area.winfo_children(): widget.destroy()
-        
+        with trazas.tramo("renderizar_grilla"):
+            self._renderizar_grilla()
+
+    def _renderizar_grilla(self):
         mode = self.view_mode.get()
-        
-        # --- CASO A: VISTA SIMPLE (2x2) ---
-        if mode == 1 or mode == 2:
-            slot = mode
-            # Datos a mostrar
-            d_orig = self.data[slot]["orig"]
-            d_proc = self.data[slot]["proc"]
-            titulo_base = f"IMAGEN {slot}"
-            
-            # Configurar Grid 2x2
-            self.grid_area.columnconfigure(0, weight=1)
-            self.grid_area.columnconfigure(1, weight=1)
+        layout = self.layout_vista(mode)
+
+        # Cambio de modo de vista: recolocar paneles (sin destruirlos)
+        if mode != self.layout_actual:
+            visibles = {clave for clave, _, _, _ in layout}
+            for clave, panel in self.paneles.items():
+                if clave not in visibles: panel["frame"].grid_forget()
+            # 2x2 en vista simple, 2x4 en vista dual
+            for c in range(4):
+                self.grid_area.columnconfigure(c, weight=1 if c < (4 if mode == 3 else 2) else 0)
             self.grid_area.rowconfigure(0, weight=3) # Imagenes
             self.grid_area.rowconfigure(1, weight=1) # Histogramas
-            
-            # Crear Widgets
-            self.crear_panel_imagen(self.grid_area, d_orig, f"{titulo_base} - ORIGINAL", 0, 0)
-            self.crear_panel_imagen(self.grid_area, d_proc, f"{titulo_base} - MODIFICADA", 0, 1)
-            self.crear_panel_histo(self.grid_area, d_orig, 1, 0)
-            self.crear_panel_histo(self.grid_area, d_proc, 1, 1)
-
-        # --- CASO B: VISTA DUAL (2x4) ---
-        elif mode == 3:
-            # Configurar Grid 2x4
-            for c in range(4): self.grid_area.columnconfigure(c, weight=1)
-            self.grid_area.rowconfigure(0, weight=3)
-            self.grid_area.rowconfigure(1, weight=1)
-            
-            # Slot 1 (Columnas 0 y 1)
-            self.crear_panel_imagen(self.grid_area, self.data[1]["orig"], "IMG 1 - ORIG", 0, 0)
-            self.crear_panel_imagen(self.grid_area, self.data[1]["proc"], "IMG 1 - MOD", 0, 1)
-            self.crear_panel_histo(self.grid_area, self.data[1]["orig"], 1, 0)
-            self.crear_panel_histo(self.grid_area, self.data[1]["proc"], 1, 1)
-            
-            # Slot 2 (Columnas 2 y 3)
-            self.crear_panel_imagen(self.grid_area, self.data[2]["orig"], "IMG 2 - ORIG", 0, 2)
-            self.crear_panel_imagen(self.grid_area, self.data[2]["proc"], "IMG 2 - MOD", 0, 3)
-            self.crear_panel_histo(self.grid_area, self.data[2]["orig"], 1, 2)
-            self.crear_panel_histo(self.grid_area, self.data[2]["proc"], 1, 3)
+
+        for clave, titulo, r, c in layout:
+            slot, tipo, cual = clave
+            panel = self.paneles.get(clave)
+            if panel is None:
+                crear = self.crear_panel_imagen if tipo == "img" else self.crear_panel_histo
+                panel = self.paneles[clave] = crear(self.grid_area)
+            if mode != self.layout_actual:
+                panel["frame"].grid(row=r, column=c, sticky="nsew", padx=2, pady=2)
+                if titulo: panel["titulo"].config(text=titulo)
+            self.actualizar_panel(panel, tipo, self.estado_proc(slot) if cual == "proc" else self.data[slot][cual])
+        self.layout_actual = mode
+
+    def actualizar_panel(self, panel, tipo, img_data):
+        # Las imágenes nunca se modifican en sitio: el propio arreglo es su versión
+        if panel["img"] is img_data: return
+        panel["img"] = img_data
+        if tipo == "img":
+            if img_data is None: panel["lbl"].config(image="", text="[Vacio]")
+            else: self.mostrar_imagen_en_label(img_data, panel["lbl"])
+            return
+        with trazas.tramo("histograma"):
+            if img_data is None:
+                panel["histo"].limpiar()
+            else:
+                self.dibujar_histo(panel["histo"], img_data)
 
     # --- HELPERS VISUALES ---
-    def crear_panel_imagen(self, parent, img_data, titulo, r, c):
+    def crear_panel_imagen(self, parent):
         frame = tk.Frame(parent, bg="black", bd=1, relief="sunken")
-        frame.grid(row=r, column=c, sticky="nsew", padx=2, pady=2)
-        tk.Label(frame, text=titulo, bg="black", fg="white", font=("Arial", 8)).pack(side="top", fill="x")
+        titulo = tk.Label(frame, text="", bg="black", fg="white", font=("Arial", 8))
+        titulo.pack(side="top", fill="x")
         lbl = tk.Label(frame, bg="#111", text="[Vacio]")
         lbl.pack(fill="both", expand=True)
-        
-        if img_data is not None:
-            self.mostrar_imagen_en_label(img_data, lbl)
+        return {"frame": frame, "titulo": titulo, "lbl": lbl, "img": None}
 
-    def crear_panel_histo(self, parent, img_data, r, c):
+    def crear_panel_histo(self, parent):
         frame = tk.Frame(parent, bg=COLOR_BG)
-        frame.grid(row=r, column=c, sticky="nsew", padx=2, pady=2)
-        
-        fig = Figure(figsize=(2, 1.5), dpi=70, facecolor=COLOR_BG)
-        ax = fig.add_subplot(111)
-        ax.set_facecolor(COLOR_BG)
-        ax.tick_params(colors='white', labelsize=5)
-        for spine in ax.spines.values(): spine.set_color(COLOR_BG)
-        ax.spines['bottom'].set_color('white')
-        ax.spines['left'].set_color('white')
-        
-        canvas = FigureCanvasTkAgg(fig, master=frame)
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        
-        if img_data is not None:
-            self.dibujar_histo(ax, img_data)
-            canvas.draw()
+        # Lienzo de Tk: al cambiar la imagen solo se mueven las polilíneas
+        histo = lienzo_histograma.LienzoHistograma(frame, bg=COLOR_BG)
+        histo.pack(fill="both", expand=True)
+        return {"frame": frame, "histo": histo, "img": None}
 
     def mostrar_imagen_en_label(self, img_arr, lbl):
-        # Determinar tamaño dinámico según el label (o fijo pequeño para la grilla 2x4)
-        h, w = img_arr.shape[:2]
-        
-        # Convertir a RGB para PIL
-        if len(img_arr.shape) == 2:
-            disp = cv2.cvtColor(img_arr, cv2.COLOR_GRAY2RGB)
-        else:
-            disp = img_arr
-            
-        pil_img = Image.fromarray(disp)
-        pil_img.thumbnail((350, 350)) # Thumbnail max size
-        tk_img = ImageTk.PhotoImage(pil_img)
-        lbl.config(image=tk_img, text="")
+        # Vista previa en caché por versión: se reduce desde el nivel de la
+        # pirámide más cercano y solo se sube a Tk una imagen de <= 350 px
+        with trazas.tramo("vista_previa"):
+            disp = self.reducir(img_arr, vista_previa.vista_previa, vista_previa.LADO_PANEL)
+        
+        with trazas.tramo("PhotoImage"):
+            pil_img = Image.fromarray(disp)
+            tk_img = ImageTk.PhotoImage(pil_img)
+            lbl.config(image=tk_img, text="")
         lbl.image = tk_img
 
-    # --- Reemplazar esta función en interfaz.py ---
-    def dibujar_histo(self, ax, img_arr, es_hue=False):
-        ax.clear()
+    def dibujar_histo(self, lienzo, img_arr, es_hue=False):
+        Serie = lienzo_histograma.Serie
         
         # CASO ESPECIAL: Histograma de Matiz (Multicolor)
         if es_hue:
-            # La imagen img_arr viene en RGB (arcoiris). 
-            # Convertimos a HSV para contar los valores reales de H (0-179)
-            hsv_temp = cv2.cvtColor(img_arr, cv2.COLOR_RGB2HSV)
-            hist = cv2.calcHist([hsv_temp], [0], None, [180], [0, 180])
-            
-            # Dibujar barra por barra con su color correspondiente
-            # Esto puede ser un poco lento, pero es la forma de tener el arcoiris exacto
-            bins = np.arange(180)
-            vals = hist.flatten()
-            
-            # Crear mapa de colores para las barras
-            colors = []
-            for h_val in range(180):
-                # Convertir H(0-179) S(255) V(255) a RGB normalizado (0-1) para matplotlib
-                rgb_norm = cv2.cvtColor(np.uint8([[[h_val, 255, 255]]]), cv2.COLOR_HSV2RGB)[0][0] / 255.0
-                colors.append(rgb_norm)
-            
-            ax.bar(bins, vals, color=colors, width=1.0)
-            ax.set_xlim([0, 180])
+            # La imagen img_arr viene en RGB (arcoiris); se cuentan los valores reales de H (0-179)
+            vals = histograma.histograma_matiz(img_arr)
+            # Las 180 barras con su color exacto (tabla de colores precalculada)
+            lienzo.mostrar([Serie(vals, None, barras=COLORES_MATIZ_TK)], niveles=180)
+            return
             
+        # Histogramas en caché por versión de imagen: redibujar no recorre los píxeles
+        hists = self.histogramas(img_arr)
         # CASO NORMAL: Escala de Grises (1 canal)
-        elif len(img_arr.shape) == 2:
-            hist = cv2.calcHist([img_arr], [0], None, [256], [0, 256])
-            ax.plot(hist, color='white', linewidth=1)
-            ax.fill_between(range(256), hist.flatten(), color='gray', alpha=0.3)
-            ax.set_xlim([0, 256])
+        if len(hists) == 1:
+            lienzo.mostrar([Serie(hists[0], "white", relleno=COLOR_RELLENO_GRIS)])
             
         # CASO NORMAL: RGB (3 canales)
         else:
-            for i, col in enumerate(['r', 'g', 'b']):
-                hist = cv2.calcHist([img_arr], [i], None, [256], [0, 256])
-                ax.plot(hist, color=col, linewidth=1)
-            ax.set_xlim([0, 256])
-
-        # Ajustes finales de estilo
-        ax.set_facecolor(COLOR_BG)
-        ax.tick_params(colors='white', labelsize=6)
-        for spine in ax.spines.values(): spine.set_color(COLOR_BG)
-        ax.spines['bottom'].set_color('white')
-        ax.spines['left'].set_color('white')
+            lienzo.mostrar([Serie(h, col) for h, col in zip(hists, COLORES_RGB_HISTO)])
 
     # --- POPUP CANALES (Igual que antes pero adaptado a data) ---
     # --- Reemplazar esta función en interfaz.py ---
@@ -993,15 +1453,14 @@ class PDIApp:
         vent.geometry("1000x800")
         vent.configure(bg=COLOR_BG)
         
-        # Obtener imágenes procesadas
+        # Obtener imágenes procesadas (en caché mientras la original no cambie,
+        # así sus histogramas también se reutilizan al reabrir la ventana)
+        imgs = [img] + list(histograma.canales_visuales(img, modelo))
         if modelo == "RGB":
-            imgs = [img] + list(practica1.obtener_canales_rgb_visual(img))
             lbls = ["Original", "Rojo", "Verde", "Azul"]
         elif modelo == "HSV":
-            imgs = [img] + list(practica1.obtener_canales_hsv_visual(img))
             lbls = ["Original", "Hue (Matiz)", "Sat (Saturación)", "Val (Brillo)"]
         elif modelo == "CMY":
-            imgs = [img] + list(practica1.obtener_canales_cmy_visual(img))
             lbls = ["Original", "Cian", "Magenta", "Amarillo"]
 
         # Configurar Grilla
@@ -1022,13 +1481,9 @@ class PDIApp:
             f_hist = tk.Frame(vent, bg=COLOR_BG)
             f_hist.grid(row=i, column=1, sticky="nsew", padx=5, pady=2)
             
-            fig = Figure(figsize=(4, 2), dpi=60, facecolor=COLOR_BG)
-            ax = fig.add_subplot(111)
-            ax.set_facecolor(COLOR_BG)
-            ax.tick_params(colors='white', labelsize=6)
-            canvas = FigureCanvasTkAgg(fig, master=f_hist)
-            canvas.get_tk_widget().pack(fill="both", expand=True)
+            lienzo = lienzo_histograma.LienzoHistograma(f_hist, ancho=240, alto=120, bg=COLOR_BG)
+            lienzo.pack(fill="both", expand=True)
             
             # DETECCIÓN ESPECIAL: Si estamos en HSV y es el canal Hue (índice 1 en la lista)
             es_hue = (modelo == "HSV" and i == 1)
-            self.dibujar_histo(ax, im, es_hue=es_hue) # Pasamos el flag
\ No newline at end of file
+            self.dibujar_histo(lienzo, im, es_hue=es_hue) # Pasamos el flag
\ No newline at end of file
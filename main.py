@@ -1,8 +1,88 @@
+import time
+
+_INICIO = time.perf_counter()
+
+import argparse
+import os
+import subprocess
+import sys
 import tkinter as tk
-from interfaz import PDIApp
 
+# De lanzar main.py a la ventana dibujada y atendiendo eventos
+PRESUPUESTO_ARRANQUE_S = 0.5
 
-if __name__ == "__main__":
+
+def informe_importaciones(modulo="interfaz", n=12):
+    """
+    Importaciones más lentas de `modulo` en un intérprete nuevo (python -X importtime):
+    [(acumulado_us, propio_us, nombre)] del propio módulo y de lo que importa directamente.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                          capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    filas, directas = [], []
+    for linea in proc.stderr.splitlines():
+        if not linea.startswith("import time:"): continue
+        partes = linea[len("import time:"):].split("|")
+        if len(partes) != 3 or not partes[0].strip().isdigit(): continue  # cabecera
+        # Dos espacios de sangría por nivel; los hijos se listan antes que su padre
+        nivel = (len(partes[2]) - len(partes[2].lstrip()) - 1) // 2
+        fila = (int(partes[1]), int(partes[0]), partes[2].strip())
+        if nivel == 1:
+            directas.append(fila)
+        elif nivel == 0:
+            # Lo de nivel 0 ajeno al módulo (site, encodings...) es el arranque del intérprete
+            if fila[2] == modulo: filas += directas + [fila]
+            directas = []
+    return sorted(filas, reverse=True)[:n]
+
+
+def perfil_arranque(presupuesto):
+    """Arranca la interfaz midiendo cada fase, la cierra e informa; 1 si excede el presupuesto"""
+    fases = [("Intérprete + tkinter", time.perf_counter() - _INICIO)]
+    t = time.perf_counter()
+    from interfaz import PDIApp
+    fases.append(("Importar interfaz", time.perf_counter() - t))
+    t = time.perf_counter()
+    root = tk.Tk()
+    PDIApp(root)
+    fases.append(("Construir ventana", time.perf_counter() - t))
+    t = time.perf_counter()
+    root.update()  # Primer dibujo: la ventana ya responde
+    fases.append(("Primer dibujo", time.perf_counter() - t))
+    total = time.perf_counter() - _INICIO
+    root.destroy()
+
+    print("--- ARRANQUE ---")
+    for nombre, segundos in fases:
+        print(f"{nombre:<24} {segundos * 1000:8.1f} ms")
+    print(f"{'Total':<24} {total * 1000:8.1f} ms (presupuesto {presupuesto * 1000:.0f} ms)")
+
+    print("\n--- IMPORTACIONES (python -X importtime, intérprete nuevo) ---")
+    for acumulado, propio, nombre in informe_importaciones():
+        print(f"{nombre:<36} {acumulado / 1000:8.1f} ms (propio {propio / 1000:.1f} ms)")
+
+    if total > presupuesto:
+        print(f"\nFUERA DE PRESUPUESTO: {total * 1000:.0f} ms > {presupuesto * 1000:.0f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sistema PDI")
+    parser.add_argument("--perfil-arranque", action="store_true",
+                        help="Medir el arranque (fases e importaciones) y salir")
+    parser.add_argument("--presupuesto", type=float, default=PRESUPUESTO_ARRANQUE_S,
+                        help="Segundos de arranque tolerados con --perfil-arranque")
+    a = parser.parse_args(argv)
+    if a.perfil_arranque:
+        return perfil_arranque(a.presupuesto)
+
+    from interfaz import PDIApp
     root = tk.Tk()
     app = PDIApp(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+Procesamiento por lotes sin interfaz gráfica.
+
+Ejemplo:
+    python procesar_lote.py "fotos/*.jpg" -o salida \\
+        --op practica4.filtro_gaussiano:5 --op practica5.seg_otsu
+
+Cada --op es "moduloN.funcion" seguido opcionalmente de ":" y los argumentos
+extra separados por comas (se interpretan como literales de Python), p. ej.
+    --op "practica7.aplicar_filtro_frecuencia:'Gaussiano','Bajas',15,2"
+
+También se puede reproducir una receta grabada desde la interfaz:
+    python procesar_lote.py fotos -o salida --receta mi_receta.json
+"""
+import argparse
+import ast
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import cv2
+
+from src import carga
+from src.receta import Receta, resolver_operacion
+
+EXTENSIONES = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".npy")
+
+# --- DEFINICIÓN DE LA CADENA DE OPERACIONES ---
+
+def parsear_operacion(texto):
+    """'practica4.filtro_gaussiano:5' -> paso de receta {'op': ..., 'args': [5]}"""
+    nombre, _, resto = texto.partition(":")
+    args = []
+    if resto.strip():
+        args = list(ast.literal_eval(f"({resto},)"))
+    # Validamos aquí para fallar antes de lanzar los procesos
+    resolver_operacion(nombre)
+    return {"op": nombre, "args": args}
+
+# --- E/S DE IMÁGENES (mismo convenio RGB que la interfaz) ---
+
+def leer_imagen(path):
+    # .npy y TIFF sin compresión se mapean en memoria en lugar de leerse enteros
+    return carga.abrir_imagen(path)
+
+def escribir_imagen(path, img):
+    if len(img.shape) == 3: img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+    if not cv2.imwrite(path, img):
+        raise ValueError(f"No se pudo escribir {path}")
+
+def listar_entradas(patrones):
+    """Acepta carpetas o patrones glob; devuelve rutas ordenadas sin duplicados"""
+    rutas = []
+    for patron in patrones:
+        if os.path.isdir(patron):
+            candidatos = [os.path.join(patron, f) for f in os.listdir(patron)]
+        else:
+            candidatos = glob.glob(patron)
+        rutas.extend(c for c in candidatos if c.lower().endswith(EXTENSIONES))
+    return sorted(set(rutas))
+
+def nombres_salida(rutas, formato):
+    """
+    Ruta de salida (relativa a la carpeta de salida) de cada entrada: la que
+    tiene bajo la carpeta común de todas las entradas, con la extensión del
+    formato. Si aun así dos entradas coinciden (x.jpg y x.png) ambas conservan
+    su extensión (x.jpg.png, x.png.png). Devuelve ({ruta: relativa}, colisiones)
+    con colisiones = [(nombre compartido, [rutas])].
+    """
+    rutas = [os.path.abspath(r) for r in rutas]
+    raiz = os.path.commonpath([os.path.dirname(r) for r in rutas]) if rutas else ""
+
+    def relativa(path, conservar_ext):
+        base, ext = os.path.splitext(os.path.relpath(path, raiz))
+        return f"{base}{ext if conservar_ext else ''}.{formato}"
+
+    grupos = {}
+    for path in rutas:
+        grupos.setdefault(os.path.normcase(relativa(path, False)), []).append(path)
+    nombres, colisiones, usados = {}, [], set()
+    for grupo in grupos.values():
+        if len(grupo) > 1:
+            colisiones.append((relativa(grupo[0], False), grupo))
+        for path in grupo:
+            nombre = relativa(path, len(grupo) > 1)
+            # Último recurso (x.jpg.png ya era el nombre de otra entrada): sufijo numérico
+            base, ext = os.path.splitext(nombre)
+            n = 1
+            while os.path.normcase(nombre) in usados:
+                n += 1
+                nombre = f"{base}_{n}{ext}"
+            usados.add(os.path.normcase(nombre))
+            nombres[path] = nombre
+    return nombres, colisiones
+
+# --- TRABAJADORES ---
+
+def inicializar_trabajador(hilos_cv):
+    # Cada proceso usa pocos hilos de OpenCV para no sobresuscribir los núcleos
+    cv2.setNumThreads(hilos_cv)
+
+def procesar_archivo(path, destino, receta, secundaria=None):
+    img = leer_imagen(path)
+    res = receta.aplicar(img, secundaria)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    escribir_imagen(destino, res)
+    return path
+
+def procesar_lote(rutas, carpeta_salida, receta, procesos=None, hilos_cv=1,
+                max_en_vuelo=None, formato="png", progreso=None, secundaria=None):
+    """
+    Ejecuta la receta sobre todas las rutas con un pool de procesos.
+    Mantiene como máximo `max_en_vuelo` tareas enviadas a la vez para
+    no cargar miles de imágenes en cola. Cada salida conserva la ruta relativa
+    de su entrada (ver nombres_salida), así ninguna pisa a otra.
+    Devuelve (ok, errores, segundos, colisiones).
+    """
+    procesos = procesos or os.cpu_count() or 1
+    max_en_vuelo = max_en_vuelo or procesos * 2
+    os.makedirs(carpeta_salida, exist_ok=True)
+    nombres, colisiones = nombres_salida(rutas, formato)
+
+    ok, errores = 0, []
+    inicio = time.perf_counter()
+    pendientes = iter(rutas)
+    en_vuelo = {}
+
+    with ProcessPoolExecutor(max_workers=procesos, initializer=inicializar_trabajador,
+                            initargs=(hilos_cv,)) as pool:
+        def enviar_siguientes():
+            while len(en_vuelo) < max_en_vuelo:
+                path = next(pendientes, None)
+                if path is None: return
+                destino = os.path.join(carpeta_salida, nombres[os.path.abspath(path)])
+                fut = pool.submit(procesar_archivo, path, destino, receta, secundaria)
+                en_vuelo[fut] = path
+
+        enviar_siguientes()
+        while en_vuelo:
+            hechos, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+            for fut in hechos:
+                path = en_vuelo.pop(fut)
+                try:
+                    fut.result()
+                    ok += 1
+                except Exception as e:
+                    errores.append((path, str(e)))
+                if progreso: progreso(ok + len(errores), len(rutas))
+            enviar_siguientes()
+
+    return ok, errores, time.perf_counter() - inicio, colisiones
+
+# --- LÍNEA DE COMANDOS ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Procesamiento por lotes del Sistema PDI")
+    parser.add_argument("entradas", nargs="+", help="Carpetas o patrones glob de imágenes")
+    parser.add_argument("-o", "--salida", required=True, help="Carpeta de salida")
+    parser.add_argument("--op", action="append", default=[], dest="ops",
+                        help="Operación 'practicaN.funcion[:arg1,arg2]' (se aplica en orden)")
+    parser.add_argument("--receta", help="Receta JSON grabada desde la interfaz (se aplica antes de --op)")
+    parser.add_argument("--secundaria", help="Imagen B para recetas con operaciones entre imágenes")
+    parser.add_argument("-j", "--procesos", type=int, default=None, help="Procesos (defecto: núcleos)")
+    parser.add_argument("--hilos-cv", type=int, default=1, help="Hilos de OpenCV por proceso")
+    parser.add_argument("--en-vuelo", type=int, default=None, help="Máximo de tareas en vuelo")
+    parser.add_argument("--formato", default="png", help="Extensión de salida (png, jpg, ...)")
+    a = parser.parse_args(argv)
+
+    if not a.ops and not a.receta:
+        parser.error("Indica al menos una operación con --op o una --receta")
+    try:
+        receta = Receta.cargar(a.receta) if a.receta else Receta()
+        receta.pasos.extend(parsear_operacion(t) for t in a.ops)
+        secundaria = leer_imagen(a.secundaria) if a.secundaria else None
+    except (OSError, ValueError, SyntaxError, ImportError) as e:
+        parser.error(str(e))
+
+    rutas = listar_entradas(a.entradas)
+    if not rutas:
+        print("No se encontraron imágenes.", file=sys.stderr)
+        return 1
+
+    def progreso(hechas, total):
+        print(f"\r{hechas}/{total}", end="", file=sys.stderr, flush=True)
+
+    ok, errores, seg, colisiones = procesar_lote(rutas, a.salida, receta, a.procesos, a.hilos_cv,
+                                                a.en_vuelo, a.formato, progreso, secundaria)
+    print(file=sys.stderr)
+    for nombre, grupo in colisiones:
+        print(f"AVISO: {len(grupo)} entradas darían {nombre}; se conserva su extensión: "
+              + ", ".join(grupo), file=sys.stderr)
+    for path, msg in errores:
+        print(f"ERROR {path}: {msg}", file=sys.stderr)
+    print(f"{ok} imágenes en {seg:.2f} s ({ok / seg if seg > 0 else 0:.1f} img/s), {len(errores)} errores")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
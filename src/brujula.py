@@ -0,0 +1,97 @@
+"""
+Motor de operadores de brújula (Kirsch y Robinson).
+
+Las 8 máscaras de cada operador son rotaciones de 45° de la misma máscara,
+así que no hace falta hacer 8 convoluciones: basta con los 8 vecinos de cada
+píxel (anillo NO, N, NE, E, SE, S, SO, O) en int16 y aprovechar la rotación.
+
+  Kirsch:   5 en tres vecinos consecutivos y -3 en los otros cinco:
+            k_i = 5*T_i - 3*(S - T_i) = 8*T_i - 3*S
+            con T_i la suma de 3 vecinos consecutivos (ventana deslizante
+            sobre el anillo) y S la suma de los 8.
+  Robinson: (1, 2, 1) frente a (-1, -2, -1) en el lado opuesto:
+            r_i = A_i - A_{i+4}, con A_i = n_i + 2*n_{i+1} + n_{i+2},
+            y además r_{i+4} = -r_i, así que solo se calculan 4.
+
+Se devuelve en una sola llamada la respuesta máxima y la dirección ganadora.
+"""
+import cv2
+import numpy as np
+
+from src.tareas import punto_de_control
+
+# Dirección de cada máscara (k1 = bordes hacia el Norte, k2 = Noreste, ...)
+DIRECCIONES = ("N", "NE", "E", "SE", "S", "SO", "O", "NO")
+
+# Desplazamientos (dy, dx) del anillo en sentido horario empezando en NO
+_ANILLO = ((-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1))
+
+# Filas por franja: así los 8 vecinos y los acumuladores caben en caché
+ALTO_FRANJA = 16
+
+def _kirsch(n, con_direccion):
+    # T_0 = NO + N + NE; cada rotación quita un vecino y añade el siguiente
+    t0 = cv2.add(cv2.add(n[0], n[1]), n[2])
+    t, t_max, t3 = t0, t0, None
+    direccion = np.zeros(t0.shape, dtype=np.uint8) if con_direccion else None
+    for i in range(1, 8):
+        t = cv2.add(cv2.subtract(t, n[i - 1]), n[(i + 2) % 8])
+        if i == 3: t3 = t
+        if con_direccion:
+            # i crece en cada vuelta: max(direccion, i donde mejora) = última mejora
+            mejor = cv2.compare(t, t_max, cv2.CMP_GT)
+            direccion = cv2.max(direccion, cv2.bitwise_and(mejor, i))
+        t_max = cv2.max(t, t_max)
+    # S = T_0 + T_3 + SO + O ; |8*T - 3*S| <= 8*765 + 3*2040 cabe en int16
+    suma = cv2.add(cv2.add(t0, t3), cv2.add(n[6], n[7]))
+    return cv2.subtract(cv2.multiply(t_max, 8), cv2.multiply(suma, 3)), direccion
+
+def _robinson(n, con_direccion):
+    a = [cv2.add(cv2.add(n[i], n[(i + 1) % 8]), cv2.add(n[(i + 1) % 8], n[(i + 2) % 8])) for i in range(8)]
+    mag, direccion = None, None
+    for i in range(4):
+        # La mejor de la pareja (i, i+4): |r_i|, en i si r_i >= 0 y en i+4 si no
+        r_abs = cv2.absdiff(a[i], a[i + 4])
+        if con_direccion:
+            negativa = cv2.compare(a[i], a[i + 4], cv2.CMP_LT)
+            dir_i = cv2.add(cv2.bitwise_and(negativa, 4), i)
+        if mag is None:
+            mag, direccion = r_abs, (dir_i if con_direccion else None)
+            continue
+        if con_direccion:
+            # En empate gana la dirección de menor índice (como un argmax sobre k1..k8)
+            empate = cv2.bitwise_and(cv2.compare(r_abs, mag, cv2.CMP_EQ),
+                                    cv2.compare(dir_i, direccion, cv2.CMP_LT))
+            mejor = cv2.bitwise_or(cv2.compare(r_abs, mag, cv2.CMP_GT), empate)
+            direccion = cv2.copyTo(dir_i, mejor, direccion)
+        mag = cv2.max(mag, r_abs)
+    return mag, direccion
+
+OPERADORES = {"kirsch": _kirsch, "robinson": _robinson}
+
+def respuestas_brujula(gray, operador="kirsch", con_direccion=True):
+    """
+    gray: imagen uint8 de 1 canal.
+    Devuelve (magnitud int16, direccion uint8 0-7 según DIRECCIONES).
+    La magnitud es la máxima respuesta de las 8 máscaras (sin saturar);
+    con con_direccion=False la dirección es None y el cálculo es más corto.
+    """
+    if operador not in OPERADORES:
+        raise ValueError(f"Operador de brújula desconocido: {operador}")
+    calcular = OPERADORES[operador]
+
+    h, w = gray.shape
+    # Borde REFLECT_101, el mismo que usa filter2D por defecto
+    pad = cv2.copyMakeBorder(gray, 1, 1, 1, 1, cv2.BORDER_REFLECT_101)
+    magnitud = np.empty((h, w), dtype=np.int16)
+    direccion = np.empty((h, w), dtype=np.uint8) if con_direccion else None
+
+    for y0 in range(0, h, ALTO_FRANJA):
+        punto_de_control(y0 / h)
+        y1 = min(h, y0 + ALTO_FRANJA)
+        franja = pad[y0:y1 + 2].astype(np.int16)
+        n = [franja[1 + dy:1 + dy + (y1 - y0), 1 + dx:1 + dx + w] for dy, dx in _ANILLO]
+        mag, dire = calcular(n, con_direccion)
+        magnitud[y0:y1] = mag
+        if con_direccion: direccion[y0:y1] = dire
+    return magnitud, direccion
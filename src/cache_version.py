@@ -0,0 +1,40 @@
+"""
+Caché de resultados derivados de una imagen, por versión.
+
+Las imágenes nunca se modifican en sitio (cada operación devuelve un arreglo
+nuevo), así que el propio arreglo identifica su versión: mientras siga vivo,
+lo que se calcule a partir de él (histogramas, vistas previas...) no cambia.
+Los resultados se guardan por id() con una referencia débil que borra la
+entrada cuando la imagen se libera.
+"""
+import weakref
+
+_cache = {}   # id(img) -> (referencia débil, {clave: resultado})
+
+def _entradas(img):
+    clave = id(img)
+    actual = _cache.get(clave)
+    if actual is not None and actual[0]() is img:
+        return actual[1]
+
+    def liberar(ref, clave=clave):
+        # Solo si la entrada sigue siendo de esta imagen (el id pudo reutilizarse)
+        if clave in _cache and _cache[clave][0] is ref:
+            del _cache[clave]
+
+    _cache[clave] = (weakref.ref(img, liberar), {})
+    return _cache[clave][1]
+
+def memo(img, clave, calcular):
+    """Devuelve calcular() para (img, clave), calculándolo solo la primera vez"""
+    entradas = _entradas(img)
+    if clave in entradas:
+        return entradas[clave]
+    resultado = calcular()
+    # Guardar la propia imagen la mantendría viva para siempre (y no ahorra nada)
+    if resultado is not img:
+        entradas[clave] = resultado
+    return resultado
+
+def info():
+    return {"imagenes": len(_cache), "resultados": sum(len(e) for _, e in _cache.values())}
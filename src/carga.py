@@ -0,0 +1,107 @@
+"""
+Carga de imágenes con respaldo mapeado en memoria.
+
+Para .npy y TIFF sin compresión los píxeles no se leen al abrir: se devuelve
+un np.memmap de solo lectura sobre el propio archivo y el sistema operativo
+trae las páginas a medida que una operación las toca. Abrir una imagen de
+varios GB es casi instantáneo y no ocupa RAM hasta que se procesa.
+
+Las imágenes devueltas son de solo lectura. Como ninguna operación de
+src.practicaN modifica su entrada (siempre devuelven un arreglo nuevo), la
+original y la procesada pueden compartir el mismo arreglo hasta la primera
+operación: copia en escritura sin copiar nada.
+"""
+import struct
+
+import cv2
+import numpy as np
+
+EXTENSIONES_MAPEABLES = (".npy", ".tif", ".tiff")
+
+# Etiquetas TIFF que necesitamos
+_ANCHO, _ALTO, _BITS, _COMPRESION, _FOTOMETRICA = 256, 257, 258, 259, 262
+_OFFSETS_TIRAS, _MUESTRAS, _BYTES_TIRAS, _PLANAR, _ANCHO_TESELA = 273, 277, 279, 284, 322
+# Tipo TIFF -> formato struct (BYTE, SHORT, LONG)
+_TIPOS = {1: "B", 3: "H", 4: "I"}
+
+def _leer_ifd(f, orden):
+    """Lee el primer IFD de un TIFF clásico y devuelve {etiqueta: [valores]}"""
+    f.seek(4)
+    (offset_ifd,) = struct.unpack(orden + "I", f.read(4))
+    f.seek(offset_ifd)
+    (n,) = struct.unpack(orden + "H", f.read(2))
+    entradas = [struct.unpack(orden + "HHI4s", f.read(12)) for _ in range(n)]
+
+    etiquetas = {}
+    for etiqueta, tipo, cuenta, valor in entradas:
+        if tipo not in _TIPOS: continue
+        fmt = orden + _TIPOS[tipo] * cuenta
+        tam = struct.calcsize(fmt)
+        if tam <= 4:
+            datos = valor[:tam]
+        else:
+            f.seek(struct.unpack(orden + "I", valor)[0])
+            datos = f.read(tam)
+        etiquetas[etiqueta] = list(struct.unpack(fmt, datos))
+    return etiquetas
+
+def mapear_tiff(path):
+    """
+    np.memmap (alto, ancho[, 3]) de un TIFF sin compresión de 8 bits en gris o
+    RGB entrelazado con las tiras contiguas. None si el archivo no cumple
+    (comprimido, por teselas, 16 bits, paleta...): entonces se usa cv2.imread.
+    """
+    with open(path, "rb") as f:
+        cabecera = f.read(4)
+        if cabecera == b"II*\x00": orden = "<"
+        elif cabecera == b"MM\x00*": orden = ">"
+        else: return None  # BigTIFF u otro formato
+        t = _leer_ifd(f, orden)
+
+    muestras = t.get(_MUESTRAS, [1])[0]
+    fotometrica = t.get(_FOTOMETRICA, [None])[0]
+    if (t.get(_COMPRESION, [1])[0] != 1 or _ANCHO_TESELA in t
+            or t.get(_PLANAR, [1])[0] != 1 or any(b != 8 for b in t.get(_BITS, [1]))):
+        return None
+    if not ((muestras == 1 and fotometrica == 1) or (muestras == 3 and fotometrica == 2)):
+        return None
+
+    alto, ancho = t[_ALTO][0], t[_ANCHO][0]
+    offsets, cuentas = t.get(_OFFSETS_TIRAS), t.get(_BYTES_TIRAS)
+    if not offsets or not cuentas: return None
+    # Todas las tiras deben ir seguidas en el archivo para verlas como un bloque
+    if any(o + c != sig for o, c, sig in zip(offsets, cuentas, offsets[1:])):
+        return None
+    forma = (alto, ancho) if muestras == 1 else (alto, ancho, 3)
+    if sum(cuentas) < alto * ancho * muestras:
+        return None
+    return np.memmap(path, dtype=np.uint8, mode="r", offset=offsets[0], shape=forma)
+
+def mapear_npy(path):
+    img = np.load(path, mmap_mode="r")
+    if img.dtype != np.uint8 or not (img.ndim == 2 or (img.ndim == 3 and img.shape[2] == 3)):
+        raise ValueError(f"{path}: se esperaba uint8 (alto, ancho) o (alto, ancho, 3) en RGB")
+    return img
+
+def leer_decodificada(path):
+    """cv2.imread + BGR -> RGB en el mismo búfer (sin una segunda copia)"""
+    img = cv2.imread(path)
+    if img is None:
+        raise ValueError(f"No se pudo leer {path}")
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=img)
+
+def abrir_imagen(path):
+    """Imagen RGB (o gris) de solo lectura; mapeada en memoria cuando se puede"""
+    img = None
+    ext = path.lower()
+    if ext.endswith(".npy"):
+        img = mapear_npy(path)
+    elif ext.endswith((".tif", ".tiff")):
+        try:
+            img = mapear_tiff(path)
+        except (OSError, struct.error, KeyError, ValueError):
+            img = None
+    if img is None:
+        img = leer_decodificada(path)
+    img.flags.writeable = False
+    return img
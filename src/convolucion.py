@@ -0,0 +1,289 @@
+"""
+Convolución lineal con elección automática de método.
+
+Los filtros lineales de practica4 (promedio, promedio pesado, gaussiano y
+kernels del usuario) pasan por convolucionar(), que estima el coste de cada
+forma de ejecutarlos y usa la más barata:
+
+    "caja"       kernel constante: suma de ventana de coste fijo por píxel
+    "separable"  kernel de rango 1 (fila x columna): dos pasadas 1D, kh + kw
+    "espacial"   correlación directa, kh * kw operaciones por píxel
+    "fft"        correlación por DFT en bloques (cv::crossCorr de OpenCV),
+                 casi independiente del tamaño del kernel
+    "nativo"     cv2.GaussianBlur, solo para kernels de nucleo_gaussiano
+
+Los cuatro primeros dan exactamente el mismo resultado: el kernel se expresa
+como enteros más un divisor, cada camino obtiene la suma entera exacta de la
+ventana (la de la DFT se redondea: su error es muy inferior a 0.5) y la
+división final con redondeo es común. Los coeficientes no enteros se
+cuantizan a punto fijo: 8 bits fraccionarios por eje, como el GaussianBlur
+exacto de OpenCV para 8 bits, o más si el coeficiente mayor se quedaría con
+menos de BITS_PICO bits significativos (kernels anchos de picos bajos).
+
+"nativo" es el GaussianBlur de siempre, con su propia cuantización del
+kernel: difiere de los demás hasta en 2 niveles. Es el más rápido salvo con
+kernels muy grandes (k > ~100), donde gana la DFT. Como su resultado no es el
+mismo, elegirlo depende solo del kernel y no del tamaño de la imagen: todas
+las teselas de una imagen toman el mismo camino.
+
+El borde es el de OpenCV por defecto (BORDER_REFLECT_101) y el ancla el centro
+(k // 2), como cv2.filter2D, así que los kernels pares también valen.
+"""
+from math import comb
+
+import cv2
+import numpy as np
+
+BORDE = cv2.BORDER_REFLECT_101
+FRACCION_BITS = 8   # por eje (16 en total para kernels 2D)
+MAX_FRACCION_BITS = 16
+BITS_PICO = 5
+
+# cv2.filter2D correlaciona directamente los kernels de menos de ~50
+# coeficientes y por DFT en bloques los demás (umbral interno de OpenCV)
+COEFS_DFT = 64
+
+METODOS = ("auto", "caja", "separable", "espacial", "fft", "nativo")
+
+# --- KERNELS ---
+# Un kernel es un dict {"columna": ky, "fila": kx} (separable) o
+# {"matriz": K}, con coeficientes enteros (int64) y un "divisor" entero.
+
+def _bits_fraccion(coefs, minimo):
+    pico = np.abs(coefs).max()
+    if pico == 0: return minimo
+    return int(np.clip(np.ceil(np.log2(2**BITS_PICO / pico)), minimo, MAX_FRACCION_BITS))
+
+def _a_enteros(coefs, bits):
+    """Coeficientes en punto fijo (enteros sobre 2^bits) con la suma conservada"""
+    enteros = np.round(coefs * 2**bits).astype(np.int64)
+    # Conservar la suma (brillo medio) tras redondear: el resto va al coeficiente mayor
+    enteros.flat[np.argmax(np.abs(coefs))] += int(round(coefs.sum() * 2**bits)) - enteros.sum()
+    return enteros, 2**bits
+
+def _son_enteros(coefs, cota):
+    return np.all(coefs == np.round(coefs)) and np.abs(coefs).sum() <= cota
+
+def _eje(coefs):
+    """Kernel 1D normalizado a suma 1: (enteros, divisor)"""
+    coefs = np.asarray(coefs, dtype=np.float64)
+    if _son_enteros(coefs, 2**MAX_FRACCION_BITS):
+        return coefs.astype(np.int64), int(coefs.sum())
+    # Sumas grandes (Pascal de k grande) o no enteras: normalizar y pasar a punto fijo
+    coefs = coefs / coefs.sum()
+    return _a_enteros(coefs, _bits_fraccion(coefs, FRACCION_BITS))
+
+def nucleo_separable(fila, columna=None):
+    """Kernel columna x fila normalizado a suma 1 (columna=None: el mismo en ambos ejes)"""
+    kx, dx = _eje(fila)
+    ky, dy = _eje(fila if columna is None else columna)
+    return {"columna": ky, "fila": kx, "divisor": dy * dx}
+
+def nucleo_caja(k_size):
+    return nucleo_separable(np.ones(k_size))
+
+def nucleo_binomial(k_size):
+    """Fila k del triángulo de Pascal: [1 2 1] para 3, [1 4 6 4 1] para 5..."""
+    fila = np.array([comb(k_size - 1, i) for i in range(k_size)], dtype=np.float64)
+    # Hasta k = 9 (suma 2^8) exacto en enteros; más ancho ya es casi gaussiano
+    # y va en punto fijo como él (un divisor 4^(k-1) obligaría a float64)
+    return nucleo_separable(fila if k_size <= 9 else fila / fila.sum())
+
+def nucleo_gaussiano(k_size, sigma=0):
+    # sigma <= 0: la misma regla que cv2.GaussianBlur a partir de k_size
+    nucleo = nucleo_separable(cv2.getGaussianKernel(k_size, sigma).ravel())
+    nucleo["gauss"] = (k_size, sigma)  # Habilita el camino "nativo"
+    return nucleo
+
+def nucleo_matriz(kernel, divisor=None):
+    """
+    Kernel arbitrario (lista de filas o matriz). divisor=None: la suma de los
+    coeficientes, o 1 si suman 0 (detectores de bordes, realce).
+    """
+    kernel = np.asarray(kernel, dtype=np.float64)
+    if kernel.ndim != 2 or kernel.size == 0:
+        raise ValueError(f"El kernel debe ser una matriz 2D, no {kernel.shape}")
+    if divisor is None:
+        divisor = kernel.sum() or 1
+    if divisor == 0:
+        raise ValueError("El divisor del kernel no puede ser 0")
+    if _son_enteros(kernel, 2**(2 * MAX_FRACCION_BITS)) and float(divisor).is_integer():
+        nucleo = {"matriz": kernel.astype(np.int64), "divisor": int(divisor)}
+    else:
+        coefs = kernel / divisor
+        nucleo = dict(zip(("matriz", "divisor"), _a_enteros(coefs, _bits_fraccion(coefs, 2 * FRACCION_BITS))))
+    if nucleo["divisor"] < 0:
+        nucleo = {"matriz": -nucleo["matriz"], "divisor": -nucleo["divisor"]}
+    # Un kernel entero de rango 1 se ejecuta como separable sin cambiar el resultado
+    return _factorizar(nucleo) or nucleo
+
+def leer_kernel(texto):
+    """
+    Texto del usuario -> (filas, divisor). Filas separadas por ';' o saltos de
+    línea, valores por espacios o comas y divisor opcional tras '/':
+    "1 2 1; 2 4 2; 1 2 1 / 16". Sin divisor devuelve None (suma o 1).
+    """
+    cuerpo, _, div = texto.partition("/")
+    filas = [f.replace(",", " ").split() for f in cuerpo.replace("\n", ";").split(";")]
+    try:
+        filas = [[float(v) for v in f] for f in filas if f]
+        divisor = float(div) if div.strip() else None
+    except ValueError:
+        raise ValueError(f"Valor no numérico en el kernel: {texto!r}") from None
+    if not filas or any(len(f) != len(filas[0]) for f in filas):
+        raise ValueError("Todas las filas del kernel deben tener el mismo número de valores")
+    nucleo_matriz(filas, divisor)  # Validar antes de encolar la operación
+    return filas, divisor
+
+def _factorizar(nucleo):
+    """{"matriz": K} de rango 1 -> {"columna", "fila"} enteros con K = columna x fila"""
+    K = nucleo["matriz"]
+    i, j = np.unravel_index(np.argmax(np.abs(K)), K.shape)
+    if K[i, j] == 0: return None
+    # La columna dividida por su mcd es primitiva, así que la fila sale entera
+    columna = K[:, j] // np.gcd.reduce(K[:, j])
+    fila = K[i, :] // columna[i]
+    if not np.array_equal(np.outer(columna, fila), K): return None
+    return {"columna": columna, "fila": fila, "divisor": nucleo["divisor"]}
+
+def forma_nucleo(nucleo):
+    if "matriz" in nucleo: return nucleo["matriz"].shape
+    return len(nucleo["columna"]), len(nucleo["fila"])
+
+def matriz(nucleo):
+    if "matriz" in nucleo: return nucleo["matriz"]
+    return np.outer(nucleo["columna"], nucleo["fila"])
+
+def _profundidad(nucleo):
+    """La menor profundidad que guarda exacta cualquier suma (y suma parcial)"""
+    cota = 255 * np.abs(matriz(nucleo)).sum()
+    if cota < 2**15: return cv2.CV_16S
+    # float32 representa exactos los enteros hasta 2^24
+    return cv2.CV_32F if cota < 2**24 else cv2.CV_64F
+
+# --- MODELO DE COSTE ---
+# Nanosegundos por muestra (píxel x canal) de cada camino, ajustados midiendo
+# OpenCV en un núcleo con imágenes de 1 a 12 MP. Solo importa su orden relativo.
+# Gaussiano, 12 MP RGB (ms): k=3 nativo 45 / separable 110; k=31 197 / 912;
+# k=101 nativo 1087 / fft 1028; k=201 2547 / 1289.
+
+def _es_caja(nucleo):
+    K = nucleo.get("matriz")
+    if K is None:
+        return np.all(nucleo["fila"] == nucleo["fila"][0]) and np.all(nucleo["columna"] == nucleo["columna"][0])
+    return np.all(K == K.flat[0])
+
+def costes(forma_img, nucleo):
+    """
+    Coste estimado (ns por muestra) de cada método aplicable al kernel.
+    forma_img=None: sin el efecto del tamaño de la imagen (imagen grande).
+    """
+    kh, kw = forma_nucleo(nucleo)
+    # La DFT recorre la imagen extendida con el kernel: pesa en imágenes pequeñas
+    res = {"fft": 19 + 0.15 * max(kh, kw)}
+    if forma_img is not None:
+        h, w = forma_img[:2]
+        res["fft"] *= (h + kh - 1) * (w + kw - 1) / (h * w)
+    if kh * kw < 50:
+        res["espacial"] = 2 + 0.25 * kh * kw
+    if "fila" in nucleo:
+        taps = kh + kw
+        if _profundidad(nucleo) == cv2.CV_64F:
+            # Pasadas en float64 y, si son largas, fuera de caché: superlineal
+            res["separable"] = 0.3 * taps * (1 + taps / 300)
+        else:
+            res["separable"] = 2.5 + 0.05 * taps
+    if _es_caja(nucleo):
+        res["caja"] = 2.5
+    if "gauss" in nucleo:
+        # Punto fijo de 8 bits en una pasada por eje; con kernels anchos deja de caber en caché
+        taps = kh + kw
+        res["nativo"] = 1 + 0.075 * taps + 0.0004 * taps**2
+    return res
+
+def elegir_metodo(forma_img, nucleo):
+    c = costes(forma_img, nucleo)
+    nativo = c.pop("nativo", None)
+    if nativo is not None:
+        # Da otros niveles que los exactos: se decide sin el tamaño de la imagen
+        # para que todas las teselas usen el mismo camino
+        exactos = costes(None, nucleo)
+        if nativo <= min(exactos[m] for m in c):
+            return "nativo"
+    return min(c, key=c.get)
+
+# --- CAMINOS DE EJECUCIÓN ---
+# Cada uno devuelve la suma entera de la ventana (float32/float64), exacta o
+# con un error de redondeo muy inferior a 0.5 (DFT) que _dividir elimina.
+
+def _acumular_caja(img, nucleo):
+    kh, kw = forma_nucleo(nucleo)
+    suma = cv2.boxFilter(img, _profundidad(nucleo), (kw, kh), normalize=False, borderType=BORDE)
+    valor = matriz(nucleo).flat[0]
+    if valor != 1: suma *= valor
+    return suma
+
+def _acumular_separable(img, nucleo):
+    ddepth = _profundidad(nucleo)
+    tipo = np.float64 if ddepth == cv2.CV_64F else np.float32
+    return cv2.sepFilter2D(img, ddepth, nucleo["fila"].astype(tipo), nucleo["columna"].astype(tipo),
+                        borderType=BORDE)
+
+def _acumular_espacial(img, nucleo):
+    return cv2.filter2D(img, cv2.CV_64F, matriz(nucleo).astype(np.float64), borderType=BORDE)
+
+def _acumular_fft(img, nucleo):
+    K = matriz(nucleo).astype(np.float64)
+    kh, kw = K.shape
+    if kh * kw < COEFS_DFT:
+        # Rellenar con ceros (mismo ancla) para que OpenCV use la DFT también aquí
+        P = np.zeros((max(kh, 8), max(kw, 8)))
+        P[:kh, :kw] = K
+        K = P
+    return cv2.filter2D(img, cv2.CV_64F, K, anchor=(kw // 2, kh // 2), borderType=BORDE)
+
+CAMINOS = {
+    "caja": _acumular_caja,
+    "separable": _acumular_separable,
+    "espacial": _acumular_espacial,
+    "fft": _acumular_fft,
+}
+
+def _dividir(suma, divisor):
+    """round(suma / divisor) con empates al par (como cvRound), saturado a uint8"""
+    doble = suma.dtype == np.float64
+    if doble:
+        np.rint(suma, out=suma)  # Quitar el ruido de la DFT: la suma es entera
+    if divisor & (divisor - 1) == 0 or (divisor % 2 and (doble or divisor < 2**14)):
+        # Divisor potencia de 2 o impar: suma * (1/divisor) no cambia ningún
+        # empate (no hay x.5 inexactos) y, en float32, el error queda lejos de
+        # 1/(2 divisor). OpenCV escala y satura en una pasada; como un escalar
+        # solo multiplica el primer canal de un Mat, se pasa como un solo canal.
+        plano = suma.reshape(suma.shape[0], -1)
+        return cv2.multiply(plano, 1.0 / divisor, dtype=cv2.CV_8U).reshape(suma.shape)
+    # Divisor par cualquiera: el cociente en float64 cae en x.5 solo si lo es de verdad
+    res = suma.astype(np.float64)
+    res /= divisor
+    np.rint(res, out=res)
+    np.clip(res, 0, 255, out=res)
+    return res.astype(np.uint8)
+
+def convolucionar(img, nucleo, metodo="auto"):
+    """
+    Aplica el kernel (ver nucleo_*) a una imagen uint8 gris o RGB y devuelve
+    uint8 del mismo tamaño. metodo="auto" usa el de menor coste estimado.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconocido: {metodo} (usa {', '.join(METODOS)})")
+    if metodo == "auto":
+        metodo = elegir_metodo(img.shape, nucleo)
+    elif metodo not in costes(img.shape, nucleo):
+        raise ValueError(f"El método {metodo} no admite este kernel")
+    if metodo == "nativo":
+        k_size, sigma = nucleo["gauss"]
+        return cv2.GaussianBlur(img, (k_size, k_size), sigma, borderType=BORDE)
+    kh, kw = forma_nucleo(nucleo)
+    if metodo == "caja" and matriz(nucleo).flat[0] == 1 and nucleo["divisor"] == kh * kw < 2**14 and kh * kw % 2:
+        # Promedio de área impar: sin empates, cv2.blur redondea igual en una pasada
+        return cv2.blur(img, (kw, kh), borderType=BORDE)
+    return _dividir(CAMINOS[metodo](img, nucleo), nucleo["divisor"])
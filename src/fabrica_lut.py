@@ -0,0 +1,89 @@
+"""
+Fábrica de LUTs para las curvas de tono de practica5.
+
+Cada curva se genera vectorizada con NumPy (sin bucles de 256 iteraciones) y
+se memoiza por (curva, parámetros). Repetir un mismo gamma, potencia o
+desplazamiento no cuesta nada, y los parámetros continuos de los sliders
+también sirven como clave.
+
+Las tablas devueltas son de solo lectura porque se comparten entre llamadas.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+NIVELES = np.arange(256, dtype=np.float64)
+
+# --- CURVAS (misma matemática que las versiones con bucle) ---
+
+def _exponencial(alpha=0.05):
+    # 255 * (1 - exp(-alpha * z))
+    return np.clip(255 * (1 - np.exp(-alpha * NIVELES)), 0, 255)
+
+def _rayleigh(alpha=0.4):
+    # z = sqrt(2*alpha^2 * ln(1/(1-P(r)))), normalizada con P = 0.999
+    g_max = np.sqrt(2 * alpha**2 * np.log(1 / (1 - 0.999)))
+    r = NIVELES / 255.0
+    r[r >= 1.0] = 0.999
+    val_ray = np.sqrt(2 * alpha**2 * np.log(1 / (1 - r)))
+    return np.clip((val_ray / g_max) * 255, 0, 255)
+
+def _hipercubica():
+    return np.clip((NIVELES / 255.0) ** (1/3.0) * 255, 0, 255)
+
+def _logaritmica():
+    c = 255 / np.log(1 + 255)
+    return np.clip(c * np.log(1 + NIVELES), 0, 255)
+
+def _gamma(gamma=1.0):
+    inv_gamma = 1.0 / gamma
+    return ((NIVELES / 255.0) ** inv_gamma) * 255
+
+def _potencia(potencia=2.0):
+    return ((NIVELES / 255.0) ** potencia) * 255
+
+def _desplazamiento(valor):
+    return np.clip(NIVELES + valor, 0, 255)
+
+def _expansion(min_val, max_val):
+    return np.clip((NIVELES - min_val) * (255.0 / (max_val - min_val)), 0, 255)
+
+def _contraccion(min_out, max_out):
+    min_in, max_in = 0, 255
+    slope = (max_out - min_out) / (max_in - min_in)
+    return np.clip(min_out + slope * (NIVELES - min_in), 0, 255)
+
+CURVAS = {
+    "exponencial": _exponencial,
+    "rayleigh": _rayleigh,
+    "hipercubica": _hipercubica,
+    "logaritmica": _logaritmica,
+    "gamma": _gamma,
+    "potencia": _potencia,
+    "desplazamiento": _desplazamiento,
+    "expansion": _expansion,
+    "contraccion": _contraccion,
+}
+
+# --- FÁBRICA MEMOIZADA ---
+
+@lru_cache(maxsize=512)
+def _lut_memo(curva, params):
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        # astype trunca igual que asignar floats a un arreglo uint8
+        lut = CURVAS[curva](*params).astype(np.uint8)
+    lut.flags.writeable = False
+    return lut
+
+def lut_curva(curva, *params):
+    """Devuelve la LUT uint8 (256,) de la curva con esos parámetros"""
+    if curva not in CURVAS:
+        raise ValueError(f"Curva desconocida: {curva}")
+    # Normalizamos para que 2 y 2.0 compartan entrada de la caché
+    return _lut_memo(curva, tuple(float(p) for p in params))
+
+def info_cache():
+    return _lut_memo.cache_info()
+
+def limpiar_cache():
+    _lut_memo.cache_clear()
@@ -0,0 +1,37 @@
+"""
+Histogramas en caché por versión de imagen (ver src.cache_version): redibujar
+un panel cuya imagen no cambió no vuelve a recorrer los píxeles.
+"""
+import cv2
+import numpy as np
+
+from src import practica1
+from src.cache_version import memo
+
+# Color RGB (0-1) de cada matiz H = 0..179 con S = V = 255, en una sola conversión.
+# Como columna (180, 1): así OpenCV redondea igual que convirtiendo píxel a píxel.
+_MATICES = np.full((180, 1, 3), 255, dtype=np.uint8)
+_MATICES[:, 0, 0] = np.arange(180)
+COLORES_MATIZ = cv2.cvtColor(_MATICES, cv2.COLOR_HSV2RGB)[:, 0] / 255.0
+
+def histograma(img, canal=0):
+    """Histograma de 256 niveles del canal (float32, como cv2.calcHist)"""
+    return memo(img, ("canal", canal),
+                lambda: cv2.calcHist([img], [canal], None, [256], [0, 256]).ravel())
+
+def histograma_matiz(img_rgb):
+    """Histograma de H (180 niveles) de una imagen RGB"""
+    def calcular():
+        hsv = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2HSV)
+        return cv2.calcHist([hsv], [0], None, [180], [0, 180]).ravel()
+    return memo(img_rgb, "matiz", calcular)
+
+CANALES_VISUALES = {
+    "RGB": practica1.obtener_canales_rgb_visual,
+    "HSV": practica1.obtener_canales_hsv_visual,
+    "CMY": practica1.obtener_canales_cmy_visual,
+}
+
+def canales_visuales(img, modelo):
+    """Canales de visualización de practica1, reutilizados mientras img no cambie"""
+    return memo(img, ("canales", modelo), lambda: tuple(CANALES_VISUALES[modelo](img)))
@@ -0,0 +1,194 @@
+"""
+Historial de deshacer con presupuesto de memoria.
+
+Se usa como una lista (append / pop / len / bool), pero cada estado se guarda
+en el nivel más barato que permita deshacer rápido lo reciente:
+
+  - Los últimos `recientes` estados quedan tal cual (deshacer inmediato).
+  - Los anteriores se comprimen con zlib (nivel rápido); las imágenes
+    procesadas suelen tener zonas planas y ocupar mucho menos.
+  - Si aun así se pasa del presupuesto de bytes, los más antiguos se vuelcan
+    a archivos en un directorio temporal que se borra al descartar el historial.
+
+Comprimir y volcar se hace en un hilo de fondo (nunca en el de la interfaz):
+append solo guarda la referencia y el hilo cambia después la entrada por su
+versión comprimida o en disco. Deshacer un estado que aún se está comprimiendo
+devuelve el arreglo crudo y el resultado del hilo se descarta.
+
+Las imágenes de solo lectura (la original cargada, quizá mapeada en memoria)
+ya están vivas en el slot: se guardan por referencia y no cuentan.
+
+Un estado con operaciones puntuales pendientes (src.puntual.CadenaPuntual) se
+guarda solo como su LUT: su base es el estado de imagen más reciente de la
+pila, que es la imagen sobre la que empezó la cadena.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.puntual import CadenaPuntual
+
+PRESUPUESTO = 256 * 1024 * 1024   # bytes en RAM para estados comprimidos/crudos
+RECIENTES = 2
+NIVEL_ZLIB = 1
+
+# Un solo hilo para todos los historiales: zlib libera el GIL y no compite con la interfaz
+_fondo = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdi_historial")
+
+class Historial:
+
+    def __init__(self, presupuesto=PRESUPUESTO, recientes=RECIENTES, nivel=NIVEL_ZLIB):
+        self.presupuesto = presupuesto
+        self.recientes = recientes
+        self.nivel = nivel
+        self.entradas = []      # dicts {"tipo": "ref"|"crudo"|"zlib"|"disco"|"lut", ...}
+        self.memoria = 0        # bytes en RAM (crudo + zlib)
+        self._carpeta = None
+        self._contador = 0
+        self._cerrojo = threading.Lock()
+        self._tarea = None      # Future del ajuste en segundo plano (None = inactivo)
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def __bool__(self):
+        return bool(self.entradas)
+
+    def append(self, img):
+        with self._cerrojo:
+            if isinstance(img, CadenaPuntual):
+                # 256 bytes: la base ya está en la pila (ver docstring del módulo)
+                self.entradas.append({"tipo": "lut", "lut": img.lut, "dominio": img.dominio, "bytes": 0})
+                return
+            if not img.flags.writeable:
+                self.entradas.append({"tipo": "ref", "img": img, "bytes": 0})
+                return
+            self.entradas.append({"tipo": "crudo", "img": img, "bytes": img.nbytes})
+            self.memoria += img.nbytes
+            if self._tarea is None:
+                self._tarea = _fondo.submit(self._ajustar)
+
+    def pop(self):
+        with self._cerrojo:
+            if not self.entradas:
+                raise IndexError("pop de un historial vacío")
+            entrada = self.entradas.pop()
+            if entrada["tipo"] in ("crudo", "zlib"):
+                self.memoria -= entrada["bytes"]
+            if entrada["tipo"] == "lut":
+                base = next(e for e in reversed(self.entradas) if e["tipo"] != "lut")
+                return CadenaPuntual(self._recuperar(base, consumir=False), entrada["lut"], entrada["dominio"])
+            return self._recuperar(entrada)
+
+    def clear(self):
+        with self._cerrojo:
+            self.entradas = []
+            self.memoria = 0
+            if self._carpeta is not None:
+                self._limpiar()
+                self._carpeta = None
+
+    def esperar(self):
+        """Bloquea hasta que el hilo de fondo termine de comprimir/volcar (pruebas, benchmark)"""
+        tarea = self._tarea
+        if tarea is not None: tarea.result()
+
+    # --- NIVELES DE ALMACENAMIENTO (hilo de fondo) ---
+    # El trabajo pesado (zlib, escribir el archivo) va fuera del cerrojo; bajo el
+    # cerrojo solo se elige la siguiente entrada y se cambia si sigue en la pila.
+
+    def _pendiente(self):
+        """(entrada, acción) siguiente, o None si ya cabe todo"""
+        # 1) Comprimir todo lo que no sea reciente
+        for entrada in self.entradas[:-self.recientes] if self.recientes else self.entradas:
+            if entrada["tipo"] == "crudo": return entrada, "comprimir"
+        # 2) Volcar a disco, de la más antigua a la más nueva, hasta caber
+        if self.memoria > self.presupuesto:
+            for entrada in self.entradas:
+                if entrada["tipo"] == "crudo": return entrada, "comprimir"
+                if entrada["tipo"] == "zlib": return entrada, "volcar"
+        return None
+
+    def _sigue(self, entrada, tipo):
+        return entrada["tipo"] == tipo and any(e is entrada for e in self.entradas)
+
+    def _ajustar(self):
+        try:
+            self._ajustar_todo()
+        except BaseException:
+            with self._cerrojo: self._tarea = None  # El próximo append lo reintenta
+            raise
+
+    def _ajustar_todo(self):
+        while True:
+            with self._cerrojo:
+                siguiente = self._pendiente()
+                if siguiente is None:
+                    self._tarea = None
+                    return
+                entrada, accion = siguiente
+                if accion == "volcar":
+                    ruta = self._ruta_nueva()
+                    datos = entrada["datos"]
+                else:
+                    img = entrada["img"]
+            if accion == "comprimir":
+                self._comprimir(entrada, img)
+            else:
+                self._volcar(entrada, datos, ruta)
+
+    def _comprimir(self, entrada, img):
+        datos = zlib.compress(np.ascontiguousarray(img).data, self.nivel)
+        with self._cerrojo:
+            if not self._sigue(entrada, "crudo"): return  # Se deshizo mientras tanto
+            del entrada["img"]
+            self.memoria += len(datos) - entrada["bytes"]
+            entrada.update(tipo="zlib", datos=datos, bytes=len(datos), forma=img.shape, dtype=img.dtype.str)
+
+    def _ruta_nueva(self):
+        if self._carpeta is None:
+            self._carpeta = tempfile.mkdtemp(prefix="pdi_historial_")
+            self._limpiar = weakref.finalize(self, shutil.rmtree, self._carpeta, True)
+        self._contador += 1
+        return os.path.join(self._carpeta, f"{self._contador}.z")
+
+    def _volcar(self, entrada, datos, ruta):
+        try:
+            with open(ruta, "wb") as f:
+                f.write(datos)
+        except OSError:
+            return  # clear() borró la carpeta mientras tanto
+        with self._cerrojo:
+            if not self._sigue(entrada, "zlib"):
+                if os.path.exists(ruta): os.remove(ruta)
+                return
+            del entrada["datos"]
+            self.memoria -= entrada["bytes"]
+            entrada.update(tipo="disco", ruta=ruta)
+
+    def _recuperar(self, entrada, consumir=True):
+        if entrada["tipo"] in ("ref", "crudo"):
+            return entrada["img"]
+        if entrada["tipo"] == "disco":
+            with open(entrada["ruta"], "rb") as f:
+                datos = f.read()
+            if consumir: os.remove(entrada["ruta"])
+        else:
+            datos = entrada["datos"]
+        # bytearray para que la imagen recuperada sea escribible como las demás
+        plano = np.frombuffer(bytearray(zlib.decompress(datos)), dtype=np.dtype(entrada["dtype"]))
+        return plano.reshape(entrada["forma"])
+
+    def info(self):
+        """Cuántos estados hay en cada nivel y bytes en RAM"""
+        with self._cerrojo:
+            tipos = [e["tipo"] for e in self.entradas]
+            info = {t: tipos.count(t) for t in ("ref", "crudo", "zlib", "disco", "lut")}
+            info["memoria"] = self.memoria
+        return info
@@ -0,0 +1,130 @@
+"""
+Histograma dibujado directamente en un tk.Canvas.
+
+Sustituye a una Figure de matplotlib por panel: las series (256 niveles, ya
+en caché por versión de imagen en src.histograma) se convierten en polilíneas
+o polígonos del lienzo. Los elementos se crean una vez y al cambiar de imagen
+o de tamaño solo se mueven sus coordenadas (Canvas.coords), sin rasterizar.
+
+    lienzo = LienzoHistograma(frame)
+    lienzo.mostrar([Serie(hist, "white", relleno="#474747")], niveles=256)
+"""
+from collections import namedtuple
+import tkinter as tk
+
+import numpy as np
+
+# valores: conteo por nivel; color: línea (None = sin línea); relleno: color
+# del área bajo la curva (None = sin área); barras: una barra por nivel con
+# los colores de la lista (histograma de matiz)
+Serie = namedtuple("Serie", "valores color relleno barras", defaults=("white", None, None))
+
+MARGEN_IZQ = 30
+MARGEN_INF = 14
+MARGEN_SUP = 6
+MARGEN_DER = 6
+FUENTE = ("Arial", 7)
+
+def color_tk(rgb):
+    """Color RGB 0-1 -> '#rrggbb' de Tk"""
+    return "#%02x%02x%02x" % tuple(int(round(c * 255)) for c in rgb[:3])
+
+def _compacto(n):
+    """12345 -> '12k' para la etiqueta del eje Y"""
+    if n >= 1e6: return f"{n / 1e6:.3g}M"
+    if n >= 1e3: return f"{n / 1e3:.3g}k"
+    return f"{n:.0f}"
+
+class LienzoHistograma:
+
+    def __init__(self, master, ancho=140, alto=105, bg="#2E2E2E", fg="white"):
+        self.canvas = tk.Canvas(master, width=ancho, height=alto, bg=bg, highlightthickness=0)
+        self.fg = fg
+        self.series = []
+        self.niveles = 256
+        self.elementos = {}     # (tipo, índice) -> id del elemento del lienzo
+        self.opciones = {}      # (tipo, índice) -> últimas opciones (color, texto...)
+        self.canvas.bind("<Configure>", lambda e: self._dibujar())
+
+    def pack(self, **kw):
+        self.canvas.pack(**kw)
+
+    def mostrar(self, series, niveles=256):
+        """Dibuja las series; se reutilizan los elementos del dibujo anterior"""
+        self.series = list(series)
+        self.niveles = niveles
+        self._dibujar()
+
+    def limpiar(self):
+        self.series = []
+        self.canvas.delete("all")
+        self.elementos = {}
+        self.opciones = {}
+
+    # --- DIBUJO ---
+
+    def _elemento(self, clave, crear, coords, **opciones):
+        """Mueve el elemento si ya existe (y ajusta opciones que cambiaron); si no, lo crea"""
+        ident = self.elementos.get(clave)
+        if ident is None:
+            self.elementos[clave] = crear(*coords, **opciones)
+        else:
+            self.canvas.coords(ident, *coords)
+            if self.opciones.get(clave) != opciones: self.canvas.itemconfigure(ident, **opciones)
+        self.opciones[clave] = opciones
+        return clave
+
+    def _dibujar(self):
+        if not self.series:
+            return
+        c = self.canvas
+        ancho, alto = c.winfo_width(), c.winfo_height()
+        if ancho <= 1 or alto <= 1:  # Aún sin geometría: se dibuja en el <Configure>
+            ancho, alto = int(c.cget("width")), int(c.cget("height"))
+        x0, x1 = MARGEN_IZQ, max(ancho - MARGEN_DER, MARGEN_IZQ + 1)
+        y0, y1 = max(alto - MARGEN_INF, MARGEN_SUP + 1), MARGEN_SUP
+
+        tope = max(float(np.max(s.valores)) for s in self.series)
+        tope = max(tope, 1.0) * 1.05
+        escala_x = (x1 - x0) / self.niveles
+        escala_y = (y0 - y1) / tope
+
+        usados = set()
+        for i, s in enumerate(self.series):
+            v = np.asarray(s.valores, dtype=np.float64)
+            if s.barras is not None:
+                # Una barra por nivel: rectángulos que solo cambian de altura
+                izq = x0 + np.arange(len(v)) * escala_x
+                arriba = y0 - v * escala_y
+                for j in range(len(v)):
+                    usados.add(self._elemento(("barra", i, j), c.create_rectangle,
+                                            (izq[j], arriba[j], izq[j] + escala_x, y0),
+                                            fill=s.barras[j], outline=""))
+                continue
+            # Polilínea por el centro de cada nivel (como plot(hist))
+            xs = x0 + (np.arange(len(v)) + 0.5) * escala_x
+            ys = y0 - v * escala_y
+            puntos = np.column_stack([xs, ys]).ravel().tolist()
+            if s.relleno is not None:
+                usados.add(self._elemento(("area", i), c.create_polygon,
+                                        [xs[0], y0] + puntos + [xs[-1], y0],
+                                        fill=s.relleno, outline=""))
+            if s.color is not None:
+                usados.add(self._elemento(("linea", i), c.create_line, puntos, fill=s.color, width=1))
+
+        # Ejes y etiquetas encima de las series
+        usados.add(self._elemento(("eje", "x"), c.create_line, (x0, y0, x1, y0), fill=self.fg))
+        usados.add(self._elemento(("eje", "y"), c.create_line, (x0, y0, x0, y1), fill=self.fg))
+        for n in (0, self.niveles // 2, self.niveles - 1):
+            usados.add(self._elemento(("tic", n), c.create_text, (x0 + (n + 0.5) * escala_x, y0 + 1),
+                                    text=str(n), fill=self.fg, font=FUENTE, anchor="n"))
+        usados.add(self._elemento(("tic", "y"), c.create_text, (x0 - 3, y1),
+                                text=_compacto(tope / 1.05), fill=self.fg, font=FUENTE, anchor="ne"))
+
+        # Lo que sobró del dibujo anterior (otra cantidad de series)
+        for clave in [k for k in self.elementos if k not in usados]:
+            c.delete(self.elementos.pop(clave))
+            self.opciones.pop(clave, None)
+        # Un área nueva no debe tapar la línea que ya existía, ni nada a los ejes
+        for clave in [k for k in self.elementos if k[0] == "linea"] + [("eje", "x"), ("eje", "y")]:
+            c.tag_raise(self.elementos[clave])
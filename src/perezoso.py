@@ -0,0 +1,51 @@
+"""
+Importación diferida de módulos pesados.
+
+    sfft = perezoso.modulo("scipy.fft")
+
+devuelve un sustituto que importa el módulo de verdad en el primer acceso a
+un atributo (sfft.rfft2). Así el arranque de la interfaz no paga SciPy ni
+las prácticas que todavía no se usan.
+
+El sustituto no se registra en sys.modules: importar el módulo por su nombre
+da siempre el real, y cada acceso se reenvía a ese módulo, así que ve los
+cambios que se le hagan (p. ej. las funciones envueltas por src.trazas).
+"""
+import importlib
+import sys
+import threading
+import types
+
+class ModuloDiferido(types.ModuleType):
+
+    def __init__(self, nombre):
+        super().__init__(nombre)
+        self.__dict__["_real"] = None
+        self.__dict__["_cerrojo"] = threading.Lock()
+
+    def _cargar(self):
+        real = self.__dict__["_real"]
+        if real is None:
+            with self.__dict__["_cerrojo"]:
+                real = self.__dict__["_real"]
+                if real is None:
+                    real = importlib.import_module(self.__name__)
+                    self.__dict__["_real"] = real
+        return real
+
+    def __getattr__(self, atributo):
+        # Solo se llama para lo que no está en el propio sustituto
+        return getattr(self._cargar(), atributo)
+
+    def __dir__(self):
+        return dir(self._cargar())
+
+    def __repr__(self):
+        estado = "cargado" if self.__dict__["_real"] is not None else "sin cargar"
+        return f"<módulo diferido {self.__name__!r} ({estado})>"
+
+def modulo(nombre):
+    """El módulo si ya está importado; si no, un sustituto que lo importa al usarlo"""
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    return ModuloDiferido(nombre)
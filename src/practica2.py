@@ -1,6 +1,7 @@
+from functools import lru_cache
+
 import cv2
 import numpy as np
-from matplotlib.colors import LinearSegmentedColormap
 
 # --- DEFINICIÓN DE PALETAS ---
 
@@ -34,42 +35,66 @@ colores_popsicle = [
     (0.0, 0.0, 1.0)   # Azul Intenso
 ]
 
+# Registro de paletas con nombre (lo que muestran los botones de la interfaz)
+PALETAS = {
+    "Pastel": colores_pastel,
+    "Tron": colores_tron,
+    "Tron Ares": colores_tron_ares,
+    "Divisiones": colores_divisiones,
+    "Arcoiris": colores_arcoiris,
+    "Popsicle": colores_popsicle,
+}
+
+# --- CONSTRUCCIÓN DE TABLAS (una sola vez por paleta) ---
+
+def construir_tabla(colores, N=256):
+    """
+    Tabla RGB uint8 (N, 3) con un degradado lineal entre colores equiespaciados.
+    Reproduce LinearSegmentedColormap.from_list(..., N=256) de matplotlib
+    muestreado en 256 puntos, sin necesidad de importar matplotlib.
+    """
+    colores = np.asarray(colores, dtype=np.float64)
+    x = np.linspace(0, 1, len(colores)) * (N - 1)
+    xind = (N - 1) * np.linspace(0, 1, N)
+    ind = np.searchsorted(x, xind)[1:-1]
+    distancia = ((xind[1:-1] - x[ind - 1]) / (x[ind] - x[ind - 1]))[:, None]
+
+    tabla = np.empty((N, 3), dtype=np.float64)
+    tabla[0] = colores[0]
+    tabla[-1] = colores[-1]
+    tabla[1:-1] = distancia * (colores[ind] - colores[ind - 1]) + colores[ind - 1]
+    tabla = (np.clip(tabla, 0.0, 1.0) * 255).astype(np.uint8)
+    tabla.flags.writeable = False
+    return tabla
+
+@lru_cache(maxsize=None)
+def tabla_paleta(nombre_mapa):
+    if nombre_mapa not in PALETAS:
+        raise ValueError(f"Mapa de color desconocido: {nombre_mapa}")
+    return construir_tabla(PALETAS[nombre_mapa])
+
+@lru_cache(maxsize=64)
+def tabla_usuario(c1, c2, c3):
+    # Las claves son los colores elegidos (tuplas 0-255)
+    return construir_tabla([[x / 255.0 for x in c] for c in (c1, c2, c3)])
+
 # --- LÓGICA DE APLICACIÓN ---
 
-def aplicar_colormap_matplotlib(img, nombre_mapa):
-    colors = []
-    N = 256
-    
-    if nombre_mapa == "Pastel": colors = colores_pastel
-    elif nombre_mapa == "Tron": colors = colores_tron
-    elif nombre_mapa == "Tron Ares": colors = colores_tron_ares
-    elif nombre_mapa == "Divisiones": 
-        colors = colores_divisiones
-        N = 3
-    elif nombre_mapa == "Arcoiris": 
-        colors = colores_arcoiris
-        N = 7
-    elif nombre_mapa == "Popsicle":  # CAMBIO AQUÍ
-        colors = colores_popsicle
-        N = 256 # Gradiente suave
-    
-    # Crear Colormap
-    cmap = LinearSegmentedColormap.from_list(nombre_mapa, colors, N=256)
-    
-    # Convertir a LUT
-    gradient = np.linspace(0, 1, 256)
-    lut_rgba = cmap(gradient) 
-    lut_rgb = (lut_rgba[:, :3] * 255).astype(np.uint8)
-    lut_bgr = cv2.cvtColor(np.expand_dims(lut_rgb, 0), cv2.COLOR_RGB2BGR)
-    
-    # Aplicar
+def aplicar_tabla(img, tabla):
+    """
+    Indexa la tabla RGB con el gris directamente (sin expandir a BGR ni
+    convertir colores): una búsqueda por canal sobre el gris y un merge.
+    """
     if len(img.shape) == 3:
         gris = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
     else:
         gris = img
-        
-    res = cv2.LUT(cv2.cvtColor(gris, cv2.COLOR_GRAY2BGR), lut_bgr)
-    return cv2.cvtColor(res, cv2.COLOR_BGR2RGB)
+
+    return cv2.merge([cv2.LUT(gris, np.ascontiguousarray(tabla[:, i])) for i in range(3)])
+
+def aplicar_colormap_matplotlib(img, nombre_mapa):
+    # Se conserva el nombre por compatibilidad: la tabla ya no usa matplotlib
+    return aplicar_tabla(img, tabla_paleta(nombre_mapa))
 
 def aplicar_colormap_opencv(img, tipo):
     if len(img.shape) == 3: gris = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
@@ -84,22 +109,6 @@ def aplicar_colormap_opencv(img, tipo):
     return cv2.cvtColor(res, cv2.COLOR_BGR2RGB)
 
 def crear_mapa_usuario(img, c1, c2, c3):
-    # Normalizar colores (0-255 -> 0-1)
-    c1_norm = [x/255.0 for x in c1]
-    c2_norm = [x/255.0 for x in c2]
-    c3_norm = [x/255.0 for x in c3]
-    
-    colors = [c1_norm, c2_norm, c3_norm]
-    
-    cmap = LinearSegmentedColormap.from_list("CustomUser", colors, N=256)
-    
-    gradient = np.linspace(0, 1, 256)
-    lut_rgba = cmap(gradient)
-    lut_rgb = (lut_rgba[:, :3] * 255).astype(np.uint8)
-    lut_bgr = cv2.cvtColor(np.expand_dims(lut_rgb, 0), cv2.COLOR_RGB2BGR)
-    
-    if len(img.shape) == 3: gris = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-    else: gris = img
-        
-    res = cv2.LUT(cv2.cvtColor(gris, cv2.COLOR_GRAY2BGR), lut_bgr)
-    return cv2.cvtColor(res, cv2.COLOR_BGR2RGB)
\ No newline at end of file
+    # Colores del usuario (0-255) como clave del registro
+    clave = tuple(tuple(float(x) for x in c) for c in (c1, c2, c3))
+    return aplicar_tabla(img, tabla_usuario(*clave))
\ No newline at end of file
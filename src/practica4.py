@@ -1,6 +1,7 @@
 import cv2
 import numpy as np
-from scipy import ndimage
+
+from src import brujula, convolucion, rango
 
 # --- GENERACIÓN DE RUIDO ---
 
@@ -52,20 +53,38 @@ def ruido_gaussiano(img):
 
 # --- FILTROS PASO BAJAS (SUAVIZADO) ---
 
+# Los filtros lineales pasan por src.convolucion, que elige entre suma de caja,
+# dos pasadas separables, correlación directa, DFT o el GaussianBlur de OpenCV
+# según el tamaño del kernel y de la imagen. El gaussiano es el de OpenCV
+# hasta k ~ 100; más grande va por DFT y puede diferir hasta en 2 niveles.
+
 def filtro_promedio(img, k_size):
-    return cv2.blur(img, (k_size, k_size))
+    return convolucion.convolucionar(img, convolucion.nucleo_caja(k_size))
 
-def filtro_promedio_pesado(img, k_size=3):
-    # Aproximación gaussiana 3x3 estándar
-    kernel = np.array([[1, 2, 1], [2, 4, 2], [1, 2, 1]]) / 16
-    if k_size == 5: # Ejemplo 5x5
-        kernel = np.ones((5,5), np.float32) / 25
-        # (Podríamos definir uno pesado 5x5 específico, pero usaremos conv estándar)
-    return cv2.filter2D(img, -1, kernel)
+def filtro_promedio_pesado(img, k_size=3, binomial=False):
+    """
+    Aproximación gaussiana 3x3 estándar ([1 2 1] x [1 2 1] / 16); con k_size=5
+    el promedio 5x5. binomial=True: binomial de k_size (fila de Pascal:
+    [1 4 6 4 1] en 5x5...), para cualquier tamaño.
+    """
+    if binomial:
+        nucleo = convolucion.nucleo_binomial(k_size)
+    elif k_size == 5:
+        nucleo = convolucion.nucleo_caja(5)
+    else:
+        nucleo = convolucion.nucleo_binomial(3)
+    return convolucion.convolucionar(img, nucleo)
 
 def filtro_gaussiano(img, k_size):
-    # SigmaX=0 deja que OpenCV lo calcule basado en k_size
-    return cv2.GaussianBlur(img, (k_size, k_size), 0)
+    # Sigma a partir de k_size con la misma regla que OpenCV (SigmaX=0)
+    return convolucion.convolucionar(img, convolucion.nucleo_gaussiano(k_size))
+
+def filtro_kernel(img, kernel, divisor=None):
+    """
+    Kernel del usuario (lista de filas, p. ej. [[0,-1,0],[-1,5,-1],[0,-1,0]]).
+    divisor=None: la suma de los coeficientes, o 1 si suman 0.
+    """
+    return convolucion.convolucionar(img, convolucion.nucleo_matriz(kernel, divisor))
 
 def filtro_bilateral(img, k_size):
     # Bilateral es lento, mantenemos sigmaColor y sigmaSpace fijos moderados
@@ -73,38 +92,36 @@ def filtro_bilateral(img, k_size):
 
 # --- FILTROS NO LINEALES ---
 
-def filtro_mediana(img, k_size):
+# Todos pueden usar el motor de rango (src.rango, histograma deslizante).
+# Mediana, máximo y mínimo ya tienen en OpenCV una versión de coste constante,
+# así que el motor es opcional (usar_motor=True) para ellos.
+
+def filtro_mediana(img, k_size, usar_motor=False):
     # k_size debe ser impar
     if k_size % 2 == 0: k_size += 1
+    if usar_motor: return rango.filtro_rango(img, k_size, "mediana")
     return cv2.medianBlur(img, k_size)
 
-def filtro_maximo(img, k_size):
+def filtro_maximo(img, k_size, usar_motor=False):
     # El filtro máximo es equivalente a una DILATACIÓN morfológica
+    if usar_motor: return rango.filtro_rango(img, k_size, "max")
     kernel = np.ones((k_size, k_size), np.uint8)
     return cv2.dilate(img, kernel)
 
-def filtro_minimo(img, k_size):
+def filtro_minimo(img, k_size, usar_motor=False):
     # El filtro mínimo es equivalente a una EROSIÓN morfológica
+    if usar_motor: return rango.filtro_rango(img, k_size, "min")
     kernel = np.ones((k_size, k_size), np.uint8)
     return cv2.erode(img, kernel)
 
-def filtro_moda(img, k_size=3):
-    # Este es computacionalmente costoso. Usamos scipy.
-    # ADVERTENCIA: Puede ser lento en imágenes grandes.
-    if len(img.shape) == 3:
-        # Procesar canal por canal o convertir a gris
-        img_gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-    else:
-        img_gray = img
-
-    # Definir función para ventana deslizante
-    def get_mode(x):
-        vals, counts = np.unique(x, return_counts=True)
-        return vals[np.argmax(counts)]
+def filtro_percentil(img, k_size, percentil=50):
+    # Generaliza mediana (50), mínimo (0) y máximo (100)
+    return rango.filtro_rango(img, k_size, percentil)
 
-    # Aplicar filtro genérico
-    res = ndimage.generic_filter(img_gray, get_mode, size=k_size)
-    return cv2.cvtColor(res, cv2.COLOR_GRAY2RGB) # Devolver formato compatible
+def filtro_moda(img, k_size=3):
+    # Histograma deslizante por canal: el coste no depende de k_size
+    # y las imágenes a color conservan su color (antes se pasaban a gris).
+    return rango.filtro_rango(img, k_size, "moda")
 
 # --- FILTROS PASO ALTAS (BORDES) ---
 # Nota: La mayoría de estos funcionan mejor en escala de grises.
@@ -115,16 +132,17 @@ def preparar_bordes(img):
         return cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
     return img
 
-def filtro_sobel(img):
+def magnitud_sobel(img):
     gray = preparar_bordes(img)
     # Gradientes X e Y
     sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
     sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
     # Magnitud del gradiente
-    mag = cv2.magnitude(sobelx, sobely)
+    return cv2.magnitude(sobelx, sobely)
+
+def filtro_sobel(img):
     # Normalizar a 0-255
-    res = cv2.normalize(mag, None, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U)
-    return res
+    return cv2.normalize(magnitud_sobel(img), None, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U)
 
 def filtro_prewitt(img):
     gray = preparar_bordes(img)
@@ -148,31 +166,34 @@ def filtro_canny(img):
     # Umbrales 100 y 200 son estándar, podrían ser parámetros
     return cv2.Canny(gray, 100, 200)
 
-def filtro_laplaciano(img):
+def magnitud_laplaciano(img):
     gray = preparar_bordes(img)
     # Laplaciano es muy sensible al ruido, a veces se suaviza antes
-    lap = cv2.Laplacian(gray, cv2.CV_64F)
-    res = cv2.normalize(np.abs(lap), None, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U)
-    return res
+    return np.abs(cv2.Laplacian(gray, cv2.CV_64F))
+
+def filtro_laplaciano(img):
+    return cv2.normalize(magnitud_laplaciano(img), None, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U)
 
 def filtro_kirsch(img):
     gray = preparar_bordes(img)
-    # Kirsch usa 8 máscaras rotativas (Brújula)
-    # Definimos la base y rotamos o definimos manual
-    k1 = np.array([[5, 5, 5], [-3, 0, -3], [-3, -3, -3]])
-    k2 = np.array([[-3, 5, 5], [-3, 0, 5], [-3, -3, -3]])
-    k3 = np.array([[-3, -3, 5], [-3, 0, 5], [-3, -3, 5]])
-    k4 = np.array([[-3, -3, -3], [-3, 0, 5], [-3, 5, 5]])
-    k5 = np.array([[-3, -3, -3], [-3, 0, -3], [5, 5, 5]])
-    k6 = np.array([[-3, -3, -3], [5, 0, -3], [5, 5, -3]])
-    k7 = np.array([[5, -3, -3], [5, 0, -3], [5, -3, -3]])
-    k8 = np.array([[5, 5, -3], [5, 0, -3], [-3, -3, -3]])
-    
-    kernels = [k1, k2, k3, k4, k5, k6, k7, k8]
-    max_response = np.zeros_like(gray)
-    
-    for k in kernels:
-        resp = cv2.filter2D(gray, -1, k)
-        max_response = np.maximum(max_response, resp)
-        
-    return max_response
\ No newline at end of file
+    # Kirsch usa 8 máscaras rotativas (Brújula). El motor de brújula obtiene las
+    # 8 respuestas de los mismos vecinos en int16 (sin 8 filter2D saturados).
+    magnitud, _ = brujula.respuestas_brujula(gray, "kirsch", con_direccion=False)
+    # Recortar a 0-255 equivale al máximo de las 8 respuestas saturadas a uint8
+    return np.clip(magnitud, 0, 255).astype(np.uint8)
+
+def filtro_robinson(img):
+    gray = preparar_bordes(img)
+    # Robinson: máscaras tipo Sobel rotadas 45° (solo 4 son distintas en signo)
+    magnitud, _ = brujula.respuestas_brujula(gray, "robinson", con_direccion=False)
+    return np.clip(magnitud, 0, 255).astype(np.uint8)
+
+def direccion_bordes(img, operador="kirsch"):
+    """Visualiza la dirección ganadora como color (matiz) y la magnitud como brillo"""
+    gray = preparar_bordes(img)
+    magnitud, direccion = brujula.respuestas_brujula(gray, operador)
+    brillo = cv2.normalize(np.clip(magnitud, 0, None), None, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U)
+    # 8 direcciones repartidas en el círculo de matiz de OpenCV (0-179)
+    matiz = (direccion.astype(np.uint16) * 180 // 8).astype(np.uint8)
+    hsv = cv2.merge([matiz, np.full_like(matiz, 255), brillo])
+    return cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
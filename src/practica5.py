@@ -1,6 +1,9 @@
 import cv2
 import numpy as np
 
+from src import fabrica_lut
+from src import umbrales
+
 # --- UTILIDADES ---
 
 def get_gray(img):
@@ -22,117 +25,89 @@ def apply_lut(img, lut):
 
 # --- 1. TÉCNICAS DE SEGMENTACIÓN ---
 
+# Los umbrales se calculan en src.umbrales sobre un único histograma por
+# versión de imagen: cambiar de método no vuelve a recorrer los píxeles.
+
 def seg_otsu(img):
-    gray = get_gray(img)
-    _, binaria = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-    return binaria
+    return umbrales.binarizar(img, "otsu")
 
 def seg_media(img):
-    gray = get_gray(img)
-    media = np.mean(gray)
-    _, binaria = cv2.threshold(gray, media, 255, cv2.THRESH_BINARY)
-    return binaria
+    return umbrales.binarizar(img, "media")
 
 def seg_kapur(img):
     """Método de Entropía Máxima de Kapur"""
-    gray = get_gray(img)
-    hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).flatten()
-    # Normalizar histograma (probabilidades)
-    total_pixels = gray.size
-    p = hist / total_pixels
-    
-    # Calcular tablas acumulativas para optimizar
-    # P(t): Probabilidad acumulada hasta t
-    # H(t): Entropía acumulada hasta t
-    
-    # Evitamos log(0) con eps
-    eps = 1e-10
-    
-    max_entropy = -float('inf')
-    best_thresh = 128
-    
-    # Pre-calcular entropía global para acelerar? No, Kapur divide en 2 clases.
-    # Kapur: H(A) + H(B) maximizado.
-    
-    # Fuerza bruta optimizada sobre 256 niveles
-    p_cum = np.cumsum(p)
-    h_cum = np.cumsum(-p * np.log(p + eps))
-    
-    for t in range(1, 255):
-        # Probabilidades de clases w0 y w1
-        w0 = p_cum[t]
-        w1 = 1.0 - w0
-        
-        if w0 == 0 or w1 == 0: continue
-            
-        # Entropías normalizadas por clase
-        # H0 = -sum(pi/w0 * log(pi/w0)) = 1/w0 * sum(-pi*log pi) + log(w0)
-        h0 = (h_cum[t] / w0) + np.log(w0 + eps)
-        
-        # H1 similar pero desde t+1 hasta 255
-        h1 = ((h_cum[255] - h_cum[t]) / w1) + np.log(w1 + eps)
-        
-        total_ent = h0 + h1
-        
-        if total_ent > max_entropy:
-            max_entropy = total_ent
-            best_thresh = t
-            
-    _, binaria = cv2.threshold(gray, best_thresh, 255, cv2.THRESH_BINARY)
-    return binaria
+    return umbrales.binarizar(img, "kapur")
 
 def seg_min_histograma(img):
-    """Busca el valle entre dos picos principales del histograma suavizado"""
+    """Isodata (media iterativa), que suele converger al valle entre los dos picos"""
+    return umbrales.binarizar(img, "isodata")
+
+def seg_metodo(img, metodo):
+    """Binariza con cualquier método de src.umbrales (kittler, triangulo, momentos...)"""
+    return umbrales.binarizar(img, metodo)
+
+# Multiumbral: Otsu con k umbrales (k + 1 clases) sobre el histograma.
+# Maximizar la varianza entre clases equivale a maximizar sum(S_c^2 / W_c)
+# (W_c = píxeles de la clase, S_c = suma de sus niveles). Con las sumas
+# acumuladas de W y S, el término de cada rango de niveles [a, b] sale de una
+# tabla de 256x256 y la mejor partición se busca por programación dinámica:
+# O(k * 256^2), sin importar el tamaño de la imagen.
+
+def umbrales_otsu(hist, k=2):
+    """
+    k umbrales de Otsu multinivel de un histograma de 256 niveles.
+    Cada umbral es el último nivel de su clase (como cv2.threshold: > t va arriba).
+    """
+    k = int(k)
+    niveles = len(hist)
+    if not 1 <= k < niveles:
+        raise ValueError(f"El número de umbrales debe estar entre 1 y {niveles - 1}")
+
+    h = np.asarray(hist, dtype=np.float64).ravel()
+    W = np.concatenate([[0.0], np.cumsum(h)])
+    S = np.concatenate([[0.0], np.cumsum(h * np.arange(niveles))])
+
+    # termino[a, b] = S^2 / W del rango [a, b]; -inf si a > b (rango vacío)
+    dw = W[None, 1:] - W[:-1, None]
+    ds = S[None, 1:] - S[:-1, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        termino = np.where(dw > 0, ds * ds / dw, 0.0)
+    termino[np.tril_indices(niveles, -1)] = -np.inf
+
+    # mejor[b]: valor óptimo con c + 1 clases cubriendo los niveles 0..b
+    mejor = termino[0].copy()
+    origen = []
+    for _ in range(k):
+        # La nueva clase empieza en a (1..255): mejor[a - 1] + termino[a, b]
+        candidatos = mejor[:-1, None] + termino[1:, :]
+        inicio = np.argmax(candidatos, axis=0)     # el primero entre empates, como cv2
+        mejor = candidatos[inicio, np.arange(niveles)]
+        origen.append(inicio + 1)
+
+    # Reconstrucción desde el último nivel: cada clase empieza en origen[c][b]
+    umbrales = []
+    b = niveles - 1
+    for inicio in reversed(origen):
+        b = int(inicio[b]) - 1
+        umbrales.append(b)
+    return umbrales[::-1]
+
+def otsu_multinivel(img, k=2):
+    """(umbrales, etiquetas): etiquetas es uint8 con la clase 0..k de cada píxel"""
     gray = get_gray(img)
-    hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).flatten()
-    
-    # Suavizar histograma para eliminar ruido local
-    hist_smooth = cv2.GaussianBlur(hist.reshape(1, -1), (1, 15), 5).flatten()
-    
-    # Encontrar picos y valles simples no es trivial robustamente.
-    # Aproximación: Usamos método iterativo de medias (Isodata) que suele converger al valle
-    # O implementamos Kittler-Illingworth (Min Error).
-    # Haremos Isodata iterativo (Media iterativa) que es muy efectivo.
-    t = 128
-    while True:
-        g1 = gray[gray <= t]
-        g2 = gray[gray > t]
-        if len(g1) == 0 or len(g2) == 0: break
-        m1 = np.mean(g1)
-        m2 = np.mean(g2)
-        new_t = int((m1 + m2) / 2)
-        if new_t == t: break
-        t = new_t
-        
-    _, binaria = cv2.threshold(gray, t, 255, cv2.THRESH_BINARY)
-    return binaria
-
-def seg_multiumbral(img):
-    """Divide la imagen en 3 regiones (2 umbrales) usando Otsu Recursivo"""
+    cortes = umbrales_otsu(umbrales.histograma_gris(img, gray), k)
+    # Una sola pasada de LUT: nivel -> número de umbrales que supera
+    lut = np.searchsorted(np.asarray(cortes), np.arange(256), side="left").astype(np.uint8)
+    return cortes, cv2.LUT(gray, lut)
+
+def seg_multiumbral(img, k=2):
+    """Divide la imagen en k + 1 regiones (k umbrales de Otsu) con grises equiespaciados"""
     gray = get_gray(img)
-    # Otsu normal para encontrar primer corte
-    thresh1, _ = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-    
-    # Dividir en dos regiones
-    region1 = gray[gray <= thresh1]
-    region2 = gray[gray > thresh1]
-    
-    # Aplicar Otsu a la región superior (o la más grande/variada)
-    # Por simplicidad, calculamos Otsu en la segunda mitad para sacar un segundo umbral alto
-    _, th2_local = cv2.threshold(region2, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-    thresh2 = thresh1 # Si falla, se queda igual
-    
-    # Re-calculamos otsu global masked? Más fácil: Otsu 2-niveles aproximado:
-    # Usaremos 85 y 170 como semillas o buscamos.
-    # Para cumplir "multiumbral" simple visualmente:
-    res = np.zeros_like(gray)
-    res[gray > thresh1] = 127
-    # Un segundo umbral arbitrario basado en media de la parte alta
-    if len(region2) > 0:
-        thresh2 = int(np.mean(region2))
-        res[gray > thresh2] = 255
-        
-    return res
+    cortes = umbrales_otsu(umbrales.histograma_gris(img, gray), k)
+    clases = np.searchsorted(np.asarray(cortes), np.arange(256), side="left")
+    # Clase c -> gris c * 255 // k (0, 127, 255 con k = 2)
+    lut = (clases * 255 // len(cortes)).astype(np.uint8)
+    return cv2.LUT(gray, lut)
 
 def seg_umbral_banda(img, lower, upper):
     gray = get_gray(img)
@@ -164,70 +139,38 @@ def eq_exponencial(img, alpha=0.05):
     # Para histogram matching exacto se requiere igualar CDFs. 
     # Aquí aplicaremos una transformación directa de función de transferencia para efecto visual.
     # T(r) = -1/alpha * ln(1 - r) (Inversa de exponencial) -> Expande oscuros.
-    
-    lut = np.zeros(256, dtype=np.uint8)
-    for i in range(256):
-        r = i / 255.0
-        # Formula aproximada para efecto exponencial visual
-        val = 255 * (1 - np.exp(-alpha * i)) 
-        lut[i] = np.clip(val, 0, 255)
-    return apply_lut(img, lut)
+    return apply_lut(img, fabrica_lut.lut_curva("exponencial", alpha))
 
 def eq_rayleigh(img, alpha=0.4):
     # Distribución Rayleigh
-    lut = np.zeros(256, dtype=np.uint8)
     # Usamos histogram matching simplificado
     # Mapeamos la entrada uniforme a Rayleigh
     # z = sqrt(2*alpha^2 * ln(1/(1-P(r))))
     # Asumimos entrada ecualizada (Prob Uniforme P(r)=r)
-    g_max = np.sqrt(2 * alpha**2 * np.log(1 / (1 - 0.999))) # Para normalizar
-    
-    for i in range(256):
-        r = i / 255.0 # Probabilidad acumulada (si asumimos imagen plana)
-        if r >= 1.0: r = 0.999
-        val_ray = np.sqrt(2 * alpha**2 * np.log(1 / (1 - r)))
-        lut[i] = np.clip((val_ray / g_max) * 255, 0, 255)
-        
-    return apply_lut(img, lut)
+    return apply_lut(img, fabrica_lut.lut_curva("rayleigh", alpha))
 
 def eq_hipercubica(img):
     # Transformación de potencia cúbica (raíz cúbica para aclarar o cubo para contrastar)
     # Usualmente Hipercúbica se refiere a elevar a 1/3
-    lut = np.zeros(256, dtype=np.uint8)
-    for i in range(256):
-        r = i / 255.0
-        val = r ** (1/3.0) * 255
-        lut[i] = np.clip(val, 0, 255)
-    return apply_lut(img, lut)
+    return apply_lut(img, fabrica_lut.lut_curva("hipercubica"))
 
 def eq_logaritmica(img):
     # T(r) = c * log(1 + r)
-    c = 255 / np.log(1 + 255)
-    lut = np.zeros(256, dtype=np.uint8)
-    for i in range(256):
-        val = c * np.log(1 + i)
-        lut[i] = np.clip(val, 0, 255)
-    return apply_lut(img, lut)
+    return apply_lut(img, fabrica_lut.lut_curva("logaritmica"))
 
 def correccion_gamma(img, gamma=1.0):
     # T(r) = r^gamma
-    inv_gamma = 1.0 / gamma
-    lut = np.array([((i / 255.0) ** inv_gamma) * 255 for i in range(256)]).astype("uint8")
-    return apply_lut(img, lut)
+    return apply_lut(img, fabrica_lut.lut_curva("gamma", gamma))
 
 def func_potencia(img, potencia=2.0):
     # T(r) = r^p
-    lut = np.array([((i / 255.0) ** potencia) * 255 for i in range(256)]).astype("uint8")
-    return apply_lut(img, lut)
+    return apply_lut(img, fabrica_lut.lut_curva("potencia", potencia))
 
 # --- OPERACIONES DE HISTOGRAMA ---
 
 def desplazar_histograma(img, valor):
     # Sumar constante
-    lut = np.zeros(256, dtype=np.uint8)
-    for i in range(256):
-        lut[i] = np.clip(i + valor, 0, 255)
-    return apply_lut(img, lut)
+    return apply_lut(img, fabrica_lut.lut_curva("desplazamiento", valor))
 
 def expansion_histograma(img):
     # Contrast Stretching (Min-Max)
@@ -236,19 +179,8 @@ def expansion_histograma(img):
     
     if max_val - min_val == 0: return img # Evitar div por cero
     
-    lut = np.zeros(256, dtype=np.uint8)
-    for i in range(256):
-        val = (i - min_val) * (255.0 / (max_val - min_val))
-        lut[i] = np.clip(val, 0, 255)
-    return apply_lut(img, lut)
+    return apply_lut(img, fabrica_lut.lut_curva("expansion", min_val, max_val))
 
 def contraccion_histograma(img, min_out, max_out):
     # Comprimir rango a [min_out, max_out]
-    lut = np.zeros(256, dtype=np.uint8)
-    min_in, max_in = 0, 255
-    slope = (max_out - min_out) / (max_in - min_in)
-    
-    for i in range(256):
-        val = min_out + slope * (i - min_in)
-        lut[i] = np.clip(val, 0, 255)
-    return apply_lut(img, lut)
\ No newline at end of file
+    return apply_lut(img, fabrica_lut.lut_curva("contraccion", min_out, max_out))
\ No newline at end of file
@@ -1,6 +1,14 @@
+from functools import lru_cache
+
 import cv2
 import numpy as np
 
+from src import perezoso
+from src.cache_version import memo
+
+# SciPy se importa con la primera transformada, no al abrir la interfaz
+sfft = perezoso.modulo("scipy.fft")
+
 # --- UTILIDADES INTERNAS ---
 
 def preparar_imagen_fft(img):
@@ -20,12 +28,58 @@ def postprocesar_imagen(img_float):
     # Devolver como RGB para que la interfaz lo muestre bien
     return cv2.cvtColor(res, cv2.COLOR_GRAY2RGB)
 
+# --- CACHÉ DE ESPECTROS ---
+# La FFT directa de una imagen se calcula una sola vez por versión de imagen
+# (src.cache_version): probar Ideal, Gaussiano y Butterworth con varios cortes
+# solo repite la multiplicación por la máscara y la inversa.
+# Entrada real -> rfft2 (medio espectro), float32/complex64 y todos los núcleos.
+
+def tamano_rapido(rows, cols):
+    """Tamaño >= (rows, cols) que la FFT resuelve rápido (factores 2, 3, 5)"""
+    return sfft.next_fast_len(rows, real=True), sfft.next_fast_len(cols, real=True)
+
+def espectro_real(img, rapido=False, color=False):
+    """
+    rfft2 (complex64) de la imagen en grises normalizada a 0-1.
+    rapido=True rellena por reflexión hasta un tamaño rápido de DFT (ver
+    aplicar_filtro_frecuencia: cambia el resultado del filtrado).
+    color=True (imagen RGB): los 3 canales en una sola transformada por lotes,
+    en planos contiguos (3, filas, columnas//2 + 1).
+    """
+    rows, cols = img.shape[:2]
+    forma = tamano_rapido(rows, cols) if rapido else (rows, cols)
+    color = color and len(img.shape) == 3
+
+    def calcular():
+        canales = cv2.split(img) if color else [img]
+        planos = []
+        for canal in canales:
+            plano = preparar_imagen_fft(canal)
+            if forma != (rows, cols):
+                plano = cv2.copyMakeBorder(plano, 0, forma[0] - rows, 0, forma[1] - cols, cv2.BORDER_REFLECT)
+            planos.append(plano)
+        # Planos contiguos: la FFT por lotes recorre memoria seguida en cada canal
+        datos = np.stack(planos) if color else planos[0]
+        return sfft.rfft2(datos, workers=-1)
+    return memo(img, ("rfft2", forma, color), calcular)
+
+def espectro_centrado(img):
+    """Espectro completo centrado (como fftshift(fft2)) reconstruido del medio espectro"""
+    rows, cols = img.shape[:2]
+    R = espectro_real(img, rapido=False)
+    # Simetría hermítica de una entrada real: F[u, v] = conj(F[-u, -v])
+    F = np.empty((rows, cols), dtype=R.dtype)
+    mitad = R.shape[1]
+    F[:, :mitad] = R
+    if cols > mitad:
+        resto = np.conj(R[(-np.arange(rows)) % rows][:, 1:cols - mitad + 1][:, ::-1])
+        F[:, mitad:] = resto
+    return sfft.fftshift(F)
+
 # --- FFT Y ESPECTROS ---
 
 def obtener_espectro_magnitud(img):
-    gray = preparar_imagen_fft(img)
-    F = np.fft.fft2(gray)
-    Fshift = np.fft.fftshift(F)
+    Fshift = espectro_centrado(img)
     # Magnitud logarítmica para visualización: log(1 + abs(F))
     magnitude = np.log(1 + np.abs(Fshift))
     
@@ -35,9 +89,7 @@ def obtener_espectro_magnitud(img):
     return cv2.applyColorMap(magnitude_norm, cv2.COLORMAP_JET)
 
 def obtener_espectro_fase(img):
-    gray = preparar_imagen_fft(img)
-    F = np.fft.fft2(gray)
-    Fshift = np.fft.fftshift(F)
+    Fshift = espectro_centrado(img)
     phase = np.angle(Fshift)
     
     # La fase va de -pi a pi. Normalizar a 0-255.
@@ -48,69 +100,114 @@ def obtener_espectro_fase(img):
 
 # --- FILTROS DE FRECUENCIA ---
 
-def crear_mascara(shape, tipo_filtro, modo_paso, cutoff_norm, orden=2):
-    rows, cols = shape
-    crow, ccol = rows // 2, cols // 2
-    
-    # Crear malla de coordenadas
-    y, x = np.ogrid[:rows, :cols]
-    # Distancia euclidiana al centro
-    d_center = np.sqrt((x - ccol)**2 + (y - crow)**2)
-    
-    # Radio máximo para normalizar cutoff (0.0 - 1.0)
-    # Usamos min dimension / 2 como referencia del radio total
-    radius = min(crow, ccol)
+# Las máscaras solo dependen del tamaño y de (tipo, modo, corte, orden): las
+# frecuencias al cuadrado se guardan por tamaño y las últimas máscaras en un
+# LRU, así barrer cortes o cambiar bajas/altas no repite exp/pow por píxel.
+
+@lru_cache(maxsize=8)
+def _frecuencias(forma, forma_orig, centrada):
+    """
+    (fy², fx², d²) de cada coeficiente, en unidades de frecuencia de la imagen
+    original. centrada=True: malla completa con el centro en (rows//2, cols//2)
+    (como tras fftshift); False: medio espectro de rfft2 sin centrar.
+    """
+    rows, cols = forma
+    if centrada:
+        fy = np.arange(rows) - rows // 2
+        fx = np.arange(cols) - cols // 2
+    else:
+        # Índice entero con signo de cada fila/columna y reescalado si hay relleno
+        fy = sfft.fftfreq(rows, 1 / rows) * (forma_orig[0] / rows)
+        fx = sfft.rfftfreq(cols, 1 / cols) * (forma_orig[1] / cols)
+    # float32: los d² enteros son exactos hasta 2^24 y se recorre la mitad de memoria
+    fy2 = (fy.astype(np.float32)**2)[:, None]
+    fx2 = (fx.astype(np.float32)**2)[None, :]
+    d2 = fy2 + fx2
+    for arr in (fy2, fx2, d2): arr.flags.writeable = False
+    return fy2, fx2, d2
+
+@lru_cache(maxsize=6)
+def _mascara(forma, forma_orig, centrada, radius, tipo_filtro, modo_paso, cutoff_norm, orden):
+    fy2, fx2, d2 = _frecuencias(forma, forma_orig, centrada)
     d0 = cutoff_norm * radius # Frecuencia de corte en pixeles
     
     if d0 == 0: d0 = 1e-8 # Evitar división por cero
 
     if tipo_filtro == 'Ideal':
-        H = np.zeros((rows, cols), dtype=np.float32)
-        if modo_paso == 'Bajas':
-            H[d_center <= d0] = 1
-        else: # Altas
-            H[d_center > d0] = 1
+        # D <= D0  <=>  D^2 <= D0^2 (sin raíz por píxel)
+        umbral = np.float32(d0 * d0)
+        H = (d2 <= umbral) if modo_paso == 'Bajas' else (d2 > umbral)
             
     elif tipo_filtro == 'Gaussiano':
-        # H(u,v) = exp(-D^2 / (2*D0^2))
-        H = np.exp(-(d_center**2) / (2 * (d0**2)))
+        # H(u,v) = exp(-D^2 / (2*D0^2)) = exp(-v^2 / 2D0^2) * exp(-u^2 / 2D0^2):
+        # separable, solo rows + cols exponenciales y un producto exterior
+        H = np.exp(fy2 * np.float32(-1 / (2 * d0**2))) * np.exp(fx2 * np.float32(-1 / (2 * d0**2)))
         if modo_paso == 'Altas':
-            H = 1 - H
+            np.subtract(1, H, out=H)
             
     elif tipo_filtro == 'Butterworth':
-        # H(u,v) = 1 / (1 + (D/D0)^(2n))
-        H = 1 / (1 + (d_center / d0)**(2 * orden))
+        # H(u,v) = 1 / (1 + (D/D0)^(2n)) = 1 / (1 + (D^2/D0^2)^n)
+        r = d2 * np.float32(1 / d0**2)
+        if float(orden).is_integer() and orden >= 1:
+            # Orden entero (el deslizador): potencia por multiplicaciones, sin pow
+            H = r.copy()
+            for _ in range(int(orden) - 1): H *= r
+        else:
+            H = r**np.float32(orden)
+        # En sitio: 1 / (1 + p) y, para altas, 1 - H
+        H += 1
+        np.reciprocal(H, out=H)
         if modo_paso == 'Altas':
-            H = 1 - H
+            np.subtract(1, H, out=H)
+    else:
+        raise ValueError(f"Filtro desconocido: {tipo_filtro}")
             
+    H = H.astype(np.float32)
+    H.flags.writeable = False
     return H
 
-def aplicar_filtro_frecuencia(img, tipo_filtro, modo_paso, cutoff, orden=2):
+def crear_mascara(shape, tipo_filtro, modo_paso, cutoff_norm, orden=2):
+    """Máscara centrada (para multiplicar fftshift(fft2)) de tamaño shape"""
+    rows, cols = shape
+    crow, ccol = rows // 2, cols // 2
+    # Radio máximo para normalizar cutoff (0.0 - 1.0)
+    # Usamos min dimension / 2 como referencia del radio total
+    radius = min(crow, ccol)
+    return _mascara(tuple(shape), tuple(shape), True, radius, tipo_filtro, modo_paso, cutoff_norm, orden)
+
+def aplicar_filtro_frecuencia(img, tipo_filtro, modo_paso, cutoff, orden=2, color=False, rapido=False):
     """
     img: Imagen de entrada
     tipo_filtro: 'Ideal', 'Gaussiano', 'Butterworth'
     modo_paso: 'Bajas', 'Altas'
     cutoff: Valor 0-100 (slider), lo dividimos por 100 internamente
     orden: Entero (para Butterworth)
+    color: Filtra R, G y B por separado (misma máscara) en lugar de pasar a grises
+    rapido: Rellena por reflexión hasta un tamaño rápido de DFT y recorta. Más
+            rápido en tamaños incómodos (p. ej. primos), pero cambia el borde
+            periódico y remuestrea las frecuencias: el resultado puede diferir
+            mucho del filtrado al tamaño nativo (decenas de niveles con Ideal).
     """
-    gray = preparar_imagen_fft(img)
-    rows, cols = gray.shape
+    rows, cols = img.shape[:2]
+    color = color and len(img.shape) == 3
     
-    # 1. FFT
-    F = np.fft.fft2(gray)
-    Fshift = np.fft.fftshift(F)
+    # 1. FFT (en caché: solo se calcula la primera vez para esta imagen)
+    F = espectro_real(img, rapido=rapido, color=color)
+    forma = tamano_rapido(rows, cols) if rapido else (rows, cols)
     
-    # 2. Crear Máscara
+    # 2. Crear Máscara sobre el medio espectro sin centrar
     # Convertir cutoff de slider (0-100) a normalizado (0.0 - 1.0)
     cutoff_norm = cutoff / 100.0
-    H = crear_mascara((rows, cols), tipo_filtro, modo_paso, cutoff_norm, orden)
+    radius = min(rows // 2, cols // 2)
+    H = _mascara(forma, (rows, cols), False, radius, tipo_filtro, modo_paso, cutoff_norm, orden)
     
-    # 3. Aplicar Filtro
-    Gshift = Fshift * H
+    # 3. Aplicar Filtro (en color la misma máscara se difunde a los 3 planos)
+    G = F * H
     
-    # 4. Inversa (IFFT)
-    G = np.fft.ifftshift(Gshift)
-    g = np.fft.ifft2(G)
+    # 4. Inversa (IFFT) y recorte del relleno (si lo hubo)
+    g = sfft.irfft2(G, s=forma, workers=-1)[..., :rows, :cols]
     g_real = np.abs(g) # Magnitud de la inversa (parte real aprox)
     
-    return postprocesar_imagen(g_real)
\ No newline at end of file
+    if color:
+        return cv2.merge([(np.clip(c, 0, 1) * 255).astype(np.uint8) for c in g_real])
+    return postprocesar_imagen(g_real)
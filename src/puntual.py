@@ -0,0 +1,142 @@
+"""
+Fusión de operaciones puntuales.
+
+Muchas operaciones (gamma, potencia, logarítmica, desplazamiento, escalares...)
+son un mapa de 256 valores. Aplicadas una tras otra, cada una recorre la imagen
+completa (y en color hace además RGB -> HSV -> RGB). Aquí las encadenamos de
+forma perezosa: se componen sus LUTs en una sola tabla de 256 entradas y la
+imagen solo se recorre una vez, cuando una operación no puntual o la salida
+necesitan los píxeles.
+
+La interfaz guarda la cadena pendiente en el slot: muestra su vista previa
+aplicando la LUT a la imagen reducida y la materializa en segundo plano.
+"""
+import cv2
+import numpy as np
+
+from src.tareas import punto_de_control
+
+# Rampa 0..255 en escala de grises: al pasarla por una operación puntual
+# obtenemos exactamente su LUT (incluido el redondeo/saturación de OpenCV).
+RAMPA = np.arange(256, dtype=np.uint8).reshape(1, 256)
+
+# Operación -> dominio en el que actúa sobre imágenes a color:
+#   "V":   practica5.apply_lut (canal V en HSV)
+#   "RGB": la misma LUT en los tres canales (operaciones escalares de practica3)
+# En escala de grises ambos dominios son una LUT directa y se pueden mezclar.
+# (expansion_histograma no está: su LUT depende del mínimo/máximo de la imagen)
+OPERACIONES_PUNTUALES = {
+    "practica5.correccion_gamma": "V",
+    "practica5.func_potencia": "V",
+    "practica5.eq_exponencial": "V",
+    "practica5.eq_rayleigh": "V",
+    "practica5.eq_hipercubica": "V",
+    "practica5.eq_logaritmica": "V",
+    "practica5.desplazar_histograma": "V",
+    "practica5.contraccion_histograma": "V",
+    "practica3.sumar_escalar": "RGB",
+    "practica3.restar_escalar": "RGB",
+    "practica3.multiplicar_escalar": "RGB",
+}
+
+def es_puntual(nombre):
+    return nombre in OPERACIONES_PUNTUALES
+
+def lut_de_operacion(func, args):
+    """Extrae la LUT de 256 entradas de una operación puntual"""
+    return func(RAMPA, *args).reshape(256)
+
+def aplicar_lut_dominio(img, lut, dominio):
+    """Aplica una LUT en una sola pasada respetando el dominio de la operación"""
+    if len(img.shape) == 2 or dominio == "RGB":
+        return cv2.LUT(img, lut)
+    # Dominio V: una única ida y vuelta a HSV para toda la cadena
+    hsv = cv2.cvtColor(img, cv2.COLOR_RGB2HSV)
+    hsv[:, :, 2] = cv2.LUT(hsv[:, :, 2], lut)
+    return cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
+
+def histograma_lut(hist, lut):
+    """Histograma tras aplicar la LUT: cada nivel de entrada suma sus píxeles a lut[nivel]"""
+    return np.bincount(lut, weights=hist, minlength=256)
+
+# --- CADENA PEREZOSA ---
+
+class CadenaPuntual:
+    """
+    Imagen con una LUT pendiente. agregar() compone la LUT de una operación
+    puntual sin tocar los píxeles; imagen() materializa con un solo cv2.LUT.
+    """
+
+    def __init__(self, img, lut=None, dominio=None):
+        self.base = img
+        self.lut = lut           # LUT compuesta pendiente (None = nada pendiente)
+        self.dominio = dominio
+        self._pixeles = None     # Resultado de calcular(), si ya se pidió
+
+    def pendiente(self):
+        return self.lut is not None
+
+    def puede_fusionar(self, nombre):
+        if not es_puntual(nombre):
+            return False
+        if self.lut is None or len(self.base.shape) == 2:
+            return True
+        return OPERACIONES_PUNTUALES[nombre] == self.dominio
+
+    def agregar(self, nombre, func, args):
+        """Compone la operación con la LUT pendiente (materializa si cambia el dominio)"""
+        if not es_puntual(nombre):
+            raise ValueError(f"{nombre} no es una operación puntual")
+        if not self.puede_fusionar(nombre):
+            self.base = self.imagen()
+        lut = lut_de_operacion(func, args)
+        # Primero la LUT pendiente y después la nueva: (nueva ∘ pendiente)
+        self.lut = lut if self.lut is None else lut[self.lut]
+        self.dominio = OPERACIONES_PUNTUALES[nombre]
+        self._pixeles = None
+
+    def extendida(self, nombre, func, args):
+        """Cadena nueva con la operación compuesta; esta no cambia (sus píxeles tampoco)"""
+        if not self.puede_fusionar(nombre):
+            raise ValueError(f"{nombre} no se puede fusionar con la LUT pendiente")
+        lut = lut_de_operacion(func, args)
+        return CadenaPuntual(self.base, lut if self.lut is None else lut[self.lut],
+                             OPERACIONES_PUNTUALES[nombre])
+
+    def aplicar_a(self, img):
+        """La LUT pendiente sobre otra imagen (p. ej. la base reducida para mostrarla)"""
+        if self.lut is None: return img
+        return aplicar_lut_dominio(img, self.lut, self.dominio)
+
+    def calcular(self):
+        """Píxeles con la LUT aplicada, sin cambiar la cadena (se calculan una sola vez)"""
+        if self.lut is None:
+            return self.base
+        if self._pixeles is None:
+            self._pixeles = aplicar_lut_dominio(self.base, self.lut, self.dominio)
+        return self._pixeles
+
+    def imagen(self):
+        """Devuelve los píxeles, aplicando la LUT pendiente en una sola pasada"""
+        if self.lut is not None:
+            self.base = self.calcular()
+            self.lut = None
+            self.dominio = None
+            self._pixeles = None
+        return self.base
+
+def aplicar_fusionado(img, operaciones):
+    """
+    Ejecuta [(nombre, func, args), ...] fusionando las operaciones puntuales
+    consecutivas. En grises el resultado es idéntico a aplicarlas una a una;
+    en color (dominio V) el canal V es idéntico y solo se evita el redondeo
+    de H y S que añade cada ida y vuelta intermedia a HSV.
+    """
+    cadena = CadenaPuntual(img)
+    for i, (nombre, func, args) in enumerate(operaciones):
+        punto_de_control(i / len(operaciones))  # Cancelable entre pasos
+        if es_puntual(nombre):
+            cadena.agregar(nombre, func, args)
+        else:
+            cadena.base = func(cadena.imagen(), *args)
+    return cadena.imagen()
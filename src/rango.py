@@ -0,0 +1,92 @@
+"""
+Motor de filtros de rango (moda, mediana, percentiles, mínimo y máximo).
+
+En lugar de ordenar cada ventana (ndimage.generic_filter con un callback de
+Python por píxel), se usa el histograma deslizante de cada ventana: para cada
+nivel de gris presente en la imagen se cuenta cuántas veces aparece en la
+ventana con un filtro de caja sin normalizar (coste constante por píxel, sea
+cual sea el tamaño del kernel). Recorriendo los niveles en orden ascendente
+y acumulando esos conteos se obtiene la moda (conteo máximo) o cualquier
+rango (primer nivel cuyo acumulado supera la posición buscada).
+
+El coste es O(píxeles x niveles presentes), independiente de k_size.
+"""
+import cv2
+import numpy as np
+
+from src.tareas import punto_de_control
+
+def _profundidad_conteo(k_size):
+    # Los conteos caben en 16 bits mientras la ventana tenga <= 65535 píxeles
+    return cv2.CV_16U if k_size * k_size <= np.iinfo(np.uint16).max else cv2.CV_32S
+
+def _rango_objetivo(estadistico, n):
+    """Posición (0..n-1) dentro de la ventana ordenada"""
+    if estadistico == "mediana": return n // 2
+    if estadistico == "min": return 0
+    if estadistico == "max": return n - 1
+    # Percentil numérico 0-100
+    p = float(estadistico)
+    if not 0 <= p <= 100:
+        raise ValueError(f"Percentil fuera de rango: {p}")
+    return int(round(p / 100.0 * (n - 1)))
+
+def _conteos_por_nivel(canal, k_size, borde):
+    """Genera (nivel, conteo en la ventana) para cada nivel presente, en orden"""
+    ddepth = _profundidad_conteo(k_size)
+    presentes = np.flatnonzero(np.bincount(canal.ravel(), minlength=256)).astype(np.uint8)
+    for v in presentes:
+        punto_de_control()  # Cancelable entre niveles
+        mascara = (canal == v).view(np.uint8)
+        yield v, cv2.boxFilter(mascara, ddepth, (k_size, k_size), normalize=False, borderType=borde)
+
+def moda_canal(canal, k_size, borde=cv2.BORDER_REFLECT):
+    """Moda de cada ventana; en empate gana el nivel más bajo (como np.unique + argmax)"""
+    res = np.zeros_like(canal)
+    cuenta_max = None
+    for v, conteo in _conteos_por_nivel(canal, k_size, borde):
+        if cuenta_max is None:
+            cuenta_max = conteo
+            res[:] = v
+            continue
+        mejor = conteo > cuenta_max
+        np.copyto(cuenta_max, conteo, where=mejor)
+        np.copyto(res, v, where=mejor)
+    return res
+
+def rango_canal(canal, k_size, estadistico="mediana", borde=cv2.BORDER_REPLICATE):
+    """Mediana / mínimo / máximo / percentil de cada ventana"""
+    objetivo = _rango_objetivo(estadistico, k_size * k_size)
+    niveles = np.zeros(256, dtype=np.uint8)
+    indice = np.zeros(canal.shape, dtype=np.uint8)
+    acumulado = None
+    for i, (v, conteo) in enumerate(_conteos_por_nivel(canal, k_size, borde)):
+        niveles[i] = v
+        acumulado = conteo if acumulado is None else cv2.add(acumulado, conteo)
+        # Mientras el acumulado no supere el objetivo, la respuesta es un nivel mayor
+        indice += acumulado <= objetivo
+    return cv2.LUT(indice, niveles)
+
+def filtro_rango(img, k_size, estadistico="mediana", borde=None):
+    """
+    Aplica el estadístico por canal (las imágenes a color no se pasan a gris).
+    estadistico: 'moda', 'mediana', 'min', 'max' o un percentil 0-100.
+    borde: extrapolación de OpenCV; por defecto REFLECT para la moda (igual
+    que scipy.ndimage) y REPLICATE para los rangos (igual que medianBlur).
+    """
+    if img.dtype != np.uint8:
+        raise ValueError("El motor de rango trabaja con imágenes uint8")
+    if estadistico == "moda":
+        borde = cv2.BORDER_REFLECT if borde is None else borde
+    else:
+        borde = cv2.BORDER_REPLICATE if borde is None else borde
+        _rango_objetivo(estadistico, k_size * k_size)  # Validar antes de trabajar
+
+    def filtrar_canal(canal):
+        if estadistico == "moda":
+            return moda_canal(canal, k_size, borde)
+        return rango_canal(canal, k_size, estadistico, borde)
+
+    if len(img.shape) == 2:
+        return filtrar_canal(img)
+    return cv2.merge([filtrar_canal(c) for c in cv2.split(img)])
@@ -0,0 +1,121 @@
+"""
+Recetas: secuencias grabadas de operaciones (función, argumentos) que se
+pueden guardar como JSON y reproducir sobre otras imágenes sin la interfaz.
+
+Formato JSON:
+    {"version": 1, "pasos": [{"op": "practica4.filtro_gaussiano", "args": [5]}, ...]}
+"""
+import importlib
+import json
+
+import numpy as np
+
+from src import puntual
+from src.tareas import punto_de_control
+
+VERSION_FORMATO = 1
+
+# Marcador para argumentos que son imágenes (operaciones entre Img A e Img B)
+MARCA_SECUNDARIA = {"imagen": "secundaria"}
+
+# --- RESOLUCIÓN DE OPERACIONES ---
+
+def nombre_operacion(func):
+    """Función de src.practicaN -> 'practicaN.funcion'"""
+    modulo = getattr(func, "__module__", "") or ""
+    if not modulo.startswith("src.practica"):
+        raise ValueError(f"Solo se pueden grabar funciones de src.practica*: {func!r}")
+    return f"{modulo[len('src.'):]}.{func.__name__}"
+
+def resolver_operacion(nombre):
+    """Convierte 'practica4.filtro_gaussiano' en la función de src correspondiente"""
+    modulo, _, funcion = nombre.rpartition(".")
+    if not modulo.startswith("practica"):
+        raise ValueError(f"Operación no válida: {nombre} (usa practicaN.funcion)")
+    mod = importlib.import_module(f"src.{modulo}")
+    func = getattr(mod, funcion, None)
+    if func is None or not callable(func):
+        raise ValueError(f"No existe la función {funcion} en src.{modulo}")
+    return func
+
+def _serializar_arg(arg):
+    if isinstance(arg, np.ndarray):
+        return dict(MARCA_SECUNDARIA)
+    if isinstance(arg, np.generic):
+        return arg.item()
+    if isinstance(arg, (list, tuple)):
+        return [_serializar_arg(a) for a in arg]
+    if arg is None or isinstance(arg, (bool, int, float, str)):
+        return arg
+    raise ValueError(f"Argumento no serializable en la receta: {arg!r}")
+
+def _resolver_arg(arg, secundaria):
+    if arg == MARCA_SECUNDARIA:
+        if secundaria is None:
+            raise ValueError("La receta necesita una imagen secundaria (operación entre imágenes)")
+        return secundaria
+    return arg
+
+# --- RECETA ---
+
+class Receta:
+
+    def __init__(self, pasos=None):
+        # Cada paso: {"op": "practicaN.funcion", "args": [...]}
+        self.pasos = list(pasos or [])
+
+    def __len__(self):
+        return len(self.pasos)
+
+    def registrar(self, func, args=()):
+        """Añade un paso a partir de la función y los argumentos extra usados"""
+        self.pasos.append({"op": nombre_operacion(func),
+                        "args": [_serializar_arg(a) for a in args]})
+
+    def extender(self, otra):
+        self.pasos.extend(dict(p) for p in otra.pasos)
+
+    def operaciones(self):
+        """Lista de (función, args) lista para ejecutar (sin resolver imágenes)"""
+        return [(resolver_operacion(p["op"]), list(p.get("args", []))) for p in self.pasos]
+
+    def aplicar(self, img, secundaria=None, fusionar=True):
+        """
+        Reproduce la receta sobre una imagen RGB o gris. No toca la interfaz.
+        Con fusionar=True las operaciones puntuales consecutivas se componen
+        en una sola LUT (ver src.puntual).
+        """
+        operaciones = [(p["op"], func, [_resolver_arg(a, secundaria) for a in args])
+                    for p, (func, args) in zip(self.pasos, self.operaciones())]
+        if fusionar:
+            return puntual.aplicar_fusionado(img, operaciones)
+        for i, (_, func, args) in enumerate(operaciones):
+            punto_de_control(i / len(operaciones))
+            img = func(img, *args)
+        return img
+
+    # --- SERIALIZACIÓN ---
+
+    def a_json(self):
+        return json.dumps({"version": VERSION_FORMATO, "pasos": self.pasos}, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def desde_json(cls, texto):
+        datos = json.loads(texto)
+        if isinstance(datos, list):  # Lista de pasos sin envoltorio
+            datos = {"pasos": datos}
+        pasos = datos.get("pasos", [])
+        for p in pasos:
+            if "op" not in p:
+                raise ValueError(f"Paso sin 'op' en la receta: {p}")
+            resolver_operacion(p["op"])  # Validar antes de ejecutar nada
+        return cls(pasos)
+
+    def guardar(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.a_json())
+
+    @classmethod
+    def cargar(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls.desde_json(f.read())
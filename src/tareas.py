@@ -0,0 +1,159 @@
+"""
+Ejecución de operaciones en segundo plano con progreso y cancelación.
+
+Trabajador ejecuta una operación a la vez en un hilo (OpenCV y NumPy sueltan
+el GIL, así que la ventana sigue respondiendo) y entrega el resultado en el
+hilo principal sondeando con la función `programar` (root.after en Tk).
+
+La cancelación es cooperativa: los bucles largos (teselas, niveles del motor
+de rango, franjas de brújula) llaman a punto_de_control(), que lanza Cancelado
+si la tarea en curso se canceló y anota el progreso. Una operación sin puntos
+de control (una sola llamada a OpenCV) termina, pero su resultado se descarta.
+"""
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+
+import numpy as np
+
+_log = logging.getLogger(__name__)
+
+class Cancelado(Exception):
+    """La tarea en curso fue cancelada"""
+
+class Token:
+    def __init__(self):
+        self.cancelado = False
+        self.progreso = None    # fracción 0-1, o None si la operación no la informa
+
+    def cancelar(self):
+        self.cancelado = True
+
+_token_actual = ContextVar("token_cancelacion", default=None)
+
+def punto_de_control(fraccion=None):
+    """Llamar desde bucles largos: corta si se canceló y anota el progreso"""
+    token = _token_actual.get()
+    if token is None: return
+    if token.cancelado:
+        raise Cancelado()
+    if fraccion is not None:
+        token.progreso = fraccion
+
+def _misma_peticion(a, b):
+    # Las imágenes (p. ej. el operando de una operación dual) se comparan por identidad
+    if isinstance(a, (tuple, list)) and isinstance(b, (tuple, list)):
+        return len(a) == len(b) and all(_misma_peticion(x, y) for x, y in zip(a, b))
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return a is b
+    return type(a) is type(b) and a == b
+
+class Trabajador:
+    """
+    Cola de operaciones de la interfaz. enviar(clave, preparar, al_terminar)
+    encola una petición; preparar() se llama en el hilo principal justo antes de
+    ejecutarla (así toma la imagen actual y las operaciones se encadenan) y
+    devuelve la función a ejecutar en segundo plano, o None para omitirla.
+    Una petición igual a la última en curso o en cola se descarta (doble clic).
+    """
+
+    def __init__(self, programar, al_cambiar=None, intervalo_ms=40):
+        self.programar = programar
+        self.al_cambiar = al_cambiar    # al_cambiar(ocupado, progreso, en_cola)
+        self.intervalo_ms = intervalo_ms
+        self.pendientes = deque()
+        self.actual = None
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdi_trabajo")
+
+    @property
+    def ocupado(self):
+        return self.actual is not None
+
+    def enviar(self, clave, preparar, al_terminar, al_fallar=None):
+        ultima = self.pendientes[-1]["clave"] if self.pendientes else (self.actual["clave"] if self.actual else None)
+        if ultima is not None and _misma_peticion(ultima, clave):
+            return False
+        self.pendientes.append({"clave": clave, "preparar": preparar,
+                                "al_terminar": al_terminar, "al_fallar": al_fallar})
+        if self.actual is None:
+            self._siguiente()
+        else:
+            self._avisar()
+        return True
+
+    def cancelar(self):
+        """Cancela la operación en curso y vacía la cola"""
+        self.pendientes.clear()
+        if self.actual is not None:
+            self.actual["token"].cancelar()
+        self._avisar()
+
+    def _avisar(self):
+        if self.al_cambiar is None: return
+        progreso = self.actual["token"].progreso if self.actual else None
+        self.al_cambiar(self.ocupado, progreso, len(self.pendientes))
+
+    def _siguiente(self):
+        while self.pendientes:
+            peticion = self.pendientes.popleft()
+            try:
+                trabajo = peticion["preparar"]()
+            except Exception as e:
+                self._avisar_fallo(peticion, e)
+                continue
+            if trabajo is None: continue
+
+            token = Token()
+            peticion["token"] = token
+            peticion["futuro"] = self._pool.submit(self._ejecutar, token, trabajo)
+            self.actual = peticion
+            self._avisar()
+            self.programar(self.intervalo_ms, self._sondear)
+            return
+        self.actual = None
+        self._avisar()
+
+    @staticmethod
+    def _ejecutar(token, trabajo):
+        # Hilo de trabajo: el token queda visible para punto_de_control()
+        marca = _token_actual.set(token)
+        try:
+            return trabajo()
+        finally:
+            _token_actual.reset(marca)
+
+    def _sondear(self):
+        peticion = self.actual
+        if not peticion["futuro"].done():
+            self._avisar()
+            self.programar(self.intervalo_ms, self._sondear)
+            return
+
+        self.actual = None
+        try:
+            res = peticion["futuro"].result()
+        except Cancelado:
+            pass
+        except Exception as e:
+            if not peticion["token"].cancelado:
+                self._avisar_fallo(peticion, e)
+        else:
+            if not peticion["token"].cancelado:
+                try:
+                    peticion["al_terminar"](res)
+                except Exception:
+                    # Un fallo al entregar (p. ej. de Tk al dibujar) no debe frenar la cola
+                    _log.exception("Error en al_terminar de %r", peticion["clave"])
+        finally:
+            self._siguiente()
+
+    @staticmethod
+    def _avisar_fallo(peticion, error):
+        if peticion["al_fallar"] is None:
+            _log.error("Error en la tarea %r", peticion["clave"], exc_info=error)
+            return
+        try:
+            peticion["al_fallar"](error)
+        except Exception:
+            _log.exception("Error en al_fallar de %r", peticion["clave"])
@@ -0,0 +1,179 @@
+"""
+Procesamiento por teselas (fuera de memoria) para operaciones de vecindad.
+
+La imagen (un ndarray o un np.memmap, p. ej. un .npy abierto con
+mmap_mode="r") se recorre en teselas de tamaño fijo. Cada tesela se lee con un
+margen (halo) del tamaño del radio del kernel, se procesa con la función
+normal de src.practicaN y solo se escribe su parte central en la salida
+(arreglo en memoria, memmap o archivo .npy). Así el resultado es idéntico al
+de procesar la imagen completa y la memoria máxima depende del tamaño de la
+tesela, no del de la imagen.
+
+    from src import practica4, teselas
+    teselas.procesar_npy("scan.npy", "suave.npy", practica4.filtro_gaussiano, 7)
+"""
+import numpy as np
+
+from src import puntual
+from src.tareas import punto_de_control
+from src.receta import nombre_operacion, resolver_operacion
+
+TAM_TESELA = 1024
+
+def _k(args, defecto=3):
+    return int(args[0]) if args else defecto
+
+# Radio de vecindad (halo en píxeles) de cada operación según sus argumentos
+HALOS = {
+    "practica1.convertir_a_grises": lambda a: 0,
+    "practica1.binarizar_manual": lambda a: 0,
+    "practica1.binarizar_adaptativo": lambda a: 5,        # bloque 11x11
+    "practica3.logica_not": lambda a: 0,
+    "practica4.filtro_promedio": lambda a: _k(a) // 2,
+    "practica4.filtro_promedio_pesado": lambda a: _k(a) // 2 if len(a) > 1 and a[1] else (2 if _k(a) == 5 else 1),
+    "practica4.filtro_gaussiano": lambda a: _k(a) // 2,
+    "practica4.filtro_kernel": lambda a: max(np.shape(a[0])) // 2,
+    "practica4.filtro_bilateral": lambda a: 4,            # d = 9 fijo
+    "practica4.filtro_mediana": lambda a: (_k(a) | 1) // 2,
+    "practica4.filtro_maximo": lambda a: _k(a) // 2,
+    "practica4.filtro_minimo": lambda a: _k(a) // 2,
+    "practica4.filtro_percentil": lambda a: _k(a) // 2,
+    "practica4.filtro_moda": lambda a: _k(a) // 2,
+    "practica4.magnitud_sobel": lambda a: 1,
+    "practica4.magnitud_laplaciano": lambda a: 1,
+    "practica4.filtro_prewitt": lambda a: 1,
+    "practica4.filtro_roberts": lambda a: 1,
+    "practica4.filtro_kirsch": lambda a: 1,
+    "practica4.filtro_robinson": lambda a: 1,
+    # Canny: Sobel + supresión de no máximos caben en el halo, pero la
+    # histéresis puede propagarse más lejos; el resultado es aproximado
+    # solo en cadenas débiles que crucen el borde de una tesela.
+    "practica4.filtro_canny": lambda a: 16,
+    "practica6.erosion": lambda a: _k(a) // 2,
+    "practica6.dilatacion": lambda a: _k(a) // 2,
+    "practica6.gradiente_morfologico": lambda a: _k(a) // 2,
+    "practica6.apertura": lambda a: 2 * (_k(a) // 2),     # erosión + dilatación
+    "practica6.cierre": lambda a: 2 * (_k(a) // 2),
+}
+# Operaciones cuyo resultado por teselas solo es aproximado
+APROXIMADAS = {"practica4.filtro_canny"}
+
+# Las operaciones puntuales no tienen vecindad. Las del dominio V (curvas de
+# practica5) quedan fuera: pasan por RGB <-> HSV y el redondeo de OpenCV en esa
+# conversión depende del ancho de la fila, así que por teselas no serían idénticas.
+HALOS.update({nombre: (lambda a: 0) for nombre, dominio in puntual.OPERACIONES_PUNTUALES.items()
+              if dominio == "RGB"})
+
+# Operaciones que normalizan con el mínimo/máximo GLOBAL: se hacen en dos
+# pasadas (min/max de la magnitud cruda y luego escalado) para ser exactas.
+NORMALIZADAS = {
+    "practica4.filtro_sobel": "practica4.magnitud_sobel",
+    "practica4.filtro_laplaciano": "practica4.magnitud_laplaciano",
+}
+
+def halo_operacion(func, args=()):
+    nombre = nombre_operacion(func)
+    nombre = NORMALIZADAS.get(nombre, nombre)
+    if nombre not in HALOS:
+        raise ValueError(f"No se conoce el halo de {nombre}; indícalo con halo=...")
+    return HALOS[nombre](list(args))
+
+# --- RECORRIDO DE TESELAS ---
+
+def rejilla(h, w, tam):
+    """(y0, y1, x0, x1) de cada tesela en orden de filas"""
+    for y0 in range(0, h, tam):
+        for x0 in range(0, w, tam):
+            yield y0, min(h, y0 + tam), x0, min(w, x0 + tam)
+
+def _recorrer(img, func, args, halo, tam, avance=(0.0, 1.0)):
+    """Genera (region, resultado_central) procesando cada tesela con su halo"""
+    h, w = img.shape[:2]
+    regiones = list(rejilla(h, w, tam))
+    for i, (y0, y1, x0, x1) in enumerate(regiones):
+        # Entre teselas se puede cancelar; avance = tramo de progreso de esta pasada
+        punto_de_control(avance[0] + (avance[1] - avance[0]) * i / len(regiones))
+        # En los bordes reales de la imagen no hay halo: la función aplica su
+        # propio tratamiento de bordes, igual que con la imagen completa.
+        ya, yb = max(0, y0 - halo), min(h, y1 + halo)
+        xa, xb = max(0, x0 - halo), min(w, x1 + halo)
+        tesela = np.ascontiguousarray(img[ya:yb, xa:xb])
+        res = func(tesela, *args)
+        yield (y0, y1, x0, x1), res[y0 - ya:y0 - ya + (y1 - y0), x0 - xa:x0 - xa + (x1 - x0)]
+
+def _preparar_salida(salida, forma, dtype):
+    if salida is None:
+        return np.empty(forma, dtype=dtype)
+    if isinstance(salida, str):
+        return np.lib.format.open_memmap(salida, mode="w+", dtype=dtype, shape=forma)
+    if salida.shape != forma or salida.dtype != dtype:
+        raise ValueError(f"La salida debe ser {forma} {dtype}, no {salida.shape} {salida.dtype}")
+    return salida
+
+def _escalado_minmax(smin, smax):
+    # Mismos coeficientes que cv2.normalize(..., 0, 255, NORM_MINMAX)
+    escala = 255.0 * (1.0 / (smax - smin) if smax - smin > np.finfo(np.float64).eps else 0)
+    return escala, -smin * escala
+
+def procesar_por_teselas(img, func, *args, halo=None, tam_tesela=TAM_TESELA, salida=None):
+    """
+    Aplica func(img, *args) tesela a tesela y devuelve la salida ensamblada.
+    salida: None (nuevo arreglo), un arreglo/memmap ya creado o una ruta .npy.
+    halo: radio de vecindad; por defecto se toma de HALOS.
+    """
+    nombre = nombre_operacion(func)
+    if nombre in NORMALIZADAS:
+        return _procesar_normalizada(img, resolver_operacion(NORMALIZADAS[nombre]), args,
+                                    halo, tam_tesela, salida)
+    if halo is None:
+        halo = halo_operacion(func, args)
+
+    h, w = img.shape[:2]
+    for (y0, y1, x0, x1), centro in _recorrer(img, func, args, halo, tam_tesela):
+        if not isinstance(salida, np.ndarray):
+            # La forma/tipo de salida (gris, color) la decide la primera tesela
+            salida = _preparar_salida(salida, (h, w) + centro.shape[2:], centro.dtype)
+        salida[y0:y1, x0:x1] = centro
+    return salida
+
+def _procesar_normalizada(img, func_cruda, args, halo, tam, salida):
+    if halo is None:
+        halo = halo_operacion(func_cruda, args)
+    # Pasada 1: mínimo y máximo global de la magnitud cruda
+    smin, smax = np.inf, -np.inf
+    for _, centro in _recorrer(img, func_cruda, args, halo, tam, (0.0, 0.5)):
+        smin, smax = min(smin, float(centro.min())), max(smax, float(centro.max()))
+    escala, desplazamiento = _escalado_minmax(smin, smax)
+
+    # Pasada 2: recalcular y escalar a uint8 (redondeo como convertTo)
+    h, w = img.shape[:2]
+    salida = _preparar_salida(salida, (h, w), np.uint8)
+    for (y0, y1, x0, x1), centro in _recorrer(img, func_cruda, args, halo, tam, (0.5, 1.0)):
+        salida[y0:y1, x0:x1] = np.clip(np.rint(centro * escala + desplazamiento), 0, 255)
+    return salida
+
+def procesar_npy(entrada, salida, func, *args, halo=None, tam_tesela=TAM_TESELA):
+    """Archivo .npy -> archivo .npy sin cargar ninguno de los dos completo en RAM"""
+    img = np.load(entrada, mmap_mode="r")
+    res = procesar_por_teselas(img, func, *args, halo=halo, tam_tesela=tam_tesela, salida=salida)
+    if isinstance(res, np.memmap): res.flush()  # salida puede ser un arreglo en memoria
+    return res
+
+# --- USO DESDE LA INTERFAZ ---
+
+# A partir de este tamaño la interfaz procesa por teselas (cancelable y con progreso)
+PIXELES_TESELAS = 16_000_000
+
+def admite_teselas(func):
+    """True si el resultado por teselas es idéntico al de la imagen completa"""
+    try:
+        nombre = nombre_operacion(func)
+    except ValueError:
+        return False
+    return (nombre in HALOS or nombre in NORMALIZADAS) and nombre not in APROXIMADAS
+
+def ejecutar(img, func, *args):
+    """func(img, *args), por teselas si la imagen es grande y la operación lo admite"""
+    if img.shape[0] * img.shape[1] >= PIXELES_TESELAS and admite_teselas(func):
+        return procesar_por_teselas(img, func, *args)
+    return func(img, *args)
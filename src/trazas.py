@@ -0,0 +1,227 @@
+"""
+Trazas de rendimiento: tramos con tiempo de pared, tiempo de CPU y memoria.
+
+Responde a "¿en qué se va el tiempo de un clic?": la operación, la copia al
+historial, renderizar_grilla, el histograma o la creación del PhotoImage.
+
+    with trazas.tramo("render"):
+        ...
+
+Mientras están desactivadas, tramo() devuelve un contexto vacío compartido
+(una llamada y nada más) y las funciones de src.practica* son las originales:
+activar() las envuelve y desactivar() las restaura. Los tramos se guardan en
+memoria y exportar() los escribe en el formato de eventos de Chrome (JSON),
+que abren chrome://tracing, Perfetto o speedscope.
+
+Memoria (opcional, con tracemalloc, que ralentiza las asignaciones):
+"bytes_netos" es lo que el tramo deja asignado (p. ej. su resultado) y
+"pico_bytes" lo máximo que llegó a asignar por encima del inicio; el pico solo
+se mide en el tramo exterior de cada hilo. tracemalloc ve los arreglos de
+NumPy (también los que devuelve OpenCV) pero no los búferes internos de OpenCV.
+"""
+import functools
+import importlib
+import inspect
+import json
+import os
+import statistics
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+MODULOS = [f"practica{n}" for n in range(1, 8)]
+MAX_EVENTOS = 200_000   # eventos guardados para exportar (los más antiguos se descartan)
+VENTANA = 50            # últimas mediciones por nombre para el panel de latencias
+
+_activo = False
+_memoria = False
+_origen = time.perf_counter_ns()
+_eventos = deque(maxlen=MAX_EVENTOS)
+_recientes = {}         # nombre -> deque de (pared_ms, cpu_ms, bytes_netos)
+_hilos = {}             # ident -> nombre del hilo
+_originales = {}        # (módulo, nombre) -> función sin envolver
+_local = threading.local()
+_siguiente_id = iter(range(1, 1 << 62))
+
+def activo():
+    return _activo
+
+def nombre_funcion(func):
+    """'practicaN.funcion' para las de src.practica*, el nombre calificado para el resto"""
+    modulo = (getattr(func, "__module__", "") or "").rpartition(".")[2]
+    nombre = getattr(func, "__qualname__", None) or repr(func)
+    return f"{modulo}.{nombre}" if modulo else nombre
+
+def ahora():
+    """Marca de tiempo (ns) para medir tramos que empiezan y terminan en sitios distintos"""
+    return time.perf_counter_ns()
+
+# --- TRAMOS ---
+
+class _Nulo:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NULO = _Nulo()
+
+class _Tramo:
+    __slots__ = ("nombre", "cat", "args", "t0", "c0", "m0", "exterior")
+
+    def __init__(self, nombre, cat, args):
+        self.nombre = nombre
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        profundidad = getattr(_local, "profundidad", 0)
+        _local.profundidad = profundidad + 1
+        self.exterior = profundidad == 0
+        self.m0 = None
+        if _memoria and tracemalloc.is_tracing():
+            if self.exterior: tracemalloc.reset_peak()
+            self.m0 = tracemalloc.get_traced_memory()[0]
+        self.c0 = time.thread_time_ns()
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        t1 = time.perf_counter_ns()
+        c1 = time.thread_time_ns()
+        _local.profundidad -= 1
+        args = self.args
+        args["cpu_ms"] = round((c1 - self.c0) / 1e6, 3)
+        neto = None
+        if self.m0 is not None and tracemalloc.is_tracing():
+            actual, pico = tracemalloc.get_traced_memory()
+            neto = actual - self.m0
+            args["bytes_netos"] = neto
+            if self.exterior: args["pico_bytes"] = pico - self.m0
+        if tipo is not None:
+            args["error"] = tipo.__name__
+        _registrar("X", self.nombre, self.cat, self.t0, t1 - self.t0, args)
+        _anotar(self.nombre, (t1 - self.t0) / 1e6, (c1 - self.c0) / 1e6, neto)
+        return False
+
+def tramo(nombre, cat="pdi", **args):
+    """Contexto que mide el bloque como un tramo (vacío si las trazas están desactivadas)"""
+    if not _activo: return _NULO
+    return _Tramo(nombre, cat, args)
+
+def asincrono(nombre, inicio_ns, cat="clic", **args):
+    """
+    Tramo de inicio_ns hasta ahora que puede cruzar hilos y solaparse con otros
+    (p. ej. del clic al redibujo, pasando por la cola y el hilo de trabajo).
+    """
+    if not _activo: return
+    fin = time.perf_counter_ns()
+    ident = next(_siguiente_id)
+    _registrar("b", nombre, cat, inicio_ns, None, dict(args), ident)
+    _registrar("e", nombre, cat, fin, None, {}, ident)
+    _anotar(nombre, (fin - inicio_ns) / 1e6, None, None)
+
+def _registrar(fase, nombre, cat, t0, duracion, args, ident=None):
+    tid = threading.get_ident()
+    if tid not in _hilos:
+        _hilos[tid] = threading.current_thread().name
+    _eventos.append((fase, nombre, cat, t0, duracion, tid, args, ident))
+
+def _anotar(nombre, pared_ms, cpu_ms, neto):
+    ventana = _recientes.get(nombre)
+    if ventana is None:
+        ventana = _recientes.setdefault(nombre, deque(maxlen=VENTANA))
+    ventana.append((pared_ms, cpu_ms, neto))
+
+# --- INSTRUMENTACIÓN DE src.practica* ---
+
+def _envolver(func, nombre):
+    @functools.wraps(func)
+    def envuelta(*args, **kwargs):
+        if not _activo: return func(*args, **kwargs)
+        extra = {}
+        if args and hasattr(args[0], "shape"): extra["forma"] = list(args[0].shape)
+        with _Tramo(nombre, "practica", extra):
+            return func(*args, **kwargs)
+    return envuelta
+
+def _instrumentar():
+    for modulo in MODULOS:
+        mod = importlib.import_module(f"src.{modulo}")
+        for n, func in inspect.getmembers(mod, inspect.isfunction):
+            if n.startswith("_") or func.__module__ != mod.__name__: continue
+            _originales[(mod, n)] = func
+            setattr(mod, n, _envolver(func, f"{modulo}.{n}"))
+
+def _restaurar():
+    for (mod, n), func in _originales.items():
+        setattr(mod, n, func)
+    _originales.clear()
+
+def activar(memoria=False):
+    """Empieza a registrar tramos; memoria=True mide además bytes con tracemalloc"""
+    global _activo, _memoria
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not memoria and _memoria and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _memoria = memoria
+    if not _originales: _instrumentar()
+    _activo = True
+
+def desactivar():
+    global _activo, _memoria
+    _activo = False
+    _restaurar()
+    if _memoria and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _memoria = False
+
+def limpiar():
+    _eventos.clear()
+    _recientes.clear()
+
+# --- CONSULTA Y EXPORTACIÓN ---
+
+def _percentil(valores, p):
+    orden = sorted(valores)
+    return orden[min(int(round(p * (len(orden) - 1))), len(orden) - 1)]
+
+def resumen():
+    """
+    Por nombre de tramo, sobre las últimas VENTANA mediciones:
+    (nombre, n, ultimo_ms, mediana_ms, p95_ms, cpu_ms, mb_netos). cpu_ms y
+    mb_netos son medianas, o None si no se midieron.
+    """
+    filas = []
+    for nombre, ventana in list(_recientes.items()):
+        datos = list(ventana)
+        if not datos: continue
+        pared = [d[0] for d in datos]
+        cpu = [d[1] for d in datos if d[1] is not None]
+        netos = [d[2] for d in datos if d[2] is not None]
+        filas.append((nombre, len(datos), pared[-1], statistics.median(pared), _percentil(pared, 0.95),
+                      statistics.median(cpu) if cpu else None,
+                      statistics.median(netos) / 2**20 if netos else None))
+    return filas
+
+def eventos_chrome():
+    """Lista de eventos en el formato de Chrome (tiempos en microsegundos)"""
+    pid = os.getpid()
+    salida = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "Sistema PDI"}}]
+    for tid, nombre in list(_hilos.items()):
+        salida.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": nombre}})
+    for fase, nombre, cat, t0, duracion, tid, args, ident in list(_eventos):
+        evento = {"name": nombre, "cat": cat, "ph": fase, "ts": (t0 - _origen) / 1000, "pid": pid, "tid": tid}
+        if duracion is not None: evento["dur"] = duracion / 1000
+        if ident is not None: evento["id"] = ident
+        if args: evento["args"] = args
+        salida.append(evento)
+    return salida
+
+def exportar(path):
+    """Escribe la sesión registrada como traza de Chrome; devuelve el número de eventos"""
+    eventos = eventos_chrome()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": eventos, "displayTimeUnit": "ms"}, f)
+    return len(eventos)
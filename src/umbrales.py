@@ -0,0 +1,211 @@
+"""
+Motor de umbrales en el dominio del histograma.
+
+Todos los métodos de umbralización de practica5 trabajan sobre el mismo
+histograma de 256 niveles de la imagen en grises, calculado una vez por
+versión de imagen (src.cache_version). Cada método es una función
+hist -> umbral con aritmética vectorizada de O(256), así que elegir otro
+método o compararlos todos no vuelve a recorrer los píxeles.
+
+El umbral sigue la convención de cv2.threshold(THRESH_BINARY): los píxeles
+con nivel > umbral pasan a 255.
+
+    umbrales.comparar(img)       # {"otsu": (97, 0.41), "kapur": (121, 0.30), ...}
+    umbrales.binarizar(img, "kittler")
+"""
+import cv2
+import numpy as np
+
+from src.cache_version import memo
+
+NIVELES = np.arange(256, dtype=np.float64)
+_EPS_FLT = float(np.finfo(np.float32).eps)   # el FLT_EPSILON de OpenCV
+
+# --- HISTOGRAMA ---
+
+def _gris(img):
+    if len(img.shape) == 3:
+        return cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+    return img
+
+def histograma_gris(img, gris=None):
+    """Histograma (float64, solo lectura) de la imagen en grises; gris: conversión ya hecha"""
+    def calcular():
+        g = _gris(img) if gris is None else gris
+        hist = cv2.calcHist([g], [0], None, [256], [0, 256]).ravel().astype(np.float64)
+        hist.flags.writeable = False
+        return hist
+    return memo(img, "hist_gris", calcular)
+
+def _tablas(hist):
+    """(p, P, M): probabilidades, probabilidad acumulada y primer momento acumulado"""
+    p = hist / max(hist.sum(), 1.0)
+    return p, np.cumsum(p), np.cumsum(NIVELES * p)
+
+# --- MÉTODOS (hist -> umbral) ---
+
+def otsu(hist):
+    """Máxima varianza entre clases (mismo umbral que THRESH_OTSU)"""
+    p, P, M = _tablas(hist)
+    q1, q2 = P, 1.0 - P
+    # Como OpenCV: se ignoran los cortes con una clase (casi) vacía
+    validos = (np.minimum(q1, q2) >= _EPS_FLT) & (np.maximum(q1, q2) <= 1.0 - _EPS_FLT)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma = q1 * q2 * (M / q1 - (M[-1] - M) / q2) ** 2
+    sigma = np.where(validos, sigma, 0.0)
+    t = int(np.argmax(sigma))
+    return t if sigma[t] > 0 else 0
+
+def media(hist):
+    """Nivel medio de la imagen (umbral no entero)"""
+    return float(hist @ NIVELES / max(hist.sum(), 1.0))
+
+def kapur(hist):
+    """Máxima entropía de Kapur: H(fondo) + H(objeto)"""
+    eps = 1e-10
+    # En float32 (como los conteos de cv2.calcHist): mismos cortes que con el
+    # bucle original, también en los casi empates
+    p = hist.astype(np.float32) / np.float32(hist.sum())
+    P = np.cumsum(p)
+    H = np.cumsum(-p * np.log(p + eps))
+    t = np.arange(1, 255)
+    w0 = P[t]
+    w1 = 1.0 - w0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total = (H[t] / w0 + np.log(w0 + eps)) + ((H[255] - H[t]) / w1 + np.log(w1 + eps))
+    # w1 puede quedar en -1e-17 por redondeo: su log es NaN y ese corte no cuenta
+    validos = (w0 != 0) & (w1 != 0) & ~np.isnan(total)
+    if not validos.any():
+        return 128
+    total = np.where(validos, total, -np.inf)
+    return int(t[np.argmax(total)])
+
+def isodata(hist):
+    """Media iterativa (Ridler-Calvard): t = (media abajo + media arriba) / 2 hasta converger"""
+    h = np.asarray(hist, dtype=np.float64)
+    N = np.cumsum(h)
+    S = np.cumsum(h * NIVELES)
+    t = 128
+    while True:
+        n1, n2 = N[t], N[-1] - N[t]
+        if n1 == 0 or n2 == 0: break
+        nuevo = int((S[t] / n1 + (S[-1] - S[t]) / n2) / 2)
+        if nuevo == t: break
+        t = nuevo
+    return t
+
+def kittler(hist):
+    """Error mínimo de Kittler-Illingworth (dos gaussianas)"""
+    p, P, M = _tablas(hist)
+    M2 = np.cumsum(NIVELES ** 2 * p)
+    q1, q2 = P, 1.0 - P
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mu1, mu2 = M / q1, (M[-1] - M) / q2
+        var1 = M2 / q1 - mu1 ** 2
+        var2 = (M2[-1] - M2) / q2 - mu2 ** 2
+        J = 1 + 2 * (q1 * np.log(np.sqrt(var1)) + q2 * np.log(np.sqrt(var2))) \
+              - 2 * (q1 * np.log(q1) + q2 * np.log(q2))
+    # Solo cortes con dos clases de varianza positiva
+    validos = (q1 > 0) & (q2 > 0) & (var1 > 1e-12) & (var2 > 1e-12)
+    if not validos.any():
+        raise ValueError("Kittler-Illingworth necesita dos clases con varianza")
+    return int(np.argmin(np.where(validos, J, np.inf)))
+
+def triangulo(hist):
+    """Triángulo de Zack (mismo umbral que THRESH_TRIANGLE)"""
+    h = np.asarray(hist, dtype=np.float64)
+    ocupados = np.flatnonzero(h)
+    if len(ocupados) == 0: return 0
+    izq = max(int(ocupados[0]) - 1, 0)
+    der = min(int(ocupados[-1]) + 1, 255)
+    pico = int(np.argmax(h))
+    # Como OpenCV: la recta va del pico al extremo más lejano
+    invertido = pico - izq < der - pico
+    if invertido:
+        h = h[::-1]
+        izq, pico = 255 - der, 255 - pico
+    t = izq
+    if pico > izq:
+        i = np.arange(izq + 1, pico + 1)
+        distancia = h[pico] * i + (izq - pico) * h[i]
+        j = int(np.argmax(distancia))
+        if distancia[j] > 0: t = int(i[j])
+    t -= 1
+    return 255 - t if invertido else t
+
+def momentos(hist):
+    """Preservación de momentos de Tsai"""
+    p, P, _ = _tablas(hist)
+    m1, m2, m3 = (NIVELES ** n @ p for n in (1, 2, 3))
+    cd = m2 - m1 * m1
+    if cd <= 0:
+        raise ValueError("Momentos necesita al menos dos niveles de gris")
+    c0 = (-m2 * m2 + m1 * m3) / cd
+    c1 = (m1 * m2 - m3) / cd
+    raiz = np.sqrt(max(c1 * c1 - 4 * c0, 0.0))
+    z0, z1 = 0.5 * (-c1 - raiz), 0.5 * (-c1 + raiz)
+    p0 = (z1 - m1) / (z1 - z0)   # fracción de píxeles de la clase oscura
+    return int(min(np.searchsorted(P, p0, side="right"), 255))
+
+def _bimodal(h):
+    modas = (h[1:-1] > h[:-2]) & (h[1:-1] > h[2:])
+    return np.count_nonzero(modas) == 2
+
+def minimo(hist, max_iter=10000):
+    """Prewitt-Mendelsohn: suaviza hasta dejar dos picos y toma el valle entre ellos"""
+    h = np.asarray(hist, dtype=np.float64)
+    for _ in range(max_iter):
+        if _bimodal(h): break
+        # Media móvil de 3 con ceros fuera del rango
+        h = np.convolve(h, np.full(3, 1 / 3), mode="same")
+    else:
+        raise ValueError("El histograma no llega a ser bimodal")
+    valles = np.flatnonzero((h[:-2] > h[1:-1]) & (h[2:] >= h[1:-1])) + 1
+    if len(valles) == 0:
+        raise ValueError("No hay valle entre los dos picos")
+    return int(valles[0])
+
+# Orden de presentación en la comparación
+METODOS = {
+    "otsu": otsu,
+    "media": media,
+    "kapur": kapur,
+    "isodata": isodata,
+    "kittler": kittler,
+    "triangulo": triangulo,
+    "momentos": momentos,
+    "minimo": minimo,
+}
+
+# --- API ---
+
+def umbral(img, metodo, gris=None):
+    if metodo not in METODOS:
+        raise ValueError(f"Método de umbral desconocido: {metodo} (usa {', '.join(METODOS)})")
+    return METODOS[metodo](histograma_gris(img, gris))
+
+def binarizar(img, metodo):
+    """Imagen binaria (0/255) con el umbral del método"""
+    gris = _gris(img)
+    t = umbral(img, metodo, gris)
+    _, binaria = cv2.threshold(gris, t, 255, cv2.THRESH_BINARY)
+    return binaria
+
+def comparar(img):
+    """
+    {método: (umbral, fracción de píxeles > umbral)} de todos los métodos con
+    un solo histograma; (None, None) si el método no aplica a esta imagen.
+    """
+    hist = histograma_gris(img)
+    total = max(hist.sum(), 1.0)
+    arriba = 1.0 - np.cumsum(hist) / total   # fracción > nivel
+    resultados = {}
+    for nombre, metodo in METODOS.items():
+        try:
+            t = metodo(hist)
+        except ValueError:
+            resultados[nombre] = (None, None)
+            continue
+        nivel = min(max(int(np.floor(t)), 0), 255)
+        resultados[nombre] = (t, float(arriba[nivel]))
+    return resultados
@@ -0,0 +1,62 @@
+"""
+Pirámide de vistas previas para mostrar imágenes grandes.
+
+Reducir una imagen de 24 MP a 350 px en cada redibujado es lo más caro de la
+interfaz. Aquí cada versión de imagen (ver src.cache_version) guarda de forma
+perezosa la vista previa de cada tamaño, calculada con una pirámide de mitades
+sucesivas (INTER_AREA): se baja hasta el nivel más pequeño que aún cubre el
+tamaño pedido y solo ese nivel se reduce, como mucho a la mitad.
+
+Solo se guarda el resultado final (unos cientos de KB por tamaño); los niveles
+intermedios son temporales. Guardarlos sumaría un tercio de la imagen por cada
+versión viva (también las del historial), fuera del presupuesto de memoria de
+src.historial.
+
+reducida() da la misma reducción sin pasar a RGB: es el proxy sobre el que
+se previsualizan en vivo los filtros mientras se mueve un deslizador.
+"""
+import cv2
+
+from src.cache_version import memo
+
+LADO_PANEL = 350
+# Lado del proxy sobre el que se calculan las vistas previas en vivo de los
+# deslizadores: suficiente para juzgar el efecto a ritmo interactivo
+LADO_PROXY = 512
+
+def nivel(img, i):
+    """Nivel i de la pirámide (0 = la imagen, cada nivel mide la mitad), sin caché"""
+    for _ in range(i):
+        h, w = img.shape[:2]
+        img = cv2.resize(img, (max(1, w // 2), max(1, h // 2)), interpolation=cv2.INTER_AREA)
+    return img
+
+def tamano_vista(h, w, lado):
+    """Tamaño (ancho, alto) que ocupa la imagen dentro de lado x lado (sin ampliar)"""
+    escala = min(lado / w, lado / h, 1.0)
+    return max(1, round(w * escala)), max(1, round(h * escala))
+
+def reducida(img, lado):
+    """La imagen (mismos canales) reducida para caber en lado x lado, sin ampliar"""
+    def calcular():
+        h, w = img.shape[:2]
+        ancho, alto = tamano_vista(h, w, lado)
+        # Subir por la pirámide mientras el siguiente nivel siga cubriendo el tamaño final
+        i = 0
+        while (w >> (i + 1)) >= ancho and (h >> (i + 1)) >= alto:
+            i += 1
+        base = nivel(img, i)
+        if base.shape[1] != ancho or base.shape[0] != alto:
+            base = cv2.resize(base, (ancho, alto), interpolation=cv2.INTER_AREA)
+        return base
+    return memo(img, ("reducida", lado), calcular)
+
+def vista_previa(img, lado=LADO_PANEL):
+    """Imagen RGB uint8 que cabe en lado x lado, lista para PIL/Tk"""
+    def calcular():
+        base = reducida(img, lado)
+        # La conversión a RGB se hace ya en tamaño reducido
+        if len(base.shape) == 2:
+            base = cv2.cvtColor(base, cv2.COLOR_GRAY2RGB)
+        return base
+    return memo(img, ("vista", lado), calcular)